@@ -0,0 +1,91 @@
+from __future__ import annotations
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView
+)
+from instrument_app.util.BusStats import bus_stats
+
+#Depends on bus_stats, which SerialComms fills in on every transaction
+
+COLUMNS = [
+    ("Command", "name", "{}"),
+    ("Count", "count", "{}"),
+    ("Mean ms", "mean_ms", "{:.2f}"),
+    ("p50 ms", "p50_ms", "{:.2f}"),
+    ("p95 ms", "p95_ms", "{:.2f}"),
+    ("Max ms", "max_ms", "{:.2f}"),
+    ("Bus s", "busy_s", "{:.2f}"),
+    ("Timeouts", "timeouts", "{}"),
+    ("CRC errors", "crc_errors", "{}"),
+    ("Rejected", "rejected", "{}"),
+    ("Bytes out", "bytes_out", "{}"),
+    ("Bytes in", "bytes_in", "{}"),
+]
+
+
+class BusStatsDialog(QDialog):
+    """
+    Live per-command view of the Compact serial traffic, busiest command first.
+    Non-modal, so it can stay open next to the pages while they poll.
+    """
+    def __init__(self, parent=None, refresh_ms=1000):
+        super().__init__(parent)
+        self.setWindowTitle("Serial Statistics")
+        self.resize(820, 420)
+
+        v = QVBoxLayout(self)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels([c[0] for c in COLUMNS])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        v.addWidget(self.table, 1)
+
+        # Buttons
+        btn_row = QHBoxLayout()
+        self.lbl_total = QLabel("")
+        btn_row.addWidget(self.lbl_total)
+        btn_row.addStretch(1)
+        self.btn_reset = QPushButton("Reset")
+        self.btn_close = QPushButton("Close")
+        btn_row.addWidget(self.btn_reset)
+        btn_row.addWidget(self.btn_close)
+        v.addLayout(btn_row)
+
+        # Wire up
+        self.btn_reset.clicked.connect(self._reset_clicked)
+        self.btn_close.clicked.connect(self.close)
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(refresh_ms)
+        self.refresh()
+
+    def refresh(self):
+        rows = bus_stats.snapshot()
+        self.table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, (_, key, fmt) in enumerate(COLUMNS):
+                text = fmt.format(row[key])
+                item = self.table.item(r, c)
+                if item is None:
+                    self.table.setItem(r, c, QTableWidgetItem(text))
+                elif item.text() != text:
+                    item.setText(text)
+        commands = sum(row["count"] for row in rows)
+        errors = sum(row["timeouts"] + row["crc_errors"] + row["rejected"] for row in rows)
+        self.lbl_total.setText(f"{commands} commands, {errors} failed")
+
+    def _reset_clicked(self):
+        bus_stats.reset()
+        self.refresh()
+
+    def closeEvent(self, ev):
+        self._timer.stop()
+        super().closeEvent(ev)
+
+    def showEvent(self, ev):
+        self._timer.start()
+        super().showEvent(ev)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QCheckBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox
+)
+from instrument_app.util.LatencyTrace import latency_trace
+
+#Depends on latency_trace, which the serial worker, pressure page, plot and recorder mark
+
+COLUMNS = [
+    ("Stage", "stage", "{}"),
+    ("Count", "count", "{}"),
+    ("Mean ms", "mean_ms", "{:.2f}"),
+    ("p50 ms", "p50_ms", "{:.2f}"),
+    ("p95 ms", "p95_ms", "{:.2f}"),
+    ("p99 ms", "p99_ms", "{:.2f}"),
+    ("Max ms", "max_ms", "{:.2f}"),
+]
+
+
+class LatencyTraceDialog(QDialog):
+    """
+    Live view of how old the telemetry is at each stage, from bytes read to
+    written to the log. Non-modal; tracing runs only while 'Trace' is ticked.
+    """
+    def __init__(self, parent=None, refresh_ms=1000):
+        super().__init__(parent)
+        self.setWindowTitle("Latency Trace")
+        self.resize(640, 260)
+
+        v = QVBoxLayout(self)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels([c[0] for c in COLUMNS])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        v.addWidget(self.table, 1)
+
+        v.addWidget(QLabel("Each stage is measured from when the reading's bytes were read off the port."))
+
+        # Buttons
+        btn_row = QHBoxLayout()
+        self.chk_enabled = QCheckBox("Trace")
+        self.chk_enabled.setChecked(latency_trace.enabled)
+        btn_row.addWidget(self.chk_enabled)
+        btn_row.addStretch(1)
+        self.btn_reset = QPushButton("Reset")
+        self.btn_save = QPushButton("Save…")
+        self.btn_close = QPushButton("Close")
+        btn_row.addWidget(self.btn_reset)
+        btn_row.addWidget(self.btn_save)
+        btn_row.addWidget(self.btn_close)
+        v.addLayout(btn_row)
+
+        # Wire up
+        self.chk_enabled.toggled.connect(self._enabled_toggled)
+        self.btn_reset.clicked.connect(self._reset_clicked)
+        self.btn_save.clicked.connect(self._save_clicked)
+        self.btn_close.clicked.connect(self.close)
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(refresh_ms)
+        self.refresh()
+
+    def refresh(self):
+        rows = latency_trace.snapshot()
+        self.table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, (_, key, fmt) in enumerate(COLUMNS):
+                text = fmt.format(row[key])
+                item = self.table.item(r, c)
+                if item is None:
+                    self.table.setItem(r, c, QTableWidgetItem(text))
+                elif item.text() != text:
+                    item.setText(text)
+
+    def _enabled_toggled(self, on):
+        latency_trace.enabled = on
+
+    def _reset_clicked(self):
+        latency_trace.reset()
+        self.refresh()
+
+    def _save_clicked(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Latency Trace", "latency_trace.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            latency_trace.dump(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Latency Trace", f"Could not save:\n{e}")
+
+    def closeEvent(self, ev):
+        self._timer.stop()
+        super().closeEvent(ev)
+
+    def showEvent(self, ev):
+        self.chk_enabled.setChecked(latency_trace.enabled)
+        self._timer.start()
+        super().showEvent(ev)
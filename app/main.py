@@ -5,6 +5,7 @@ Adapted from KC's System
 
 from __future__ import annotations
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -16,12 +17,16 @@ import pyqtgraph as pg
 
 # settings / dialogs
 from instrument_app.app.settings_dialog import SettingsDialog
+from instrument_app.app.bus_stats_dialog import BusStatsDialog
+from instrument_app.app.latency_trace_dialog import LatencyTraceDialog
+from instrument_app.util.LatencyTrace import latency_trace
 
 # pages / services
 from instrument_app.pages.pressure_page import PressureInterlockPage
 from instrument_app.pages.bruker_control_page import BrukerControlPage
 from instrument_app.pages.yaml_test import YamlTestPage
 from instrument_app.services.serial_manager import SerialManager
+from instrument_app.services.replay_source import ReplaySource
 from instrument_app.services.data_recorder import DataRecorder
 
 # theming
@@ -33,8 +38,13 @@ APP_ORG = "JLab"
 APP_NAME = "MRI_Instrument_Control"
 
 
+LOG_DIR = Path.home() / "InstrumentLogs"
+# Recordings made while replaying; a subfolder, so replaying LOG_DIR never reads them back
+REPLAY_LOG_DIR = LOG_DIR / "replay_output"
+
+
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, serial=None, log_dir=None):
         super().__init__()
         self.setWindowTitle("Instrument Control")
 
@@ -45,9 +55,11 @@ class MainWindow(QMainWindow):
         self._apply_theme(theme_mgr.current)
         theme_mgr.themeChanged.connect(self._apply_theme)
 
-        # services (serial + recorder)
-        self.serial = SerialManager()
-        self.recorder = self._make_recorder()
+        # services (serial + recorder); a ReplaySource stands in for the serial port on --replay
+        self.serial = serial or SerialManager()
+        self.recorder = self._make_recorder(log_dir or LOG_DIR)
+        self._bus_stats = None
+        self._latency_trace = None
 
         # tabs
         self.tabs = QTabWidget()
@@ -87,6 +99,12 @@ class MainWindow(QMainWindow):
         act_settings = QAction("Settings…", self)
         act_settings.triggered.connect(self._open_settings)
         m_app.addAction(act_settings)
+        act_bus_stats = QAction("Serial Statistics…", self)
+        act_bus_stats.triggered.connect(self._open_bus_stats)
+        m_app.addAction(act_bus_stats)
+        act_latency = QAction("Latency Trace…", self)
+        act_latency.triggered.connect(self._open_latency_trace)
+        m_app.addAction(act_latency)
 
         # Help (as before)...
         m_help = mbar.addMenu("&Help")
@@ -97,6 +115,19 @@ class MainWindow(QMainWindow):
     def _open_settings(self):
         SettingsDialog(self).exec()
 
+    def _open_bus_stats(self):
+        # Non-modal and reused, so it can stay open while the pages poll
+        if self._bus_stats is None:
+            self._bus_stats = BusStatsDialog(self)
+        self._bus_stats.show()
+        self._bus_stats.raise_()
+
+    def _open_latency_trace(self):
+        if self._latency_trace is None:
+            self._latency_trace = LatencyTraceDialog(self)
+        self._latency_trace.show()
+        self._latency_trace.raise_()
+
     # ------------ Theme hook ------------
 
     def _apply_theme(self, t: Theme):
@@ -177,6 +208,10 @@ class MainWindow(QMainWindow):
     def closeEvent(self, ev):
         self._settings.setValue("main/geometry", self.saveGeometry())
         try:
+            # serial worker + port watcher threads
+            self.serial.close()
+            # no more readings now: write out what's queued and close the log
+            self.recorder.close()
             # give pages a chance to stop threads cleanly
             if hasattr(self.pressure, "close"):
                 self.pressure.close()
@@ -189,9 +224,8 @@ class MainWindow(QMainWindow):
 
     # ------------ Helpers ------------
 
-    def _make_recorder(self):
+    def _make_recorder(self, logdir):
         #Construct DataRecorder with a sensible default path, regardless of ctor signature.
-        logdir = Path.home() / "InstrumentLogs"
         logdir.mkdir(parents=True, exist_ok=True)
         try:
             return DataRecorder(logdir)
@@ -213,11 +247,28 @@ def main():
     QApplication.setOrganizationName(APP_ORG)
     QApplication.setApplicationName(APP_NAME)
 
-    app = QApplication(sys.argv)
-    win = MainWindow()
+    parser = argparse.ArgumentParser(prog="instrument_app")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="play back DataRecorder logs (file, folder or glob) instead of the serial port")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed: 1 = real time, N = N times faster, 0 = as fast as possible")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="trace telemetry latency from the start and write the histograms to FILE on exit")
+    args, qt_args = parser.parse_known_args(sys.argv[1:])
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    latency_trace.enabled = bool(args.trace)
+    serial = ReplaySource(LOG_DIR, speed=args.speed) if args.replay else None
+    # Replayed data is recorded away from the logs being replayed, or they'd feed on themselves
+    win = MainWindow(serial=serial, log_dir=REPLAY_LOG_DIR if args.replay else LOG_DIR)
     win.resize(1200, 800)
     win.show()
-    sys.exit(app.exec_())
+    if args.replay:
+        serial.connect(args.replay)
+    rc = app.exec_()
+    if args.trace:
+        latency_trace.dump(args.trace)
+    sys.exit(rc)
 
 
 if __name__ == "__main__":
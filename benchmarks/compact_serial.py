@@ -0,0 +1,174 @@
+"""
+Module: instrument_app.benchmarks.compact_serial
+Purpose: Round-trip latency and throughput benchmark for the Compact serial stack,
+         run against the PTY simulator (no instrument needed; Linux/macOS).
+
+Measures:
+- sendCompact: commands/s and p50/p95/p99 round-trip latency, single and 3-command frames
+- Channels: NumericMonitor/NumericSetting/TurboSetting readActual() and
+  NumericSetting/SwitchSetting writes, per-call latency percentiles
+- Monitor loop: wall time of one full loop for 5…200 channels, both one
+  readActual() per channel and coalesced through PollPlanner
+
+Usage:
+    py -m instrument_app.benchmarks.compact_serial [--out bench_compact.json]
+        [--latency 0.0005] [--iterations 500] [--channels 5 10 20 50 100 200]
+
+Results are written as JSON so runs can be diffed to catch polling-path regressions.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime
+
+from instrument_app.util.SerialComms import SerialComms
+from instrument_app.util.CompactSimulator import CompactSimulator
+from instrument_app.util.PollPlanner import PollPlanner
+
+CHANNEL_COUNTS = [5, 10, 20, 50, 100, 200]
+
+
+def percentiles(samples_s):
+    ordered = sorted(samples_s)
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e3
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1e3,
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1] * 1e3,
+    }
+
+
+def time_calls(fn, iterations):
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    result = percentiles(samples)
+    result["calls_per_s"] = iterations / elapsed
+    return result
+
+
+def bench_send(comms, iterations):
+    single = time_calls(lambda: comms.sendCompact("VACU:SRPV?"), iterations)
+    single["commands_per_s"] = single["calls_per_s"]
+    turbo = time_calls(lambda: comms.sendCompact("TP_1:MOSW?;TP_1:ROTR?;TP_1:POWR?"), iterations)
+    turbo["commands_per_s"] = turbo["calls_per_s"] * 3
+    return {"single": single, "turbo_3cmd": turbo}
+
+
+def make_channels(ch, comms, sim, count):
+    """A realistic mix: mostly voltages, a few pressures and turbos."""
+    channels = []
+    for i in range(count):
+        kind = i % 10
+        if kind == 0:
+            sim.registers.setdefault(f"VACB:P{i:03d}", "1.0E-06")
+            channels.append(ch.NumericMonitor(f"P{i}", "Vacuum", comms, f"VACB:P{i:03d}", units="Torr"))
+        elif kind == 1:
+            n = i // 10 % 2 + 1
+            channels.append(ch.TurboSetting(f"TP{i}", "Vacuum", comms,
+                                            f"TP_{n}:MOSW?;TP_{n}:ROTR?;TP_{n}:POWR", f"TP_{n}:MOSW"))
+        else:
+            sim.registers.setdefault(f"BNCH:V{i:03d}", "10.0")
+            channels.append(ch.NumericSetting(f"V{i}", "Voltages", comms, f"BNCH:V{i:03d}", f"BNCH:V{i:03d}",
+                                              '', 10.0, -100.0, 100.0, units="V"))
+    return channels
+
+
+def bench_channels(ch, comms, sim, iterations):
+    nm = ch.NumericMonitor("FL Pressure", "Vacuum", comms, "VACU:SRPV", units="Torr")
+    ns = ch.NumericSetting("V1", "Voltages", comms, "FOC1:L2V_", "FOC1:L2V_", '', 10, -40, 40, units="V")
+    tp = ch.TurboSetting("TP1", "Vacuum", comms, "TP_1:MOSW?;TP_1:ROTR?;TP_1:POWR", "TP_1:MOSW")
+    sw = ch.SwitchSetting("Mode", "Instrument", comms, "CTRL:MODE",
+                          options=["Shutdown", "Standby Instrument", "Standby", "Operate"], default_value="Standby")
+    values = iter(range(10**9))
+    return {
+        "NumericMonitor.readActual": time_calls(nm.readActual, iterations),
+        "NumericSetting.readActual": time_calls(ns.readActual, iterations),
+        "NumericSetting.valueChange": time_calls(lambda: ns.valueChange(float(next(values) % 40)), iterations),
+        "TurboSetting.readActual": time_calls(tp.readActual, iterations),
+        "SwitchSetting.switchChange": time_calls(lambda: sw.switchChange(next(values) % 4), iterations),
+    }
+
+
+def bench_monitor_loop(ch, comms, sim, counts, loops):
+    rows = []
+    for count in counts:
+        channels = make_channels(ch, comms, sim, count)
+        planner = PollPlanner(comms, channels)
+        def per_channel():
+            for channel in channels:
+                channel.readActual()
+        row = {
+            "channels": count,
+            "frames": len(planner.frames),
+            "per_channel": time_calls(per_channel, loops),
+            "planned": time_calls(planner.poll, loops),
+        }
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compact serial stack benchmark")
+    parser.add_argument("--out", default="bench_compact.json")
+    parser.add_argument("--latency", type=float, default=0.0005, help="simulated device delay per command, s")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--loops", type=int, default=10, help="monitor loops timed per channel count")
+    parser.add_argument("--channels", type=int, nargs="*", default=CHANNEL_COUNTS)
+    args = parser.parse_args(argv)
+
+    # Channels build their widgets in the constructor, so a (headless) QApplication is needed
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    import instrument_app.widgets.Channels as ch
+
+    sim = CompactSimulator(latency=args.latency)
+    port = sim.start()
+    comms = SerialComms(port=port)
+    try:
+        results = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "simulated_latency_s": args.latency,
+            "sendCompact": bench_send(comms, args.iterations),
+            "channels": bench_channels(ch, comms, sim, args.iterations),
+            "monitor_loop": bench_monitor_loop(ch, comms, sim, args.channels, args.loops),
+        }
+    finally:
+        comms.close()
+        sim.stop()
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+
+    send = results["sendCompact"]
+    print(f"sendCompact single : {send['single']['commands_per_s']:8.0f} cmd/s  "
+          f"p50 {send['single']['p50_ms']:.2f}  p95 {send['single']['p95_ms']:.2f}  p99 {send['single']['p99_ms']:.2f} ms")
+    print(f"sendCompact 3-cmd  : {send['turbo_3cmd']['commands_per_s']:8.0f} cmd/s  "
+          f"p50 {send['turbo_3cmd']['p50_ms']:.2f}  p95 {send['turbo_3cmd']['p95_ms']:.2f}  p99 {send['turbo_3cmd']['p99_ms']:.2f} ms")
+    for name, r in results["channels"].items():
+        print(f"{name:<28}: p50 {r['p50_ms']:.2f}  p95 {r['p95_ms']:.2f}  p99 {r['p99_ms']:.2f} ms")
+    print(f"{'channels':>8} {'frames':>7} {'per-channel loop':>18} {'planned loop':>14}")
+    for row in results["monitor_loop"]:
+        print(f"{row['channels']:>8} {row['frames']:>7} {row['per_channel']['p50_ms']:>15.1f} ms "
+              f"{row['planned']['p50_ms']:>11.1f} ms")
+    print(f"Wrote {args.out}")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
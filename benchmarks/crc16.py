@@ -0,0 +1,94 @@
+"""
+Module: instrument_app.benchmarks.crc16
+Purpose: Micro-benchmark for Compact request framing (CRC16 + '@' + checksum + '\\r').
+
+Compares the original bit-by-bit CRC loop against the table-driven engine and
+the per-command frame cache in SerialComms. No instrument is needed.
+
+Usage:
+    py -m instrument_app.benchmarks.crc16 [seconds_per_case]
+"""
+
+import sys
+import time
+
+from instrument_app.util.SerialComms import SerialComms
+
+# The fixed commands the monitor loops send on every poll
+POLL_COMMANDS = [
+    "VACU:SRPV?",
+    "VACU:SMPV?",
+    "TP_1:MOSW?;TP_1:ROTR?;TP_1:POWR?",
+    "TP_2:MOSW?;TP_2:ROTR?;TP_2:POWR?",
+    "FOC1:L2V_?",
+    "FUN1:RFA_?",
+]
+
+
+def crc16_bitwise(data, offset, length):
+    # The pre-table implementation, kept here as the "before" reference
+    if data is None or offset < 0 or offset > len(data)- 1 and offset+length > len(data):
+        return 0
+    crc = 0xFFFF
+    for i in range(0, length):
+        crc ^= data[offset + i] << 8
+        for j in range(0,8):
+            if (crc & 0x8000) > 0:
+                crc =(crc << 1) ^ 0x1021
+            else:
+                crc = crc << 1
+    return crc & 0xFFFF
+
+
+def frame_bitwise(message):
+    message_bytes = bytes(message, 'ascii')
+    checksum = str(hex(crc16_bitwise(message_bytes, 0, len(message_bytes)))).upper()
+    return bytes(message + "@" + checksum[2:] + "\r", 'ascii')
+
+
+def frame_table(message):
+    message_bytes = bytes(message, 'ascii')
+    checksum = format(SerialComms.crc16(message_bytes, 0, len(message_bytes)), 'X')
+    return message_bytes + b"@" + checksum.encode('ascii') + b"\r"
+
+
+def frame_cached(message):
+    return SerialComms.frameCompact(message)
+
+
+def frames_per_second(frame_fn, seconds):
+    n = 0
+    start = time.perf_counter()
+    stop = start + seconds
+    while True:
+        for command in POLL_COMMANDS:
+            frame_fn(command)
+        n += len(POLL_COMMANDS)
+        now = time.perf_counter()
+        if now >= stop:
+            return n / (now - start)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    seconds = float(argv[0]) if argv else 1.0
+
+    # All three must produce identical bytes on the wire
+    for command in POLL_COMMANDS:
+        assert frame_bitwise(command) == frame_table(command) == frame_cached(command), command
+
+    cases = [
+        ("bit-by-bit CRC", frame_bitwise),
+        ("table CRC", frame_table),
+        ("table CRC + frame cache", frame_cached),
+    ]
+    baseline = None
+    print(f"{'case':<26}{'frames/s':>14}{'speedup':>10}")
+    for name, fn in cases:
+        rate = frames_per_second(fn, seconds)
+        baseline = baseline or rate
+        print(f"{name:<26}{rate:>14,.0f}{rate / baseline:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,34 @@
 
 BAUD_RATE = 115200
-READ_PERIOD_MS = 1000          # polling cadence (1 Hz)
+SERIAL_READ_TIMEOUT_S = 0.05   # longest a read blocks, so the reader loop notices stop() quickly
+SERIAL_MAX_LINE = 4096         # bytes without a newline before the line buffer is dropped as garbage
+READING_BATCH_SIZE = 50        # readings handed to the GUI per batch at most...
+READING_BATCH_MAX_MS = 50      # ...and the longest the first of them waits for the rest
+TELEMETRY_PREFER_BINARY = False  # ask the sketch for binary frames on connect (needs a sketch that supports it)
+TELEMETRY_BINARY_CMD = "TLM BIN" # switches the sketch to binary frames (util/telemetry_frames.py)
+TELEMETRY_TEXT_CMD = "TLM TXT"   # ...and back to CSV text
+TELEMETRY_NEGOTIATE_S = 2.0      # no valid binary frame this long after asking -> stay on / fall back to text
+PORT_SCAN_INTERVAL_MS = 1500     # background serial port rescan (hot-plug detection)
+CLOCK_WINDOW_S = 5.0             # device clock alignment: offset re-estimated over windows this long
+MERGE_WINDOW_MS = 100            # multi-device merged stream: readings held this long to be put in time order
+REPLAY_MAX_GAP_S = 10.0          # log replay: longer pauses in the data are played as this long
+REPLAY_MAX_BATCHES_IN_FLIGHT = 4 # log replay: reading batches queued to the GUI before the player waits
 CSV_BASENAME = "vacuum_log"    # final name gets timestamp suffix
+RECORDER_FLUSH_ROWS = 500      # recorder writer thread flushes the CSV after this many rows...
+RECORDER_FLUSH_MS = 1000       # ...or this long after the oldest unflushed one, whichever comes first
+RECORDER_ALIVE_CHECK_S = 0.1   # DataRecorder.flush() rechecks that the writer thread is still running this often
+
+# Bruker Compact bus
+COMPACT_MAX_FRAME_COMMANDS = 8     # ';'-joined commands the controller accepts per frame
+COMPACT_MAX_FRAME_BYTES = 120      # request length limit, including '@XXXX\r'
+BUS_CLOSE_TIMEOUT_S = 5.0          # CompactBus.close(): longest wait for the bus thread to let go of the port
+POLL_TICK_MS = 50                  # how often the pages ask the scheduler what is due
+POLL_DEFAULT_PERIOD_MS = 1000      # channel base period when the YAML doesn't give one
+SETTING_CACHE_TTL_S = 30.0         # how long a written/read setpoint is trusted without a re-read
+SETTING_CACHE_TOLERANCE = 0.1      # a readback this close to the cached setpoint doesn't invalidate it...
+SETTING_CACHE_TOLERANCE_REL = 0.05 # ...nor one within this fraction of it, whichever is looser
+WRITE_INFLIGHT_TIMEOUT_S = 5.0     # a setpoint write unanswered this long no longer blocks the next one
+HV_SETTLE_TOLERANCE = 1.0          # V; an HVC_ readback this close to the setpoint counts as settled
+HV_SETTLE_TOLERANCE_REL = 0.005    # ...or within this fraction of it, whichever is looser
+HV_SETTLE_POLL_MS = 100            # readback poll interval while an HVC_ setpoint settles
+HV_SETTLE_TIMEOUT_MS = 5000        # give up (and show red) after this long
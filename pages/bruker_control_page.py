@@ -7,15 +7,18 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout,
 )
 from PyQt5.QtCore import QTimer
-from instrument_app.util import SerialComms
+from instrument_app.services.port_broker import port_broker
+from instrument_app.util.PollPlanner import PollPlanner
+from instrument_app.util.PollScheduler import PollScheduler
+from instrument_app.config.settings import POLL_TICK_MS
 import instrument_app.widgets.Channels as ch
 
 class BrukerControlPage(QWidget): 
     def __init__(self):
             super().__init__()
 
-            # Set up serial comms
-            self.ser = SerialComms.SerialComms(instrument = "compact", port = "COM3", baudrate = 115200)
+            # Set up serial comms; pages on the same port share one bus thread
+            self.ser = port_broker.acquire("COM3", instrument = "compact", baudrate = 115200)
 
             # Set up the window
             self.setWindowTitle("Vacuum Monitor")
@@ -41,20 +44,29 @@ class BrukerControlPage(QWidget):
             layout.addWidget(self.mode.gui)
             #self.setCentralWidget(central_widget)
 
+            # Turbos get read faster while they spin up/down; everything else backs off when stable
+            self.scheduler = PollScheduler()
+            self.scheduler.add(self.FLpressure, 1000)
+            self.scheduler.add(self.TOFpressure, 1000)
+            self.scheduler.add(self.TP1, 500)
+            self.scheduler.add(self.TP2, 500)
+            self.scheduler.add(self.V1, 1000)
+            self.scheduler.add(self.V2, 1000)
+
+            # Read whatever is due in as few frames as possible
+            self.poller = PollPlanner(self.ser, observer=self.scheduler.observe)
+
             # Create a timer for periodically checking the pressures and turbos
             self.timer = QTimer(self)
-            self.timer.setInterval(1000)
+            self.timer.setInterval(POLL_TICK_MS)
             self.timer.timeout.connect(self.monitor_loop)
             self.timer.start()
 
     def monitor_loop(self):
-            # Read the pressures and turbo properties
-            self.FLpressure.readActual()
-            self.TOFpressure.readActual()
-            self.TP1.readActual()
-            self.TP2.readActual()
-            self.V1.readActual()
-            self.V2.readActual()
+            # Read the pressures and turbo properties that are due
+            due = self.scheduler.due()
+            if due:
+                self.poller.poll(due)
 
     def closeEvent(self, event):
                 self.timer.stop()
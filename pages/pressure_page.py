@@ -15,11 +15,16 @@ Public API:
 - class PressureInterlockPage(QWidget)
 
 Signals / Slots:
-- Listens: SerialManager.reading, connectedChanged, status
+- Listens: SerialManager.readings, connectedChanged, portsChanged, status
 - Emits:   (none) — delegates TX via SerialManager.send_command()
 
 Changelog:
 - 2025-08-23 · 0.1.0 · KC · Refactored UI from legacy INT_Readout into modular page.
+- 2026-10-17 · 0.1.1 · Readings arrive in batches; labels/plot/recorder update once per batch.
+- 2026-10-17 · 0.1.2 · Pump dots driven by PumpStatus codes; restyled only when the status changes.
+- 2026-10-17 · 0.1.3 · Port list comes from the SerialManager's background watcher.
+- 2026-10-17 · 0.1.4 · Marks the 'delivered' latency trace stage.
+- 2026-10-17 · 0.1.5 · Warns (once) when the DataRecorder reports an error.
 """
 
 
@@ -30,12 +35,14 @@ from typing import List, Optional
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton,
-    QComboBox, QFrame, QSizePolicy
+    QComboBox, QFrame, QSizePolicy, QMessageBox
 )
 
 from instrument_app.widgets.time_pressure_plot import TimePressurePlot
 from instrument_app.services.serial_manager import SerialManager
 from instrument_app.services.data_recorder import DataRecorder
+from instrument_app.util.parsing import PumpStatus
+from instrument_app.util.LatencyTrace import latency_trace, DELIVERED
 
 # theming
 from instrument_app.theme.manager import theme_mgr
@@ -59,6 +66,8 @@ class PressureInterlockPage(QWidget):
         self._cards: List[QFrame] = []
         self._pills: List[QLabel] = []
         self._labels: List[QLabel] = []
+        self._dot_status: dict = {}   # dot -> PumpStatus currently shown
+        self._recorder_warned = False
 
         grid = QGridLayout(self)
         grid.setContentsMargins(10,8,10,10)
@@ -68,7 +77,7 @@ class PressureInterlockPage(QWidget):
         # --- top bar ---
         top = QHBoxLayout(); top.setSpacing(8)
         self.port_cb = QComboBox(); self.port_cb.setFixedHeight(36)
-        btn_refresh = self._btn("Refresh", 36, self._refresh_ports)
+        btn_refresh = self._btn("Refresh", 36, self.serial.refresh_ports)
         btn_connect = self._btn("Connect", 36, self._connect)
         btn_disconnect = self._btn("Disconnect", 36, self.serial.disconnect)
         btn_status = self._btn("STATUS", 36, lambda: self.serial.status.emit("STATUS requested"))
@@ -110,8 +119,9 @@ class PressureInterlockPage(QWidget):
         grid.setColumnStretch(2, 0)
 
         # serial signals
-        self.serial.reading.connect(self._on_reading)
+        self.serial.readings.connect(self._on_reading_batch)
         self.serial.connectedChanged.connect(self._on_connected)
+        self.serial.portsChanged.connect(self._refresh_ports)
         self.serial.status.connect(self._on_status)
 
         # theme
@@ -173,6 +183,7 @@ class PressureInterlockPage(QWidget):
             val = frame.findChildren(QLabel)[1]
             val.setStyleSheet("font:20pt 'Consolas'; background:#000; color:#ff4136; border-radius:6px; padding:4px;")
         # pump dots default (gray)
+        self._dot_status.clear()
         for dot in (self.dot_tg60, self.dot_tg220):
             dot.setStyleSheet("background:#7f8c8d; border-radius:7px; border:1px solid #1b2b34;")
         # buttons
@@ -191,15 +202,23 @@ class PressureInterlockPage(QWidget):
     # -------------------- serial handlers --------------------
 
     def _on_reading(self, r):
-        # update text
+        self._on_reading_batch([r])
+
+    def _on_reading_batch(self, batch):
+        if not batch:
+            return
+        latency_trace.mark(DELIVERED)
+        # labels and dots only need the newest reading
+        r = batch[-1]
         self.lbl_uhv.setText(f"{r.uhv_torr:.2E}  TORR" if getattr(r, "uhv_torr", None) is not None else "Sensor Off")
         self.lbl_fore.setText(f"{r.fore_torr:.2E}  TORR" if getattr(r, "fore_torr", None) is not None else "Sensor Off")
         # pump dots
-        self._set_dot(self.dot_tg220, getattr(r, "tg220", ""))
-        self._set_dot(self.dot_tg60,  getattr(r, "tg60",  ""))
-        # push to plot/recorder
-        if hasattr(self.plot, "append"): self.plot.append(r)
-        if hasattr(self.recorder, "append"): self.recorder.append(r)
+        self._set_dot(self.dot_tg220, getattr(r, "tg220", PumpStatus.UNKNOWN))
+        self._set_dot(self.dot_tg60,  getattr(r, "tg60",  PumpStatus.UNKNOWN))
+        # push the whole batch to plot/recorder
+        if hasattr(self.plot, "extend"): self.plot.extend(batch)
+        if hasattr(self.recorder, "extend"): self.recorder.extend(batch)
+        self._check_recorder()
 
     def _on_connected(self, ok: bool, tip: str):
         self.conn.setText("Connection: Connected" if ok else "Connection: Not connected")
@@ -212,18 +231,38 @@ class PressureInterlockPage(QWidget):
 
     # -------------------- helpers --------------------
 
-    def _refresh_ports(self):
+    def _check_recorder(self):
+        # The recorder writes on its own thread; its errors only show up here
+        error = getattr(self.recorder, "error", None)
+        if error is None or self._recorder_warned:
+            return
+        self._recorder_warned = True
+        path = getattr(self.recorder, "path", "the log file")
+        # show(), not exec_(): a modal box would stall the batch handler while it is open
+        box = QMessageBox(QMessageBox.Warning, "Recording error",
+                          f"Readings could not be saved to {path}:\n{error}\n\n"
+                          "The plot keeps updating; check the disk and restart to record again.",
+                          parent=self)
+        box.setAttribute(Qt.WA_DeleteOnClose)
+        box.setWindowModality(Qt.NonModal)
+        box.show()
+
+    def _refresh_ports(self, ports=None):
+        # Cached list from the port watcher; keep the current choice if it's still there
+        current = self.port_cb.currentData()
         self.port_cb.clear()
-        try:
+        if ports is None:
             ports = self.serial.available_ports()
-        except Exception:
-            ports = []
         for p in ports:
             desc = getattr(p, "description", "")
             dev  = getattr(p, "device", str(p))
             self.port_cb.addItem(f"{dev}  ({desc})", dev)
         if not ports:
             self.port_cb.addItem("No ports found", None)
+        elif current is not None:
+            idx = self.port_cb.findData(current)
+            if idx >= 0:
+                self.port_cb.setCurrentIndex(idx)
 
     def _connect(self):
         data = self.port_cb.currentData()
@@ -231,11 +270,13 @@ class PressureInterlockPage(QWidget):
             try: self.serial.connect(data)
             except Exception: pass
 
-    def _set_dot(self, dot: QLabel, status: str):
-        s = (status or "").lower()
-        if "normal" in s: color = style.GOOD
-        elif ("fault" in s) or ("alarm" in s): color = "#ff4136"
+    def _set_dot(self, dot: QLabel, status: PumpStatus):
+        if self._dot_status.get(dot) == status:
+            return
+        self._dot_status[dot] = status
+        if status == PumpStatus.NORMAL: color = style.GOOD
+        elif status >= PumpStatus.FAULT: color = "#ff4136"    # FAULT or ALARM
         else: color = style.GRAY
         dot.setStyleSheet(f"background:{color}; border-radius:7px; border:1px solid #1b2b34;")
-        dot.setToolTip(status or "Unknown")
+        dot.setToolTip(status.name.title())
 
@@ -4,7 +4,10 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QScrollArea, QSizePolicy
 )
 from PyQt5.QtCore import QTimer
-from instrument_app.util import SerialComms
+from instrument_app.services.port_broker import port_broker
+from instrument_app.util.PollPlanner import PollPlanner
+from instrument_app.util.PollScheduler import PollScheduler
+from instrument_app.config.settings import POLL_TICK_MS
 
 def load_config(filename="instrument_app\config\setup_Compact.yaml"):
     """
@@ -20,8 +23,8 @@ class YamlTestPage(QWidget):
     def __init__(self):
             super().__init__()
 
-            # Set up serial comms
-            self.ser = SerialComms.SerialComms(instrument = "compact", port = "COM3", baudrate = 115200)
+            # Set up serial comms; pages on the same port share one bus thread
+            self.ser = port_broker.acquire("COM3", instrument = "compact", baudrate = 115200)
 
             # Set up the window
             self.setWindowTitle("Vacuum Monitor")
@@ -49,6 +52,7 @@ class YamlTestPage(QWidget):
 
 
              # Create the channels
+            self.pollconfig = []    # (widget, params) for the poll scheduler
             self.channelwidgets = [] 
             channels = config_data.get('channels', {})
             for channel, params in channels.items():
@@ -89,6 +93,7 @@ class YamlTestPage(QWidget):
                         continue 
 
                     setattr(self, attr_name, widget)
+                    self.pollconfig.append((widget, params))
                     self.channelwidgets.append(widget)
 
                     # Add each widget's GUI to the layout
@@ -147,28 +152,45 @@ class YamlTestPage(QWidget):
                         continue
 
                     setattr(self, attr_name, widget)
+                    self.pollconfig.append((widget, params))
                     self.systemwidgets.append(widget)
 
                     # Add each widget's GUI to the layout
                     for widget in self.systemwidgets:
                         left_layout.addWidget(widget.gui)          
           
+            # Each channel is read on its own adaptive period (poll_period_ms in the YAML)
+            self.scheduler = PollScheduler()
+            for widget, params in self.pollconfig:
+                if isinstance(widget, (ch.NumericSetting, ch.NumericMonitor, ch.TurboSetting)):
+                    self.scheduler.add(widget, params.get('poll_period_ms'),
+                                       params.get('poll_min_ms'), params.get('poll_max_ms'))
+                    widget.setDeadband(params.get('deadband'), params.get('deadband_rel'))
+
+            # Whatever is due gets packed into as few Compact frames as possible
+            self.poller = PollPlanner(self.ser, observer=self.scheduler.observe)
+
             # Create a timer for periodically checking the pressures and turbos
             self.timer = QTimer(self)
-            self.timer.setInterval(1000)
+            self.timer.setInterval(POLL_TICK_MS)
             self.timer.timeout.connect(self.monitor_loop)
             self.timer.start()
 
     def monitor_loop(self):
-    # Combine all widgets into a single list
-        all_widgets = self.systemwidgets + self.channelwidgets
-        for widget in all_widgets:
-            if isinstance(widget, ch.NumericSetting) or isinstance(widget, ch.NumericMonitor) or isinstance(widget, ch.TurboSetting):
-                widget.readActual()
-            elif isinstance(widget, ch.SwitchSetting):
-                pass
-                #widget.readSetting()
-        print('Finished one monitor loop')
+        due = self.scheduler.due()
+        if due:
+            self.poller.poll(due)
+
+    def refresh_settings(self, force=False):
+        # Served from each channel's setpoint cache unless it has gone stale
+        for widget, _ in self.pollconfig:
+            if isinstance(widget, ch.NumericSetting):
+                widget.readSetting(force)
+
+    def showEvent(self, event):
+        # First show reads the setpoints from the device; later ones hit the cache
+        self.refresh_settings()
+        super().showEvent(event)
 
     def closeEvent(self, event):
                 self.ser.close()
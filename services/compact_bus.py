@@ -0,0 +1,180 @@
+"""
+Module: instrument_app.services.compact_bus
+Purpose: Own the Bruker Compact serial port on a dedicated thread and run every
+         transaction from a priority queue, so the GUI never blocks on the port.
+
+How it fits:
+- Depends on: PyQt (QThread/signals), instrument_app.util.SerialComms
+- Used by:    YamlTestPage, BrukerControlPage (as the COM object of every Channel),
+              PollPlanner (frame reads)
+
+Public API:
+- class CompactBus(QObject): requestCompact(message, callback, priority),
+                             requestCompactList(commands, callback, priority), close()
+- Signals: status(str)
+
+Threading model:
+- _BusWorker lives in a QThread, opens the SerialComms there and pulls requests
+  off a PriorityQueue: user writes (PRIORITY_WRITE) go before periodic reads
+  (PRIORITY_READ). Callbacks run back on the GUI thread via a queued signal.
+- A read that is already waiting in the queue is not queued a second time, so
+  a slow port can't build up a backlog of identical polls; its callback is
+  simply added to the one already waiting.
+- Every callback runs exactly once. A request the bus can't carry out (port
+  failed to open, bus closing or closed) gets a failed reply: (None, None) for
+  requestCompact, [None] * len(commands) for requestCompactList.
+
+Changelog:
+- 2026-10-17 · 0.1.0 · Initial bus thread with priority queue.
+- 2026-10-17 · 0.1.1 · Failed replies instead of dropped callbacks; bounded close().
+- 2026-10-17 · 0.1.2 · A close() that times out leaves the stop request queued for the worker.
+"""
+
+import itertools
+import queue
+import threading
+
+from PyQt5.QtCore import QObject, QThread, Qt, pyqtSignal, pyqtSlot
+
+from instrument_app.util.SerialComms import SerialComms, PRIORITY_READ
+from instrument_app.config.settings import BUS_CLOSE_TIMEOUT_S
+
+# Sorts after queued writes and before queued reads: writes are flushed on close
+_PRIORITY_STOP = 1
+
+
+def failedReply(kind, payload):
+    """What a request's callback gets when the bus couldn't answer it."""
+    return (None, None) if kind == "send" else [None] * len(payload)
+
+
+class _BusWorker(QObject):
+    completed = pyqtSignal(object, object)  # callback, result
+    status = pyqtSignal(str)
+
+    def __init__(self, requests: queue.PriorityQueue, comms_kwargs: dict):
+        super().__init__()
+        self._requests = requests
+        self._comms_kwargs = comms_kwargs
+        self._comms = None
+        self.finished = threading.Event()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            self._comms = SerialComms(**self._comms_kwargs)
+            self.status.emit(f"Connected {self._comms_kwargs.get('port')}")
+        except Exception as e:
+            self.status.emit(f"Open error: {e}")
+        try:
+            while True:
+                priority, _, kind, payload, callback = self._requests.get()
+                if kind is None:
+                    break
+                self.completed.emit(callback, self._execute(kind, payload))
+        finally:
+            if self._comms:
+                self._comms.close()
+            self._comms = None
+            self.finished.set()
+            self.status.emit("Disconnected")
+
+    def _execute(self, kind, payload):
+        if self._comms is None:
+            return failedReply(kind, payload)
+        try:
+            if kind == "send":
+                return self._comms.sendCompact(payload)
+            return self._comms.sendCompactList(payload)
+        except Exception as e:
+            self.status.emit(f"Serial error: {e}")
+            return failedReply(kind, payload)
+
+
+class CompactBus(QObject):
+    status = pyqtSignal(str)
+
+    def __init__(self, instrument="Compact", port="COM3", baudrate=115200, **kwargs):
+        super().__init__()
+        self._requests = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._pending_reads = {}      # (kind, payload) -> callbacks waiting on it
+        self._lock = threading.Lock()
+        self._closing = False
+
+        comms_kwargs = dict(instrument=instrument, port=port, baudrate=baudrate, **kwargs)
+        self._thread = QThread()
+        self._worker = _BusWorker(self._requests, comms_kwargs)
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        self._worker.completed.connect(self._deliver, Qt.QueuedConnection)
+        self._worker.status.connect(self.status)
+        self._thread.start()
+
+    # ------------ requests (GUI thread) ------------
+
+    def requestCompact(self, message, callback, priority=PRIORITY_READ):
+        self._submit(priority, "send", message, callback)
+
+    def requestCompactList(self, commands, callback, priority=PRIORITY_READ):
+        self._submit(priority, "list", tuple(commands), callback)
+
+    def _submit(self, priority, kind, payload, callback):
+        if self._closing or not self._thread.isRunning():
+            # Nobody will ever answer this; don't leave the caller waiting
+            self._deliver(callback, failedReply(kind, payload))
+            return
+        if priority >= PRIORITY_READ:
+            key = (kind, payload)
+            with self._lock:
+                if key in self._pending_reads:
+                    self._pending_reads[key].append(callback)
+                    return
+                self._pending_reads[key] = [callback]
+            callback = _ReadDone(self, key)
+        self._requests.put((priority, next(self._seq), kind, payload, callback))
+
+    def _deliver(self, callback, result):
+        if callback is not None:
+            callback(result)
+
+    def _release(self, key):
+        with self._lock:
+            return self._pending_reads.pop(key, [])
+
+    # ------------ lifecycle ------------
+
+    def close(self, timeout=BUS_CLOSE_TIMEOUT_S):
+        if self._closing:
+            return
+        self._closing = True
+        if self._thread.isRunning():
+            self._requests.put((_PRIORITY_STOP, next(self._seq), None, None, None))
+            # Outstanding user writes are sent before the port closes
+            if not self._worker.finished.wait(timeout):
+                self.status.emit(f"Bus did not stop within {timeout:g} s")
+            self._thread.quit()
+            self._thread.wait(int(timeout * 1000))
+        # Reads queued behind the stop never ran: fail them so nobody waits forever
+        while True:
+            try:
+                _, _, kind, payload, callback = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if kind is not None:
+                self._deliver(callback, failedReply(kind, payload))
+        if not self._worker.finished.is_set():
+            # Still stuck in a transaction and the drain took its stop: queue it
+            # again, so the worker stops and closes the port once that returns
+            self._requests.put((_PRIORITY_STOP, next(self._seq), None, None, None))
+
+
+class _ReadDone():
+    # Hands one read result to everyone who asked for it while it was queued
+    def __init__(self, bus, key):
+        self.bus, self.key = bus, key
+
+    def __call__(self, result):
+        for callback in self.bus._release(self.key):
+            if callback is not None:
+                callback(result)
@@ -1,14 +1,28 @@
-
 """
 Module: instrument_app.services.data_recorder
 Purpose: Single-writer CSV logger for readings with timestamped filename.
 
 How it fits:
-- Depends on: pathlib/csv, instrument_app.util.parsing.Reading
-- Used by:    PressureInterlockPage (append on each reading)
+- Depends on: pathlib/csv/threading, instrument_app.util.parsing.Reading,
+              instrument_app.util.LatencyTrace
+- Used by:    PressureInterlockPage (extend on each batch of readings),
+              MainWindow (close() on shutdown)
 
 Public API:
-- class DataRecorder(root="data"): append(Reading)
+- class DataRecorder(root="data"): append(Reading), extend([Reading, ...]), flush(), close()
+
+Threading model:
+- One writer thread owns the file, opened once and kept open. append()/extend()
+  only put the batch and its wall-clock time on a queue, so recording costs the
+  GUI thread next to nothing; the writer formats the rows and writes them.
+- The file is flushed after RECORDER_FLUSH_ROWS rows or RECORDER_FLUSH_MS,
+  whichever comes first. flush() waits until everything queued so far is on
+  disk; close() does the same, then stops the thread and closes the file.
+- A write error (disk full, file removed) is kept in `error` and the rows are
+  dropped, rather than stalling or killing the GUI. Anything else that goes
+  wrong in the writer is kept in `error` too and stops it: extend() then drops
+  the readings and flush() returns False instead of waiting for it. The page
+  checks `error` and tells the user.
 
 Notes:
 - FOR MRI CONVERSION: Switch out turbo names and how to talk to them, add enough for all turbos
@@ -16,14 +30,34 @@ Notes:
 
 Changelog:
 - 2025-08-23 · 0.1.0 · KC · Initial CSV writer with header + timestamped file.
+- 2026-10-17 · 0.1.1 · extend() writes a batch of readings with one open.
+- 2026-10-17 · 0.1.2 · Pump status columns hold the PumpStatus name (NORMAL/FAULT/ALARM/UNKNOWN).
+- 2026-10-17 · 0.1.3 · Marks the 'recorded' latency trace stage.
+- 2026-10-17 · 0.2.0 · Background writer thread, persistent file handle, batched flushes.
+- 2026-10-17 · 0.2.1 · Writer failures recorded in `error`; flush() doesn't hang on a dead writer.
+- 2026-10-17 · 0.2.2 · Status columns back to the sketch's tokens ("TG220 NORMAL", empty when
+                       unknown), the format before 0.1.2. Logs written by 0.1.2-0.2.1 hold
+                       bare PumpStatus names; parse_recorder_csv reads both.
 """
 
 
 import csv
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from instrument_app.util.parsing import Reading
-from instrument_app.config.settings import CSV_BASENAME
+from instrument_app.util.parsing import Reading, PumpStatus
+from instrument_app.config.settings import (
+    CSV_BASENAME, RECORDER_FLUSH_ROWS, RECORDER_FLUSH_MS, RECORDER_ALIVE_CHECK_S
+)
+from instrument_app.util.LatencyTrace import latency_trace, RECORDED
+
+HEADER = ["Timestamp","Elapsed_s","UHV_Torr","Foreline_Torr","TG220_Status","TG60_Status"]
+
+# Status cells as the sketch sends them, so existing log consumers keep working
+_TG220_TOKENS = {s: f"TG220 {s.name}" if s != PumpStatus.UNKNOWN else "" for s in PumpStatus}
+_TG60_TOKENS = {s: f"TG60 {s.name}" if s != PumpStatus.UNKNOWN else "" for s in PumpStatus}
 
 class DataRecorder:
     def __init__(self, root="data"):
@@ -31,10 +65,99 @@ class DataRecorder:
         self.root.mkdir(parents=True, exist_ok=True)
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.path = self.root / f"{CSV_BASENAME}_{ts}.csv"
-        with self.path.open("w", newline="") as f:
-            csv.writer(f).writerow(["Timestamp","Elapsed_s","UHV_Torr","Foreline_Torr","TG220_Status","TG60_Status"])
+        self.error = None
+        self._file = self.path.open("w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(HEADER)
+        self._file.flush()
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="DataRecorder", daemon=True)
+        self._thread.start()
 
     def append(self, r: Reading):
-        with self.path.open("a", newline="") as f:
-            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            csv.writer(f).writerow([ts, r.t_s, r.uhv_torr, r.fore_torr, r.tg220, r.tg60])
+        self.extend((r,))
+
+    def extend(self, readings):
+        if self._closed:
+            return
+        self._queue.put((time.time(), readings, latency_trace.current()))
+
+    def flush(self, timeout=None) -> bool:
+        """Wait until everything queued so far is written and flushed; False on timeout or a dead writer."""
+        if self._closed or not self._thread.is_alive():
+            return self.error is None
+        done = threading.Event()
+        self._queue.put(done)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # Waited in slices: if the writer dies meanwhile, nobody will ever set `done`
+        while True:
+            wait = RECORDER_ALIVE_CHECK_S if deadline is None else min(RECORDER_ALIVE_CHECK_S, deadline - time.monotonic())
+            if done.wait(max(wait, 0.0)):
+                return True
+            if not self._thread.is_alive():
+                return done.is_set()
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    # ------------ writer thread ------------
+
+    def _run(self):
+        pending = 0              # rows written since the last flush
+        stamps = []              # latency trace stamps of those rows
+        due = None               # when they have to be flushed by
+        last_sec, last_ts = None, ""
+        try:
+            while True:
+                timeout = None if due is None else max(due - time.monotonic(), 0.0)
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = ()    # flush deadline reached
+                if isinstance(item, tuple) and item:
+                    wall, readings, trace = item
+                    sec = int(wall)
+                    if sec != last_sec:
+                        last_sec, last_ts = sec, datetime.fromtimestamp(sec).strftime("%Y-%m-%d %H:%M:%S")
+                    self._write([last_ts, r.t_s, r.uhv_torr, r.fore_torr,
+                                 _TG220_TOKENS[r.tg220], _TG60_TOKENS[r.tg60]]
+                                for r in readings)
+                    pending += len(readings)
+                    if trace:
+                        stamps.extend(trace)
+                    if due is None:
+                        due = time.monotonic() + RECORDER_FLUSH_MS / 1000
+                    if pending < RECORDER_FLUSH_ROWS:
+                        continue
+                self._flush_file()
+                latency_trace.mark(RECORDED, stamps)
+                pending, stamps, due = 0, [], None
+                if item is None:
+                    return
+                if isinstance(item, threading.Event):
+                    item.set()
+        except Exception as e:
+            # Not an I/O error (those are kept by _write/_flush_file): stop recording, say why
+            self.error = e
+            self._closed = True
+        finally:
+            self._file.close()
+
+    def _write(self, rows):
+        try:
+            self._writer.writerows(rows)
+        except (OSError, ValueError) as e:
+            self.error = e
+
+    def _flush_file(self):
+        try:
+            self._file.flush()
+        except (OSError, ValueError) as e:
+            self.error = e
@@ -0,0 +1,98 @@
+"""
+Module: instrument_app.services.port_broker
+Purpose: Process-wide registry of Compact connections. Every page that asks for
+         the same port shares one CompactBus; the port closes when the last
+         user releases its handle.
+
+How it fits:
+- Depends on: instrument_app.services.compact_bus.CompactBus
+- Used by:    YamlTestPage, BrukerControlPage (instead of opening their own port)
+
+Public API:
+- port_broker (module singleton): acquire(port, baudrate=..., **kwargs) -> CompactHandle
+- class CompactHandle: requestCompact(...), requestCompactList(...), status, close()
+
+Notes:
+- The shared CompactBus runs one transaction at a time on its own thread, so
+  users of the same port are serialized without any extra locking here.
+- A second acquire() with a different baud rate is refused rather than
+  silently reusing the first one's settings.
+
+Changelog:
+- 2026-10-17 · 0.1.0 · Reference-counted shared connections per port.
+- 2026-10-17 · 0.1.1 · Requests on a closed handle get a failed reply instead of being dropped.
+"""
+
+import threading
+
+from instrument_app.services.compact_bus import CompactBus, failedReply
+from instrument_app.util.SerialComms import PRIORITY_READ
+
+
+class CompactHandle:
+    """One user's reference to a shared connection; quacks like the CompactBus."""
+
+    def __init__(self, broker: "PortBroker", port: str, bus: CompactBus):
+        self._broker = broker
+        self.port = port
+        self._bus = bus
+
+    @property
+    def status(self):
+        return self._bus.status
+
+    @property
+    def closed(self) -> bool:
+        return self._bus is None
+
+    def requestCompact(self, message, callback, priority=PRIORITY_READ):
+        if self._bus is not None:
+            self._bus.requestCompact(message, callback, priority)
+        elif callback is not None:
+            callback(failedReply("send", message))
+
+    def requestCompactList(self, commands, callback, priority=PRIORITY_READ):
+        if self._bus is not None:
+            self._bus.requestCompactList(commands, callback, priority)
+        elif callback is not None:
+            callback(failedReply("list", commands))
+
+    def close(self):
+        # Safe to call more than once; only the first call gives the reference back
+        if self._bus is not None:
+            self._bus = None
+            self._broker._release(self.port)
+
+
+class PortBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buses = {}      # port -> (CompactBus, refcount, baudrate)
+
+    def acquire(self, port: str, baudrate: int = 115200, **kwargs) -> CompactHandle:
+        with self._lock:
+            entry = self._buses.get(port)
+            if entry is None:
+                bus = CompactBus(port=port, baudrate=baudrate, **kwargs)
+                entry = (bus, 0, baudrate)
+            bus, refs, open_baud = entry
+            if open_baud != baudrate:
+                raise ValueError(f"{port} is already open at {open_baud} baud")
+            self._buses[port] = (bus, refs + 1, open_baud)
+            return CompactHandle(self, port, bus)
+
+    def _release(self, port: str):
+        with self._lock:
+            bus, refs, baud = self._buses[port]
+            if refs > 1:
+                self._buses[port] = (bus, refs - 1, baud)
+                return
+            del self._buses[port]
+        bus.close()
+
+    def open_ports(self):
+        with self._lock:
+            return {port: refs for port, (_, refs, _) in self._buses.items()}
+
+
+port_broker = PortBroker()
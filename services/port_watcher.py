@@ -0,0 +1,93 @@
+"""
+Module: instrument_app.services.port_watcher
+Purpose: Enumerate serial ports off the GUI thread and keep a cached, hot-plug-aware
+         list, so nothing in the UI ever waits on list_ports.comports().
+
+How it fits:
+- Depends on: pyserial (serial.tools.list_ports), PyQt (QThread/QTimer/signals)
+- Used by:    SerialManager (available_ports(), portsChanged), PressureInterlockPage
+
+Public API:
+- class PortWatcher(QObject): ports (cached list), refresh(), stop()
+- Signals: portsChanged(list)
+
+Threading model:
+- _PortScanner lives in its own QThread and rescans every PORT_SCAN_INTERVAL_MS.
+  portsChanged is only emitted when the set of devices changes (or after an
+  explicit refresh()), and arrives on the GUI thread as a queued signal.
+
+Changelog:
+- 2026-10-17 · 0.1.0 · Initial background port watcher.
+"""
+
+from PyQt5.QtCore import QObject, QThread, QTimer, Qt, pyqtSignal, pyqtSlot
+from serial.tools import list_ports
+
+from instrument_app.config.settings import PORT_SCAN_INTERVAL_MS
+
+
+class _PortScanner(QObject):
+    scanned = pyqtSignal(list)
+
+    def __init__(self, interval_ms):
+        super().__init__()
+        self._interval_ms = interval_ms
+        self._timer = None
+        self._last = None
+
+    @pyqtSlot()
+    def start(self):
+        # Created here so the timer belongs to the scanner thread
+        self._timer = QTimer()
+        self._timer.timeout.connect(self.scan)
+        self._timer.start(self._interval_ms)
+        self.scan(True)
+
+    @pyqtSlot()
+    def stop(self):
+        if self._timer:
+            self._timer.stop()
+
+    @pyqtSlot()
+    @pyqtSlot(bool)
+    def scan(self, force=False):
+        try:
+            ports = sorted(list_ports.comports(), key=lambda p: getattr(p, "device", str(p)))
+        except Exception:
+            ports = []
+        key = [(getattr(p, "device", str(p)), getattr(p, "description", "")) for p in ports]
+        if force or key != self._last:
+            self._last = key
+            self.scanned.emit(ports)
+
+
+class PortWatcher(QObject):
+    portsChanged = pyqtSignal(list)
+    _rescan = pyqtSignal(bool)
+    _halt = pyqtSignal()
+
+    def __init__(self, interval_ms=PORT_SCAN_INTERVAL_MS):
+        super().__init__()
+        self.ports = []
+        self._thread = QThread()
+        self._scanner = _PortScanner(interval_ms)
+        self._scanner.moveToThread(self._thread)
+        self._thread.started.connect(self._scanner.start)
+        self._scanner.scanned.connect(self._on_scanned, Qt.QueuedConnection)
+        self._rescan.connect(self._scanner.scan, Qt.QueuedConnection)
+        self._halt.connect(self._scanner.stop, Qt.QueuedConnection)
+        self._thread.start()
+
+    def refresh(self):
+        """Rescan now; portsChanged follows even if nothing changed."""
+        self._rescan.emit(True)
+
+    def stop(self):
+        if self._thread.isRunning():
+            self._halt.emit()
+            self._thread.quit()
+            self._thread.wait()
+
+    def _on_scanned(self, ports):
+        self.ports = ports
+        self.portsChanged.emit(ports)
@@ -0,0 +1,226 @@
+"""
+Module: instrument_app.services.replay_source
+Purpose: Play DataRecorder CSV logs (vacuum_log_*.csv) back through the same
+         interface as SerialManager, at real time, N× or as fast as possible, so
+         the pressure page, plot and recorder can be load-tested and field issues
+         reproduced without the vacuum system.
+
+How it fits:
+- Depends on: numpy, PyQt (QThread/signals), instrument_app.util.parsing (parse_recorder_csv)
+- Used by:    MainWindow (`py -m instrument_app --replay PATH [--speed N]`),
+              PressureInterlockPage (drop-in for SerialManager)
+
+Public API:
+- class ReplaySource(QObject): connect(source), disconnect(), set_speed(float),
+                               send_command(str), available_ports(), refresh_ports(), close()
+- Signals: readings(list[Reading]), reading(Reading), connectedChanged(bool, str),
+           portsChanged(list), status(str)
+- def recording_files(source) -> list[Path]; load_recordings(paths) -> np.ndarray
+
+Playback:
+- `source` is a CSV file, a directory (all vacuum_log_*.csv in it, oldest first)
+  or a glob pattern. The "ports" offered to the page are the logs in `root`.
+- speed 1.0 is real time, N plays N× faster, 0 as fast as the GUI keeps up.
+  Timing follows Elapsed_s; a jump backwards (next file, sketch reboot) counts as
+  no gap and any gap longer than REPLAY_MAX_GAP_S is shortened to it.
+- Readings are delivered in batches like SerialManager's. At most
+  REPLAY_MAX_BATCHES_IN_FLIGHT are queued to the GUI at once, so fast playback
+  can't outrun the event loop.
+
+Changelog:
+- 2026-10-17 · 0.1.0 · Initial replay backend.
+- 2026-10-17 · 0.1.1 · Batches carry emit stamps for the latency trace.
+- 2026-10-17 · 0.1.2 · Replay is left out of the latency trace again: its stamps timed the
+                       player, not the serial path the trace is about.
+- 2026-10-17 · 0.1.3 · Batches still queued from a stopped or replaced player are dropped.
+"""
+
+from __future__ import annotations
+
+import glob
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from instrument_app.config.settings import (
+    CSV_BASENAME, READING_BATCH_SIZE, READING_BATCH_MAX_MS, REPLAY_MAX_GAP_S, REPLAY_MAX_BATCHES_IN_FLIGHT
+)
+from instrument_app.util.parsing import READING_DTYPE, parse_recorder_csv, array_to_readings
+
+
+def recording_files(source) -> list[Path]:
+    p = Path(source)
+    if p.is_dir():
+        return sorted(p.glob(f"{CSV_BASENAME}_*.csv"))
+    if p.is_file():
+        return [p]
+    return sorted(Path(f) for f in glob.glob(str(source)))
+
+
+def load_recordings(paths) -> np.ndarray:
+    arrays = [parse_recorder_csv(Path(p).read_bytes()) for p in paths]
+    return np.concatenate(arrays) if arrays else np.zeros(0, dtype=READING_DTYPE)
+
+
+def playback_offsets(t_s: np.ndarray, max_gap_s: float = REPLAY_MAX_GAP_S) -> np.ndarray:
+    """Seconds from the first reading at which each reading is played (at 1×)."""
+    dt = np.diff(t_s, prepend=t_s[:1])
+    dt[~(dt > 0)] = 0.0        # backwards jumps and NaN
+    np.minimum(dt, max_gap_s, out=dt)
+    return np.cumsum(dt)
+
+
+class _ReplayWorker(QObject):
+    readings = pyqtSignal(list)
+    playing = pyqtSignal(str)      # source, once loaded
+    done = pyqtSignal()            # played to the end
+    status = pyqtSignal(str)
+
+    def __init__(self, source, speed: float, credits: threading.Semaphore):
+        super().__init__()
+        self._source = source
+        self.speed = speed
+        self._credits = credits
+        self._stopping = False
+
+    def stop(self):
+        self._stopping = True
+
+    def run(self):
+        try:
+            files = recording_files(self._source)
+            data = load_recordings(files)
+        except Exception as e:
+            self.status.emit(f"Replay error: {e}")
+            return
+        if not len(data):
+            self.status.emit(f"Replay: no readings in {self._source}")
+            return
+        self.status.emit(f"Replay: {len(data)} readings from {len(files)} file(s)")
+        self.playing.emit(str(self._source))
+        self._play(data, playback_offsets(data["t_s"]))
+        if not self._stopping:
+            self.status.emit("Replay finished")
+            self.done.emit()
+
+    def _play(self, data, offsets):
+        n = len(data)
+        pos = 0
+        speed = self.speed
+        w0 = time.monotonic()
+        while pos < n and not self._stopping:
+            if self.speed != speed:
+                # Speed changed: carry on from the current position at the new rate
+                speed = self.speed
+                w0 = time.monotonic() - (offsets[pos] / speed if speed else 0.0)
+            if speed:
+                due = int(np.searchsorted(offsets, (time.monotonic() - w0) * speed, side="right"))
+            else:
+                due = n
+            end = min(due, pos + READING_BATCH_SIZE)
+            if end > pos:
+                # Wait for the GUI to take earlier batches before queueing more
+                if not self._credits.acquire(timeout=READING_BATCH_MAX_MS / 1000):
+                    continue
+                self.readings.emit(array_to_readings(data[pos:end]))
+                pos = end
+                continue
+            wait = offsets[pos] / speed - (time.monotonic() - w0)
+            time.sleep(min(max(wait, 0.0), READING_BATCH_MAX_MS / 1000))
+
+
+class ReplaySource(QObject):
+    connectedChanged = pyqtSignal(bool, str)
+    readings = pyqtSignal(list)
+    reading = pyqtSignal(object)
+    portsChanged = pyqtSignal(list)
+    status = pyqtSignal(str)
+
+    def __init__(self, root=None, speed: float = 1.0):
+        super().__init__()
+        self.root = Path(root) if root else Path.home() / "InstrumentLogs"
+        self.speed = speed
+        self._thread = None
+        self._worker = None
+        self._retiring = []
+
+    # ------------ SerialManager-compatible surface ------------
+
+    def available_ports(self):
+        # The recordings stand in for ports: every log plus "all of them"
+        files = recording_files(self.root) if self.root.is_dir() else []
+        ports = [SimpleNamespace(device=str(f), description="replay") for f in files]
+        if len(files) > 1:
+            ports.insert(0, SimpleNamespace(device=str(self.root), description=f"replay all {len(files)} logs"))
+        return ports
+
+    def refresh_ports(self):
+        self.portsChanged.emit(self.available_ports())
+
+    def connect(self, source):
+        self.disconnect()
+        credits = threading.Semaphore(REPLAY_MAX_BATCHES_IN_FLIGHT)
+        thread = QThread()
+        worker = _ReplayWorker(source, self.speed, credits)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.readings.connect(lambda batch, w=worker, c=credits: self._on_readings(w, batch, c))
+        worker.status.connect(self.status)
+        worker.playing.connect(lambda src, w=worker: self._on_playing(w, src))
+        worker.done.connect(lambda w=worker: self._on_done(w))
+        self._thread, self._worker = thread, worker
+        thread.start()
+
+    def set_speed(self, speed: float):
+        self.speed = speed
+        if self._worker:
+            self._worker.speed = speed
+
+    def send_command(self, cmd: str):
+        self.status.emit(f"TX ignored (replay): {cmd.strip().upper()}")
+
+    def set_binary_telemetry(self, on: bool):
+        pass
+
+    def disconnect(self):
+        thread, worker = self._thread, self._worker
+        self._thread = self._worker = None
+        if worker:
+            worker.stop()
+            thread.quit()
+            self._retiring.append(thread)
+            thread.finished.connect(lambda t=thread: self._on_retired(t))
+        self.connectedChanged.emit(False, "Disconnected")
+
+    def close(self):
+        self.disconnect()
+        for thread in list(self._retiring):
+            thread.wait()
+        self._retiring = []
+
+    # ------------ internals ------------
+
+    def _on_playing(self, worker, source):
+        if worker is self._worker:
+            self.connectedChanged.emit(True, f"Replay {source}")
+
+    def _on_done(self, worker):
+        if worker is self._worker:
+            self.connectedChanged.emit(False, "Replay finished")
+
+    def _on_retired(self, thread):
+        self._retiring = [t for t in self._retiring if t is not thread]
+
+    def _on_readings(self, worker, batch: list, credits):
+        credits.release()
+        if worker is not self._worker:
+            return    # queued before disconnect() or connect() replaced that player
+        # No latency_trace.begin(): replayed readings never crossed the port, so not traced
+        self.readings.emit(batch)
+        if self.receivers(self.reading):
+            for r in batch:
+                self.reading.emit(r)
@@ -4,42 +4,118 @@
 ##################     PROBABLY SWITCH OUT/MESH WITH BOSS'S SERIAL COMMS CODE
 
 Module: instrument_app.services.serial_manager
-Purpose: Threaded serial I/O for the Arduino. Periodically reads lines, parses them,
+Purpose: Threaded serial I/O for the Arduino. Reads lines as they arrive, parses them,
          emits structured readings, and provides a thread-safe send_command().
 
 How it fits:
-- Depends on: pyserial, PyQt (QThread/QTimer), instrument_app.util.parsing
+- Depends on: pyserial, PyQt (QThread), instrument_app.util.parsing,
+              instrument_app.services.port_watcher, instrument_app.util.LatencyTrace
 - Used by:    PressureInterlockPage (subscribe to signals), MainWindow (lifecycle)
 
 Public API:
-- class SerialManager(QObject): connect(port), disconnect(), send_command(str)
-- Signals: reading(Reading), connectedChanged(bool, str), status(str)
+- class SerialManager(QObject): connect(port), disconnect(), send_command(str, device),
+                               add_device(name, port, baud, binary), remove_device(name),
+                               devices(), device_stats(), to_host_time(name, t_s),
+                               set_binary_telemetry(bool), available_ports(),
+                               refresh_ports(), close()
+- Signals: readings(list[Reading]), reading(Reading), connectedChanged(bool, str),
+           deviceReadings(str, list[Reading]), deviceConnectedChanged(str, bool, str),
+           merged(list[(host_t, device, Reading)]), portsChanged(list), status(str)
 
 Threading model:
 - Worker (SerialWorker) lives in a QThread; GUI never blocks on I/O.
+- connect()/disconnect() return immediately. The port counts as connected
+  (connectedChanged(True)) once the first valid reading arrives, which replaces
+  the fixed wait for the Arduino to reset. A disconnected worker finishes in the
+  background; a new connect() opens its port once the old thread has let go.
+- Port enumeration runs in a PortWatcher thread; available_ports() is its cache.
+- The worker runs a reader loop in that thread: every chunk of bytes is appended
+  to a line buffer and each complete line is parsed and emitted immediately, so
+  the sketch can stream at 10–100 Hz. Reads time out after SERIAL_READ_TIMEOUT_S
+  so stop() takes effect promptly; the loop closes the port on its way out.
+- Readings cross to the GUI thread in batches (readings signal), flushed after
+  READING_BATCH_SIZE readings or READING_BATCH_MAX_MS, whichever comes first.
+  The per-reading `reading` signal is still emitted for anyone connected to it.
+
+Multiple devices:
+- Every add_device() gets its own SerialWorker and QThread, so a slow or stalled
+  controller never holds up the others. connect()/disconnect()/readings/reading/
+  connectedChanged are the PRIMARY_DEVICE ("main") and behave as before.
+- The worker stamps each reading with time.monotonic() as its bytes arrive; a
+  DeviceClock per device maps Reading.t_s onto that host clock and tracks the
+  device's sample rate, clock drift and delivery delay (device_stats()).
+- deviceReadings is emitted per device as soon as a batch arrives. merged carries
+  all devices in aligned host-time order; it holds readings for MERGE_WINDOW_MS so
+  a later batch from another device can still slot in, and costs nothing while
+  nobody is connected to it.
+
+Telemetry modes:
+- text:    CSV lines, parse_arduino_line (the default, and always the fallback).
+- binary:  fixed-size frames from util/telemetry_frames, decoded in bulk.
+  set_binary_telemetry(True) sends TELEMETRY_BINARY_CMD through send_command and
+  the worker waits for the first valid frame; text lines are still parsed
+  meanwhile, so an older sketch that ignores the command just stays on text
+  (reported after TELEMETRY_NEGOTIATE_S). If frames stop for that long later
+  (e.g. the Arduino reset) the worker goes back to accepting text as well.
 
 Changelog:
 - 2025-08-23 · 0.1.0 · KC · Added write_line/send_command and signal wiring.
+- 2026-10-17 · 0.2.0 · Event-driven reader loop replaces the 1 Hz QTimer readline.
+- 2026-10-17 · 0.2.1 · Batched reading delivery (readings signal).
+- 2026-10-17 · 0.3.0 · Negotiated binary telemetry mode with text fallback.
+- 2026-10-17 · 0.3.1 · Asynchronous connect/disconnect, background port discovery.
+- 2026-10-17 · 0.4.0 · Multiple devices, one worker thread each; host-clock aligned merged stream.
+- 2026-10-17 · 0.4.1 · Readings stamped when their bytes are read; latency_trace hooks.
+- 2026-10-17 · 0.4.2 · An overlong partial line is dropped even when it follows a complete one.
 """
 
 
+import threading
+import time
+from bisect import bisect_right
+from itertools import repeat
+from operator import itemgetter
+
 from PyQt5.QtCore import QObject, pyqtSignal, QThread, QTimer
-from serial.tools import list_ports
 import serial
-from time import sleep
-from instrument_app.util.parsing import parse_arduino_line, Reading
-from instrument_app.config.settings import BAUD_RATE, READ_PERIOD_MS
+from instrument_app.services.port_watcher import PortWatcher
+from instrument_app.util.device_clock import DeviceClock
+from instrument_app.util.LatencyTrace import latency_trace, PARSED
+from instrument_app.util.parsing import parse_arduino_line, array_to_readings, Reading
+from instrument_app.util.telemetry_frames import SYNC, decode_frames
+from instrument_app.config.settings import (
+    BAUD_RATE, SERIAL_READ_TIMEOUT_S, SERIAL_MAX_LINE, READING_BATCH_SIZE, READING_BATCH_MAX_MS,
+    TELEMETRY_PREFER_BINARY, TELEMETRY_BINARY_CMD, TELEMETRY_TEXT_CMD, TELEMETRY_NEGOTIATE_S,
+    MERGE_WINDOW_MS
+)
+
+# SerialWorker telemetry modes
+MODE_TEXT, MODE_NEGOTIATING, MODE_BINARY = "text", "negotiating", "binary"
+
+# Device name connect()/disconnect()/readings refer to
+PRIMARY_DEVICE = "main"
 
 class SerialWorker(QObject):
-    reading = pyqtSignal(object)  # Reading
+    readings = pyqtSignal(list, list)   # [Reading, ...], [host monotonic arrival time, ...]
+    connected = pyqtSignal(str)   # port, on the first valid reading
     status  = pyqtSignal(str)
     
-    def __init__(self, port, baud):
+    def __init__(self, port, baud, binary=False):
         super().__init__()
         self._port, self._baud = port, baud
+        self._binary_on_connect = binary
+        self.mode = MODE_TEXT
+        self._mode_t0 = None         # when negotiation started / last binary frame arrived
         self._ser = None
-        self._timer = QTimer()
-        self._timer.timeout.connect(self._poll_once)
+        self._stopping = False
+        self._running = False
+        self._tx_lock = threading.Lock()   # write_line is called from the GUI thread
+        self._batch = []
+        self._stamps = []            # time.monotonic() each reading's bytes came in
+        self._t_rx = 0.0             # ...for the chunk being drained
+        self._batch_t0 = 0.0
+        self._live = False           # seen a valid reading yet
+        self._synced = False         # dropped the (possibly partial) first line
     
     def write_line(self, line: str):
         try:
@@ -47,79 +123,353 @@ class SerialWorker(QObject):
                 self.status.emit("TX ignored: not connected")
                 return
             msg = (line.strip().upper() + "\n").encode("ascii", errors="ignore")
-            self._ser.write(msg)
-            self._ser.flush()
+            with self._tx_lock:
+                self._ser.write(msg)
+                self._ser.flush()
             self.status.emit(f">> {line.strip().upper()}")
         except Exception as e:
             self.status.emit(f"TX error: {e}")
 
     def start(self):
+        self._running = True
         try:
-            self._ser = serial.Serial(self._port, self._baud, timeout=2)
-            sleep(1.2)
-            self._ser.reset_input_buffer()
-            self.status.emit(f"Connected {self._port}")
-            self._timer.start(READ_PERIOD_MS)
+            self._ser = serial.Serial(self._port, self._baud, timeout=SERIAL_READ_TIMEOUT_S)
+            # No fixed wait for the Arduino reset: boot noise simply doesn't parse,
+            # and the port counts as connected at the first valid reading
+            self.status.emit(f"Opened {self._port}, waiting for data")
         except Exception as e:
             self.status.emit(f"Open error: {e}")
+            self._running = False
+            self._close_port()
+            return
+        self._read_loop()
 
     def stop(self):
-        self._timer.stop()
+        # Called from the GUI thread: the reader loop sees the flag within one read
+        # timeout and closes the port itself; if it never started, close here.
+        self._stopping = True
+        if not self._running:
+            self._close_port()
+
+    def request_binary(self, on: bool):
+        # The command itself goes out via write_line; this just tells the reader what to expect
+        self._mode_t0 = time.monotonic()
+        self.mode = MODE_NEGOTIATING if on else MODE_TEXT
+
+    def _read_loop(self):
+        buf = bytearray()
         try:
-            if self._ser: 
-               self._ser.close()
+            while not self._stopping:
+                try:
+                    chunk = self._ser.read(max(1, self._ser.in_waiting))
+                except Exception as e:
+                    self.status.emit(f"Serial error: {e}")
+                    break
+                if chunk:
+                    self._t_rx = time.monotonic()
+                    buf += chunk
+                    if self.mode == MODE_BINARY:
+                        self._drain_binary(buf)
+                    elif self.mode == MODE_NEGOTIATING and SYNC in buf:
+                        # Text up to the first frame, frames from there on
+                        self._drain_text(buf, buf.find(SYNC))
+                        del buf[:buf.find(SYNC)]
+                        self._drain_binary(buf)
+                    else:
+                        self._drain_text(buf)
+                self._check_mode()
+                if self._batch and (not chunk or time.monotonic() - self._batch_t0 >= READING_BATCH_MAX_MS / 1000):
+                    self._flush_batch()
         finally:
-            self._ser = None
-            self.status.emit("Disconnected")
+            self._flush_batch()
+            self._running = False
+            self._close_port()
+
+    def _drain_text(self, buf: bytearray, limit: int = None):
+        end = buf.rfind(b"\n", 0, len(buf) if limit is None else limit)
+        if end >= 0:
+            lines = buf[:end].split(b"\n")
+            del buf[:end + 1]
+            if not self._synced:
+                lines = lines[1:]    # opened mid-line or mid-boot; start at a line boundary
+                self._synced = True
+            for line in lines:
+                self._handle_line(line)
+        # Checked after the complete lines are gone, so noise trailing a good line is caught too
+        if limit is None and len(buf) > SERIAL_MAX_LINE:
+            buf.clear()   # no newline in sight: noise or wrong baud rate
 
-    def _poll_once(self):
-        if not self._ser:
+    def _drain_binary(self, buf: bytearray):
+        arr, used = decode_frames(buf)
+        del buf[:used]
+        if not len(arr):
+            return
+        latency_trace.record(PARSED, time.monotonic() - self._t_rx, len(arr))
+        if not self._live:
+            self._went_live()
+        if self.mode != MODE_BINARY:
+            self.mode = MODE_BINARY
+            self.status.emit("Telemetry: binary")
+        self._mode_t0 = time.monotonic()
+        if not self._batch:
+            self._batch_t0 = self._mode_t0
+        self._batch.extend(array_to_readings(arr))
+        self._stamps.extend([self._t_rx] * len(arr))
+        if len(self._batch) >= READING_BATCH_SIZE:
+            self._flush_batch()
+
+    def _check_mode(self):
+        # While binary is wanted, text lines are still parsed whenever no frames
+        # are coming; this only reports the fallback (once) and leaves binary mode
+        if self.mode == MODE_TEXT or self._mode_t0 is None:
+            return
+        if time.monotonic() - self._mode_t0 < TELEMETRY_NEGOTIATE_S:
             return
+        if self.mode == MODE_NEGOTIATING:
+            self.status.emit("Telemetry: no binary frames, using text")
+        else:
+            self.status.emit("Telemetry: binary frames stopped, accepting text")
+            self.mode = MODE_NEGOTIATING
+        self._mode_t0 = None
+
+    def _handle_line(self, line: bytes):
         try:
-            raw = self._ser.readline().decode(errors="replace")
-            r = parse_arduino_line(raw)
-            if r: 
-                self.reading.emit(r)
+            r = parse_arduino_line(line.decode(errors="replace"))
+            if r:
+                latency_trace.record(PARSED, time.monotonic() - self._t_rx)
+                if not self._live:
+                    self._went_live()
+                if not self._batch:
+                    self._batch_t0 = time.monotonic()
+                self._batch.append(r)
+                self._stamps.append(self._t_rx)
+                if len(self._batch) >= READING_BATCH_SIZE:
+                    self._flush_batch()
         except Exception as e:
             self.status.emit(f"Serial error: {e}")
 
+    def _went_live(self):
+        self._live = True
+        self.status.emit(f"Connected {self._port}")
+        self.connected.emit(self._port)
+        # Only now is the sketch listening (it was still booting when the port opened)
+        if self._binary_on_connect and self.mode == MODE_TEXT:
+            self.write_line(TELEMETRY_BINARY_CMD)
+            self.request_binary(True)
+
+    def _flush_batch(self):
+        if self._batch:
+            batch, self._batch = self._batch, []
+            stamps, self._stamps = self._stamps, []
+            self.readings.emit(batch, stamps)
+
+    def _close_port(self):
+        ser, self._ser = self._ser, None
+        try:
+            if ser:
+                ser.close()
+        finally:
+            if ser:
+                self.status.emit("Disconnected")
+
+class _Device:
+    """One port on the manager: its worker/thread and the clock that aligns its readings."""
+    def __init__(self, name, port, baud, binary):
+        self.name, self.port, self.baud, self.binary = name, port, baud, binary
+        self.thread = None
+        self.worker = None
+        self.clock = DeviceClock()
+        self.connected = False
+        self.last_host_t = None
+
 class SerialManager(QObject):
     connectedChanged = pyqtSignal(bool, str)
+    readings = pyqtSignal(list)
     reading = pyqtSignal(object)
+    deviceConnectedChanged = pyqtSignal(str, bool, str)  # device, connected, port/message
+    deviceReadings = pyqtSignal(str, list)               # device, [Reading, ...]
+    merged = pyqtSignal(list)                            # [(host_t, device, Reading), ...] in host time order
+    portsChanged = pyqtSignal(list)
     status  = pyqtSignal(str)
 
     def __init__(self):
         super().__init__()
-        self._thread = None
-        self._worker = None
+        self._devices = {}           # name -> _Device
+        self._retiring = []          # (thread, worker) still shutting down after disconnect()
+        self._pending = {}           # name -> _Device waiting for a retiring worker to free its port
+        self._merge_buf = []
+        self._merge_timer = QTimer(self)
+        self._merge_timer.setInterval(MERGE_WINDOW_MS)
+        self._merge_timer.timeout.connect(self._flush_merged)
+        self.prefer_binary = TELEMETRY_PREFER_BINARY
+        self.port_watcher = PortWatcher()
+        self.port_watcher.portsChanged.connect(self.portsChanged)
+
+    def available_ports(self):
+        # Cached by the watcher thread; never enumerates on the caller's thread
+        return list(self.port_watcher.ports)
 
-    @staticmethod
-    def available_ports():
-        return list(list_ports.comports())
+    def refresh_ports(self):
+        self.port_watcher.refresh()
+
+    # ------------ primary device (the pressure page's single port) ------------
 
     def connect(self, port: str):
-        self.disconnect()
-        self._thread = QThread()
-        self._worker = SerialWorker(port, BAUD_RATE)
-        self._worker.moveToThread(self._thread)
-        self._thread.started.connect(self._worker.start)
-        self._worker.reading.connect(self.reading)
-        self._worker.status.connect(self.status)
-        self._thread.start()
-        self.connectedChanged.emit(True, port)
-
-    def send_command(self, cmd: str):
-        if self._worker and self._thread and self._thread.isRunning():
-            self._worker.write_line(cmd)
-        else:
-            self.status.emit("TX ignored: not connected")
-            
+        self.add_device(PRIMARY_DEVICE, port)
+
     def disconnect(self):
-        if self._worker:
-            self._worker.stop()
-        if self._thread:
-            self._thread.quit()
-            self._thread.wait()
-        self._thread = None
-        self._worker = None
-        self.connectedChanged.emit(False, "Disconnected")
+        self.remove_device(PRIMARY_DEVICE)
+
+    # ------------ devices ------------
+
+    def add_device(self, name: str, port: str, baud: int = BAUD_RATE, binary: bool = None):
+        """Open `port` as device `name` (replacing whatever that name had) in its own thread."""
+        self.remove_device(name)
+        dev = _Device(name, port, baud, self.prefer_binary if binary is None else binary)
+        self._devices[name] = dev
+        if any(w._port == port for _, w in self._retiring):
+            self._pending[name] = dev
+            self.status.emit(f"Connecting {port}…")
+            return
+        self._start_worker(dev)
+
+    def remove_device(self, name: str):
+        # Non-blocking: the reader loop notices stop() within one read timeout,
+        # closes the port and its thread finishes on its own
+        self._pending.pop(name, None)
+        dev = self._devices.pop(name, None)
+        if name == PRIMARY_DEVICE:
+            self.connectedChanged.emit(False, "Disconnected")
+        if dev is None:
+            return
+        thread, worker = dev.thread, dev.worker
+        dev.thread = dev.worker = None
+        if worker:
+            worker.stop()
+            thread.quit()
+            self._retiring.append((thread, worker))
+            thread.finished.connect(lambda t=thread: self._on_retired(t))
+        if dev.connected:
+            self.deviceConnectedChanged.emit(name, False, "Disconnected")
+
+    def devices(self) -> list:
+        return list(self._devices)
+
+    def device_stats(self) -> dict:
+        """Per device: port, connected, samples, rate_hz, drift_ppm, delay_ms, last_age_s."""
+        now = time.monotonic()
+        out = {}
+        for name, dev in self._devices.items():
+            st = dev.clock.stats()
+            st.update(port=dev.port, connected=dev.connected,
+                      last_age_s=None if dev.last_host_t is None else now - dev.last_host_t)
+            out[name] = st
+        return out
+
+    def to_host_time(self, name: str, device_t: float) -> float:
+        """A device timestamp (Reading.t_s) on the host monotonic clock."""
+        return self._devices[name].clock.to_host(device_t)
+
+    def _start_worker(self, dev: _Device):
+        thread = QThread()
+        worker = SerialWorker(dev.port, dev.baud, binary=dev.binary)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.start)
+        worker.readings.connect(lambda batch, stamps, w=worker: self._on_readings(w, batch, stamps))
+        worker.status.connect(self._status_for(dev.name))
+        worker.connected.connect(lambda p, w=worker: self._on_worker_connected(w, p))
+        dev.thread, dev.worker = thread, worker
+        thread.start()
+
+    def _status_for(self, name: str):
+        if name == PRIMARY_DEVICE:
+            return self.status
+        return lambda msg: self.status.emit(f"[{name}] {msg}")
+
+    def _device_of(self, worker):
+        for dev in self._devices.values():
+            if dev.worker is worker:
+                return dev
+        return None
+
+    def _on_worker_connected(self, worker, port: str):
+        dev = self._device_of(worker)
+        if dev is None:
+            return
+        dev.connected = True
+        self.deviceConnectedChanged.emit(dev.name, True, port)
+        if dev.name == PRIMARY_DEVICE:
+            self.connectedChanged.emit(True, port)
+
+    def _on_readings(self, worker, batch: list, stamps: list):
+        dev = self._device_of(worker)
+        if dev is None:
+            return    # queued from a worker that has since been removed
+        clock = dev.clock
+        aligned = [clock.observe(r.t_s, t) for r, t in zip(batch, stamps)]
+        dev.last_host_t = stamps[-1]
+        # Each device's readings go out as soon as they arrive; only the merged
+        # stream waits (MERGE_WINDOW_MS) so it can be put in order
+        self.deviceReadings.emit(dev.name, batch)
+        if dev.name == PRIMARY_DEVICE:
+            # Receivers run synchronously here, so their trace marks see these stamps
+            latency_trace.begin(stamps)
+            try:
+                self.readings.emit(batch)
+                # Per-reading fan-out only if something still listens to it
+                if self.receivers(self.reading):
+                    for r in batch:
+                        self.reading.emit(r)
+            finally:
+                latency_trace.end()
+        if self.receivers(self.merged):
+            self._merge_buf.extend(zip(aligned, repeat(dev.name), batch))
+            if not self._merge_timer.isActive():
+                self._merge_timer.start()
+
+    def _flush_merged(self):
+        # Anything older than the merge window can't be overtaken by a late
+        # batch from another device any more
+        cutoff = time.monotonic() - MERGE_WINDOW_MS / 1000
+        self._merge_buf.sort(key=itemgetter(0))
+        n = bisect_right([t for t, _, _ in self._merge_buf], cutoff)
+        if n:
+            out, self._merge_buf = self._merge_buf[:n], self._merge_buf[n:]
+            self.merged.emit(out)
+        if not self._merge_buf:
+            self._merge_timer.stop()
+
+    def send_command(self, cmd: str, device: str = PRIMARY_DEVICE):
+        dev = self._devices.get(device)
+        if dev and dev.worker and dev.thread and dev.thread.isRunning():
+            dev.worker.write_line(cmd)
+        else:
+            self._status_for(device)("TX ignored: not connected")
+
+    def set_binary_telemetry(self, on: bool):
+        """Ask every sketch for binary frames (or back to text); each falls back to text on its own."""
+        self.prefer_binary = on
+        for dev in self._devices.values():
+            dev.binary = on
+            self.send_command(TELEMETRY_BINARY_CMD if on else TELEMETRY_TEXT_CMD, dev.name)
+            if dev.worker:
+                dev.worker.request_binary(on)
+
+    def _on_retired(self, thread):
+        self._retiring = [(t, w) for t, w in self._retiring if t is not thread]
+        busy = {w._port for _, w in self._retiring}
+        for name, dev in list(self._pending.items()):
+            if dev.port not in busy:
+                del self._pending[name]
+                self._start_worker(dev)
+
+    def close(self):
+        """App shutdown: stop everything and wait for the threads (bounded by the read timeout)."""
+        self.disconnect()
+        for name in list(self._devices):
+            self.remove_device(name)
+        self._merge_timer.stop()
+        for thread, _ in list(self._retiring):
+            thread.wait()
+        self._retiring = []
+        self.port_watcher.stop()
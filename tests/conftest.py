@@ -0,0 +1,34 @@
+"""
+Shared pytest setup.
+
+The tests import the app as `instrument_app`, the way it runs (`py -m instrument_app`
+from the folder above it). When the checkout sits under another folder name, the
+package is registered under that name here so the imports still resolve.
+
+    py -m pytest instrument_app/tests
+"""
+
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+if importlib.util.find_spec("instrument_app") is None:
+    spec = importlib.util.spec_from_file_location(
+        "instrument_app", ROOT / "__init__.py", submodule_search_locations=[str(ROOT)])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["instrument_app"] = module
+    spec.loader.exec_module(module)
+
+# Widgets and QObjects need an application object; no display required
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,93 @@
+import asyncio
+import os
+
+import pytest
+
+from instrument_app.util import AsyncSerialComms as async_module
+from instrument_app.util.AsyncSerialComms import AsyncSerialComms
+from instrument_app.util.BusStats import TransactionStats
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="the Compact simulator needs a pseudo-terminal")
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = TransactionStats()
+    monkeypatch.setattr(async_module, "bus_stats", stats)
+    return stats
+
+
+def make_sim(**kwargs):
+    from instrument_app.util.CompactSimulator import CompactSimulator
+    sim = CompactSimulator(**kwargs)
+    sim.start()
+    return sim
+
+
+def run(sim, body, **kwargs):
+    async def main():
+        comms = AsyncSerialComms(port=sim.port, **kwargs)
+        await comms.open()
+        try:
+            return await body(comms)
+        finally:
+            await comms.close()
+    try:
+        return asyncio.run(main())
+    finally:
+        sim.stop()
+
+
+def test_pipelined_requests_matched_by_echo(stats):
+    sim = make_sim(latency=0.05)
+
+    async def body(comms):
+        futures = [comms.send('VACU:SRPV?'), comms.send('TP_1:MOSW?;TP_1:ROTR?'), comms.send('VACU:SMPV?')]
+        await asyncio.sleep(0.02)
+        in_flight = len(comms._pending)     # all three written before the first reply
+        return in_flight, await asyncio.gather(*futures)
+
+    in_flight, replies = run(sim, body)
+    assert in_flight == 3
+    assert replies == [['1.20E-03'], ['1', '100'], ['3.40E-07']]
+    rows = {row['name']: row for row in stats.snapshot()}
+    assert rows['TP_1:ROTR']['count'] == 1 and rows['TP_1:ROTR']['timeouts'] == 0
+
+
+def test_unanswered_command_times_out(stats):
+    sim = make_sim()
+
+    async def body(comms):
+        return await comms.send('VACU:SRPV?;NONE:NONE?', timeout=0.2)
+
+    assert run(sim, body) == ['1.20E-03', None]
+    rows = {row['name']: row for row in stats.snapshot()}
+    assert rows['NONE:NONE']['timeouts'] == 1
+    assert rows['VACU:SRPV']['timeouts'] == 0
+
+
+def test_late_reply_does_not_confirm_next_write(stats):
+    sim = make_sim(latencies={'FOC1:L2V_': 0.3})
+
+    async def body(comms):
+        first = await comms.send('FOC1:L2V_=5.0', timeout=0.1)
+        second = await comms.send('FOC1:L2V_=7.0', timeout=1.0)
+        return first, second
+
+    first, second = run(sim, body)
+    assert first == [None]
+    assert second == ['7.0']
+
+
+def test_corrupted_reply_booked_as_crc_error(stats):
+    sim = make_sim()
+
+    async def body(comms):
+        future = comms.send('NONE:NONE?', timeout=0.3)
+        await asyncio.sleep(0.05)
+        os.write(sim._master, b'NONE:NONE?1@0000\r')
+        return await future
+
+    assert run(sim, body) == [None]
+    row = {row['name']: row for row in stats.snapshot()}['NONE:NONE']
+    assert (row['crc_errors'], row['timeouts']) == (1, 0)
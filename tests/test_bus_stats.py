@@ -0,0 +1,47 @@
+import pytest
+
+from instrument_app.util.BusStats import TransactionStats, OK, TIMEOUT, CRC_ERROR
+
+
+def test_register_preallocates_and_reset_keeps_names():
+    stats = TransactionStats()
+    stats.register(['VACU:SRPV', 'TP_1:MOSW'])
+    assert {row['name'] for row in stats.snapshot()} == {'VACU:SRPV', 'TP_1:MOSW'}
+    stats.record('VACU:SRPV', 0.002, 16, 20)
+    stats.reset()
+    rows = {row['name']: row for row in stats.snapshot()}
+    assert set(rows) == {'VACU:SRPV', 'TP_1:MOSW'}
+    assert rows['VACU:SRPV']['count'] == 0
+
+
+def test_counts_statuses_bytes_and_rejects():
+    stats = TransactionStats()
+    stats.record('A', 0.001, 10, 12, OK)
+    stats.record('A', 0.25, 10, 0, TIMEOUT)
+    stats.record('A', 0.002, 10, 0, CRC_ERROR)
+    stats.reject('A')
+    row = stats.snapshot()[0]
+    assert (row['count'], row['timeouts'], row['crc_errors'], row['rejected']) == (3, 1, 1, 1)
+    assert (row['bytes_out'], row['bytes_in']) == (30, 12)
+    assert row['max_ms'] == pytest.approx(250.0)
+
+
+def test_percentiles_bucketed_and_capped_at_max():
+    stats = TransactionStats()
+    for _ in range(99):
+        stats.record('A', 0.0015, 1, 1)
+    stats.record('A', 0.003, 1, 1)
+    row = stats.snapshot()[0]
+    assert row['p50_ms'] == pytest.approx(2.0)
+    assert row['p95_ms'] <= row['max_ms'] == pytest.approx(3.0)
+
+
+def test_busiest_first_and_disabled():
+    stats = TransactionStats()
+    stats.record('slow', 0.1, 1, 1)
+    stats.record('fast', 0.001, 1, 1)
+    assert [row['name'] for row in stats.snapshot()] == ['slow', 'fast']
+    stats.enabled = False
+    stats.record('other', 0.1, 1, 1)
+    stats.reject('other')
+    assert len(stats.snapshot()) == 2
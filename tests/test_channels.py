@@ -0,0 +1,167 @@
+import pytest
+
+import instrument_app.widgets.Channels as ch
+
+
+class FakeCOM():
+    """Answers requests right away: reads from `registers`, writes echo back."""
+    def __init__(self, registers=None):
+        self.registers = dict(registers or {})
+        self.sent = []
+
+    def requestCompact(self, message, callback, priority=None):
+        self.sent.append(message)
+        if '=' in message:
+            name, value = message.split('=', 1)
+            self.registers[name] = value
+            callback(([value], [message]))
+        else:
+            value = self.registers.get(message.rstrip('?'))
+            callback((None, None) if value is None else ([value], [f'{message}{value}']))
+
+
+@pytest.fixture
+def setting(qapp):
+    com = FakeCOM({'FOC1:L2V_': '10.0'})
+    return ch.NumericSetting('V1', 'Voltages', com, 'FOC1:L2V_', 'FOC1:L2V_', '', 10, -40, 40)
+
+
+def test_read_setting_served_from_cache(setting):
+    setting.readSetting()
+    setting.readSetting()
+    assert setting.COM.sent == ['FOC1:L2V_?']
+    assert setting.cachedSetting() == ['10.0']
+
+
+def test_read_setting_goes_to_wire_when_stale_or_forced(setting):
+    setting.readSetting()
+    setting.readSetting(force=True)
+    setting._setting_time -= setting.setting_ttl + 1
+    setting.readSetting()
+    assert setting.COM.sent.count('FOC1:L2V_?') == 3
+
+
+def test_write_fills_cache_from_echo(setting):
+    setting.write('12.5')
+    assert setting.cachedSetting() == ['12.5']
+
+
+def test_close_readback_keeps_cache_far_readback_invalidates(setting):
+    setting.readSetting()
+    setting.parse(['10.04'])
+    assert setting.cachedSetting() == ['10.0']
+    setting.parse(['25.0'])
+    assert setting.cachedSetting() is None
+
+
+def test_turbo_readback_compared_on_shared_prefix(qapp):
+    turbo = ch.TurboSetting('TP1', 'Vacuum', FakeCOM(), 'TP_1:MOSW?;TP_1:ROTR?;TP_1:POWR', 'TP_1:MOSW')
+    turbo.cacheSetting(['1'])
+    assert turbo.agreesWithSetting(['1', '100', '12'])
+    assert not turbo.agreesWithSetting(['0', '100', '12'])
+
+
+@pytest.fixture
+def monitor(qapp):
+    monitor = ch.NumericMonitor('P', 'Vacuum', FakeCOM(), 'VACU:SRPV')
+    monitor.painted = []
+    monitor.gui.updateReadback = monitor.painted.append
+    return monitor
+
+
+def test_changed_without_deadband_only_on_new_text(monitor):
+    monitor.parse(['1.0'])
+    monitor.parse(['1.0'])
+    monitor.parse(['1.1'])
+    assert monitor.painted == [['1.0'], ['1.1']]
+
+
+def test_absolute_and_relative_deadband(monitor):
+    monitor.setDeadband(absolute=0.5)
+    monitor.parse(['10.0'])
+    assert not monitor.changed(['10.4'])
+    assert monitor.changed(['10.6'])
+    monitor.setDeadband(relative=0.1)
+    assert not monitor.changed(['10.9'])
+    assert monitor.changed(['11.5'])
+
+
+def test_deadband_non_numeric_and_length_changes(monitor):
+    monitor.setDeadband(absolute=100)
+    monitor.parse(['1', '100', '12'])
+    assert monitor.changed(['ERR', '100', '12'])
+    assert monitor.changed(['1', '100'])
+
+
+def test_setpoint_change_forces_next_readback_repaint(setting):
+    setting.painted = []
+    setting.gui.updateReadback = setting.painted.append
+    setting.parse(['10.0'])
+    setting.parse(['10.0'])
+    setting.valueChange(12.0)
+    assert setting.gui.value == 12.0
+    setting.parse(['10.0'])
+    assert setting.painted == [['10.0'], ['10.0']]
+
+
+class HeldCOM(FakeCOM):
+    """Keeps write callbacks until answer() is called, like a busy bus."""
+    def __init__(self):
+        super().__init__()
+        self.held = []
+
+    def requestCompact(self, message, callback, priority=None):
+        self.sent.append(message)
+        self.held.append((message, callback))
+
+    def answer(self, reply=True):
+        message, callback = self.held.pop(0)
+        value = message.split('=', 1)[1]
+        callback(([value], [message]) if reply else (None, None))
+
+
+@pytest.fixture
+def held_setting(qapp):
+    return ch.NumericSetting('V1', 'Voltages', HeldCOM(), 'FOC1:L2V_', 'FOC1:L2V_', '', 10, -40, 40)
+
+
+def test_coalescer_sends_only_newest_pending(held_setting):
+    com, writer = held_setting.COM, held_setting.writer
+    for value in ('1.0', '2.0', '3.0', '4.0'):
+        writer.submit(value)
+    com.answer()
+    com.answer()
+    assert com.sent == ['FOC1:L2V_=1.0', 'FOC1:L2V_=4.0']
+    assert writer.dropped == 2 and not writer.inflight
+    assert held_setting.cachedSetting() == ['4.0']
+
+
+def test_coalescer_failed_write_frees_slot(held_setting):
+    com, writer = held_setting.COM, held_setting.writer
+    writer.submit('1.0')
+    com.answer(reply=False)
+    assert not writer.inflight
+    writer.submit('2.0')
+    assert com.sent[-1] == 'FOC1:L2V_=2.0'
+
+
+def test_coalescer_unanswered_write_times_out(held_setting):
+    com, writer = held_setting.COM, held_setting.writer
+    writer.timeout_s = 0.0
+    writer.submit('1.0')
+    writer.submit('2.0')
+    assert com.sent == ['FOC1:L2V_=1.0', 'FOC1:L2V_=2.0']
+    com.answer()            # late answer to the abandoned write is ignored
+    assert writer.inflight
+    com.answer()
+    assert not writer.inflight
+
+
+def test_switch_write_echo_shown(qapp, capsys):
+    switch = ch.SwitchSetting('Mode', 'Instrument', FakeCOM(), 'CTRL:MODE',
+                              options=['Shutdown', 'Standby', 'Operate'], default_value='Shutdown')
+    switch.switchChange(2)
+    assert switch.gui.value.currentIndex() == 2
+    switch.switchChange(0)
+    assert switch.gui.value.currentIndex() == 0
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,74 @@
+import os
+import time
+
+import pytest
+
+from instrument_app.services.compact_bus import CompactBus
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="the Compact simulator needs a pseudo-terminal")
+
+
+def wait_for(app, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+@pytest.fixture
+def sim():
+    from instrument_app.util.CompactSimulator import CompactSimulator
+    sim = CompactSimulator()
+    sim.start()
+    yield sim
+    sim.stop()
+
+
+def test_read_and_shared_identical_reads(qapp, sim):
+    bus = CompactBus(port=sim.port)
+    got = []
+    bus.requestCompact('VACU:SRPV?', got.append)
+    bus.requestCompact('VACU:SRPV?', got.append)
+    bus.requestCompactList(['TP_1:MOSW?', 'TP_1:ROTR?'], got.append)
+    assert wait_for(qapp, lambda: len(got) == 3)
+    bus.close()
+    assert got[0][0] == ['1.20E-03'] and got[1][0] == ['1.20E-03']
+    assert got[2] == ['1', '100']
+
+
+def test_requests_after_close_fail_immediately(qapp, sim):
+    bus = CompactBus(port=sim.port)
+    bus.close()
+    got = []
+    bus.requestCompact('VACU:SRPV?', got.append)
+    bus.requestCompactList(['A?', 'B?'], got.append)
+    assert got == [(None, None), [None, None]]
+
+
+def test_open_failure_fails_requests(qapp):
+    bus = CompactBus(port='/dev/does-not-exist')
+    got = []
+    bus.requestCompact('VACU:SRPV?', got.append)
+    assert wait_for(qapp, lambda: got)
+    bus.close()
+    assert got == [(None, None)]
+
+
+def test_close_timeout_still_stops_worker(qapp):
+    import pty, select
+    # A port nobody answers on: the worker sits in a 0.6 s read
+    master, slave = pty.openpty()
+    try:
+        bus = CompactBus(port=os.ttyname(slave), response_timeout=0.6)
+        got = []
+        bus.requestCompact('VACU:SRPV?', got.append)
+        assert select.select([master], [], [], 2)[0]    # request is on the wire
+        bus.requestCompact('TP_1:MOSW?', got.append)    # queued behind it
+        bus.close(timeout=0.1)
+        assert got == [(None, None)]
+        assert wait_for(qapp, lambda: not bus._thread.isRunning(), timeout=2)
+        assert wait_for(qapp, lambda: len(got) == 2)
+    finally:
+        os.close(master)
+        os.close(slave)
@@ -0,0 +1,37 @@
+from instrument_app.util import CompactParser
+from instrument_app.util.SerialComms import SerialComms
+
+
+def reply(text):
+    # The controller answers like a request frame: text + '@' + CRC + '\r'
+    return SerialComms.frameCompact(text)
+
+
+def test_typed_and_text_values():
+    data = reply('TP_1:MOSW?1') + reply('TP_1:ROTR?100') + reply('VACU:SRPV?1.20E-03') + reply('CTRL:NAME?abc')
+    commands = ['TP_1:MOSW?', 'TP_1:ROTR?', 'VACU:SRPV?', 'CTRL:NAME?']
+    values, bad = CompactParser.parseReplies(data, commands)
+    assert values == [1, 100, 1.2e-3, 'abc'] and bad == 0
+    text, _ = CompactParser.parseReplies(data, commands, typed=False)
+    assert text == ['1', '100', '1.20E-03', 'abc']
+
+
+def test_missing_reply_and_leading_padding():
+    data = b'\x06' + reply('A:B?1') + b'\x00' + reply('C:D?3')
+    sizes = [None] * 3
+    values, bad = CompactParser.parseReplies(data, ['A:B?', 'X:Y?', 'C:D?'], False, sizes)
+    assert values == ['1', None, '3'] and bad == 0
+    assert sizes[0] == len(reply('A:B?1')) and sizes[1] is None
+
+
+def test_bad_checksum_counted_and_skipped():
+    good = reply('A:B?1')
+    corrupt = reply('C:D?3').replace(b'C:D?3', b'C:D?4')
+    values, bad = CompactParser.parseReplies(good + corrupt, ['A:B?', 'C:D?'], False)
+    assert values == ['1', None] and bad == 1
+
+
+def test_unrelated_echo_ignored():
+    values, bad = CompactParser.parseReplies(reply('Z:Z?9') + reply('A:B?1'), ['A:B?'], False)
+    assert values == ['1'] and bad == 0
+
@@ -0,0 +1,92 @@
+import csv
+import threading
+import time
+
+import pytest
+
+from instrument_app.services import data_recorder
+from instrument_app.services.data_recorder import DataRecorder, HEADER
+from instrument_app.util.parsing import PumpStatus, Reading
+
+
+def reading(t):
+    return Reading(t, 1e-8, 2e-3, PumpStatus.NORMAL, PumpStatus.FAULT)
+
+
+def rows(recorder):
+    with recorder.path.open(newline="") as f:
+        return list(csv.reader(f))
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    rec = DataRecorder(tmp_path)
+    yield rec
+    rec.close()
+
+
+def test_flush_writes_queued_rows(recorder):
+    recorder.extend([reading(0.0), reading(0.5)])
+    recorder.append(reading(1.0))
+    assert recorder.flush(timeout=2)
+    lines = rows(recorder)
+    assert lines[0] == HEADER
+    assert [line[1] for line in lines[1:]] == ["0.0", "0.5", "1.0"]
+    assert lines[1][4:] == ["TG220 NORMAL", "TG60 FAULT"]
+    assert recorder.error is None
+
+
+def test_flushes_on_row_count(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_recorder, "RECORDER_FLUSH_ROWS", 2)
+    monkeypatch.setattr(data_recorder, "RECORDER_FLUSH_MS", 60_000)
+    rec = DataRecorder(tmp_path)
+    try:
+        rec.extend([reading(0.0), reading(1.0)])
+        deadline = time.monotonic() + 2
+        while len(rows(rec)) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(rows(rec)) == 3
+    finally:
+        rec.close()
+
+
+def test_close_is_final(recorder):
+    recorder.extend([reading(0.0)])
+    recorder.close()
+    recorder.close()
+    recorder.extend([reading(1.0)])
+    assert recorder.flush()
+    assert len(rows(recorder)) == 2
+    assert recorder._file.closed
+
+
+def test_write_error_is_kept(recorder):
+    recorder._file.close()     # e.g. the disk went away
+    recorder.extend([reading(0.0)])
+    recorder.flush(timeout=2)
+    assert isinstance(recorder.error, ValueError)
+
+
+def test_flush_returns_when_writer_died(recorder):
+    recorder.extend([object()])    # not a Reading: the writer thread fails on it
+    done = []
+    waiter = threading.Thread(target=lambda: done.append(recorder.flush()), daemon=True)
+    waiter.start()
+    waiter.join(2)
+    assert done == [False]
+    assert isinstance(recorder.error, AttributeError)
+    # Dead writer: later readings are dropped and flush answers straight away
+    recorder.extend([reading(0.0)])
+    assert recorder.flush() is False
+
+
+def test_log_reads_back(recorder):
+    from instrument_app.util.parsing import array_to_readings, parse_recorder_csv
+    recorder.extend([reading(0.0), Reading(1.0, None, 2e-3, PumpStatus.UNKNOWN, PumpStatus.ALARM)])
+    recorder.flush(timeout=2)
+    assert rows(recorder)[2][2] == "" and rows(recorder)[2][4] == ""
+    back = array_to_readings(parse_recorder_csv(recorder.path.read_bytes()))
+    assert [(r.t_s, r.uhv_torr, r.tg220, r.tg60) for r in back] == [
+        (0.0, 1e-8, PumpStatus.NORMAL, PumpStatus.FAULT),
+        (1.0, None, PumpStatus.UNKNOWN, PumpStatus.ALARM),
+    ]
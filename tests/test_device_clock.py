@@ -0,0 +1,48 @@
+import pytest
+
+from instrument_app.util.device_clock import DeviceClock
+
+
+def feed(clock, n=200, rate_hz=10.0, offset=100.0, drift=0.0, delay=lambda i: 0.0):
+    out = []
+    for i in range(n):
+        device_t = i / rate_hz
+        host_t = offset + device_t * (1.0 + drift) + delay(i)
+        out.append((device_t, host_t, clock.observe(device_t, host_t)))
+    return out
+
+
+def test_offset_found_from_fastest_sample():
+    clock = DeviceClock(window_s=1.0)
+    # Most samples sit in a buffer for 20-50 ms, every tenth arrives straight away
+    feed(clock, delay=lambda i: 0.0 if i % 10 == 0 else 0.02 + 0.03 * (i % 3) / 2)
+    assert clock.to_host(5.0) == pytest.approx(105.0, abs=1e-6)
+
+
+def test_aligned_never_after_arrival():
+    clock = DeviceClock(window_s=1.0)
+    for device_t, host_t, aligned in feed(clock, delay=lambda i: 0.01 * (i % 7)):
+        assert aligned <= host_t
+
+
+def test_drift_in_ppm():
+    clock = DeviceClock(window_s=1.0)
+    feed(clock, n=400, drift=100e-6)
+    assert clock.stats()['drift_ppm'] == pytest.approx(100.0, rel=1e-3)
+
+
+def test_rate_and_samples():
+    clock = DeviceClock(window_s=1.0)
+    feed(clock, n=50, rate_hz=20.0)
+    stats = clock.stats()
+    assert stats['samples'] == 50
+    assert stats['rate_hz'] == pytest.approx(20.0)
+
+
+def test_device_restart_resets():
+    clock = DeviceClock(window_s=1.0)
+    feed(clock, n=100, offset=100.0)
+    # Sketch rebooted: its uptime starts again from zero, 500 s later
+    assert clock.observe(0.0, 600.0) == 600.0
+    assert clock.stats()['samples'] == 1
+    assert clock.to_host(1.0) == pytest.approx(601.0)
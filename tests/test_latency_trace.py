@@ -0,0 +1,80 @@
+import json
+import threading
+import time
+
+from instrument_app.util.LatencyTrace import LatencyTrace, PARSED, DELIVERED, PLOTTED, RECORDED, STAGES
+
+
+def counts(trace):
+    return {row['stage']: row['count'] for row in trace.snapshot()}
+
+
+def test_disabled_records_nothing():
+    trace = LatencyTrace()
+    trace.begin([time.monotonic()])
+    assert trace.current() is None
+    trace.mark(DELIVERED)
+    trace.record(PARSED, 0.001)
+    trace.end()
+    assert set(counts(trace).values()) == {0}
+
+
+def test_mark_uses_batch_context_only_inside_begin_end():
+    trace = LatencyTrace()
+    trace.enabled = True
+    stamps = [time.monotonic() - 0.01] * 3
+    trace.begin(stamps)
+    assert trace.current() is stamps
+    trace.mark(DELIVERED)
+    trace.mark(PLOTTED)
+    trace.end()
+    assert trace.current() is None
+    trace.mark(PLOTTED)      # outside a batch: not counted
+    rows = {row['stage']: row for row in trace.snapshot()}
+    assert (rows[DELIVERED]['count'], rows[PLOTTED]['count']) == (3, 3)
+    assert rows[DELIVERED]['mean_ms'] >= 10.0
+    assert [row['stage'] for row in trace.snapshot()] == list(STAGES)
+
+
+def test_mark_with_stamps_taken_to_another_thread():
+    trace = LatencyTrace()
+    trace.enabled = True
+    trace.begin([time.monotonic()] * 2)
+    stamps = trace.current()
+    trace.end()
+    worker = threading.Thread(target=trace.mark, args=(RECORDED, stamps))
+    worker.start()
+    worker.join()
+    assert counts(trace)[RECORDED] == 2
+
+
+def test_parsed_from_many_reader_threads():
+    trace = LatencyTrace()
+    trace.enabled = True
+
+    def reader():
+        for _ in range(5000):
+            trace.record(PARSED, 0.0005)
+            trace.record(PARSED, 0.002, 3)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    row = trace.snapshot()[0]
+    assert row['count'] == 4 * 5000 * 4
+    assert sum(row['histogram']) == row['count']
+
+
+def test_dump_and_reset(tmp_path):
+    trace = LatencyTrace()
+    trace.enabled = True
+    trace.record(PARSED, 0.001)
+    path = tmp_path / "trace.json"
+    trace.dump(path)
+    report = json.loads(path.read_text())
+    assert report['stages'][0]['count'] == 1
+    assert len(report['bucket_edges_ms']) + 1 == len(report['stages'][0]['histogram'])
+    trace.reset()
+    assert counts(trace)[PARSED] == 0
@@ -0,0 +1,75 @@
+import math
+
+from instrument_app.util.parsing import (
+    PumpStatus, Reading, parse_arduino_line, parse_arduino_block, parse_recorder_csv,
+    readings_to_array, array_to_readings,
+)
+
+LINES = [
+    "Time_s,UHV,Fore,x,y,TG220,TG60",
+    "# comment",
+    "",
+    "0,0.0,0.0,a,b,TG220 NORMAL,TG60 NORMAL",
+    "1.5,1.2E-08 Torr,3.4E-03 Torr,a,b,TG220 FAULT,TG60 ALARM",
+    "2,5x,1e-3,a,b,TG220 Normal,TG60 ?",
+    "3,OFF,, a, b, TG220 ALARM, TG60 NORMAL",
+    "4,1e-7,2e-3,a,b,c,d,TG220 NORMAL,TG60 FAULT",
+    "5,1e-7,2e-3",
+    "bad,1,2",
+    "6,1",
+    "7,1.2.3,0.0,a,b,TG220 NORMAL,TG60 NORMAL",
+]
+
+
+def as_tuple(r):
+    nan_none = lambda v: None if v is None or (isinstance(v, float) and math.isnan(v)) else v
+    return (r.t_s, nan_none(r.uhv_torr), nan_none(r.fore_torr), int(r.tg220), int(r.tg60))
+
+
+def test_block_matches_line_parser():
+    expected = [as_tuple(r) for r in map(parse_arduino_line, LINES) if r is not None]
+    for data in ("\n".join(LINES), "\r\n".join(LINES).encode(), LINES):
+        got = [as_tuple(r) for r in array_to_readings(parse_arduino_block(data))]
+        assert got == expected
+
+
+def test_zero_survives_malformed_token_in_column():
+    arr = parse_arduino_block(b"0,0.0,1e-3\n1,0.0,1e-3\n2,5x,1e-3\n")
+    assert list(arr["t_s"]) == [0.0, 1.0, 2.0]
+    assert arr["uhv_torr"][0] == 0.0 and arr["uhv_torr"][1] == 0.0
+    assert math.isnan(arr["uhv_torr"][2])
+
+
+def test_empty_block():
+    assert parse_arduino_block(b"").shape == (0,)
+    assert parse_arduino_block(["# only a comment"]).shape == (0,)
+
+
+def test_recorder_csv_round_trip():
+    data = (b"Timestamp,Elapsed_s,UHV_Torr,Foreline_Torr,TG220_Status,TG60_Status\n"
+            b"2026-10-17 00:00:00,0.0,0.0,,NORMAL,FAULT\n"
+            b"2026-10-17 00:00:01,1.0,x1,1e-3,ALARM,UNKNOWN\n")
+    readings = array_to_readings(parse_recorder_csv(data))
+    assert [as_tuple(r) for r in readings] == [
+        (0.0, 0.0, None, PumpStatus.NORMAL, PumpStatus.FAULT),
+        (1.0, None, 1e-3, PumpStatus.ALARM, PumpStatus.UNKNOWN),
+    ]
+
+
+def test_recorder_csv_sketch_tokens():
+    # What DataRecorder writes (and wrote before the bare-name logs)
+    data = (b"Timestamp,Elapsed_s,UHV_Torr,Foreline_Torr,TG220_Status,TG60_Status\n"
+            b"2026-10-17 00:00:00,0.0,1e-8,2e-3,TG220 NORMAL,TG60 ALARM\n"
+            b"2026-10-17 00:00:01,1.0,1e-8,2e-3,,TG60 FAULT\n")
+    readings = array_to_readings(parse_recorder_csv(data))
+    assert [(r.tg220, r.tg60) for r in readings] == [
+        (PumpStatus.NORMAL, PumpStatus.ALARM), (PumpStatus.UNKNOWN, PumpStatus.FAULT),
+    ]
+
+
+def test_readings_array_round_trip():
+    readings = [Reading(0.5, None, 2e-3, PumpStatus.NORMAL, PumpStatus.ALARM),
+                Reading(1.0, 1e-8, None, PumpStatus.UNKNOWN, PumpStatus.FAULT)]
+    back = array_to_readings(readings_to_array(readings))
+    assert [as_tuple(r) for r in back] == [as_tuple(r) for r in readings]
+    assert isinstance(back[0].tg220, PumpStatus)
@@ -0,0 +1,71 @@
+from instrument_app.util.PollPlanner import PollPlanner, FRAME_OVERHEAD
+
+
+class FakeChannel():
+    def __init__(self, readback_command):
+        self.readback_command = readback_command
+        self.parsed = []
+
+    def pollCommands(self):
+        return f'{self.readback_command}?'.split(';') if self.readback_command else []
+
+    def parse(self, response):
+        self.parsed.append(list(response))
+
+
+class RecordingCOM():
+    # Answers every list request right away with one value per command
+    def __init__(self, answer=lambda command: command.upper()):
+        self.frames = []
+        self.answer = answer
+
+    def requestCompactList(self, commands, callback, priority=None):
+        self.frames.append(list(commands))
+        callback([self.answer(c) for c in commands])
+
+
+def test_packs_single_commands_up_to_frame_limit():
+    channels = [FakeChannel(f'CH{i:02d}:VAL_') for i in range(20)]
+    planner = PollPlanner(RecordingCOM(), channels, max_commands=8, max_bytes=1000)
+    assert [len(f.commands) for f in planner.frames] == [8, 8, 4]
+
+
+def test_respects_byte_limit():
+    channels = [FakeChannel(f'CH{i:02d}:VAL_') for i in range(10)]
+    planner = PollPlanner(RecordingCOM(), channels, max_commands=100, max_bytes=60)
+    for frame in planner.frames:
+        assert frame.length <= 60
+    assert sum(len(f.commands) for f in planner.frames) == 10
+
+
+def test_multi_command_readback_kept_together():
+    turbo = FakeChannel('TP_1:MOSW?;TP_1:ROTR?;TP_1:POWR')
+    singles = [FakeChannel(f'CH{i}:VAL_') for i in range(6)]
+    planner = PollPlanner(RecordingCOM(), [*singles, turbo], max_commands=4, max_bytes=1000)
+    for frame in planner.frames:
+        for channels, start, count in frame.slots:
+            if turbo in channels:
+                assert frame.commands[start:start + count] == ['TP_1:MOSW?', 'TP_1:ROTR?', 'TP_1:POWR?']
+    assert sum(len(f.commands) for f in planner.frames) == 9
+
+
+def test_shared_readback_sent_once_delivered_to_all():
+    a, b = FakeChannel('FOC1:L2V_'), FakeChannel('FOC1:L2V_')
+    com = RecordingCOM()
+    PollPlanner(com, [a, b, FakeChannel(None)]).poll()
+    assert com.frames == [['FOC1:L2V_?']]
+    assert a.parsed == b.parsed == [['FOC1:L2V_?'.upper()]]
+
+
+def test_missing_reply_skips_parse_but_tells_observer():
+    ok, missing = FakeChannel('A:VAL_'), FakeChannel('B:VAL_')
+    seen = []
+    com = RecordingCOM(answer=lambda c: None if c.startswith('B') else '1.0')
+    PollPlanner(com, [ok, missing], observer=lambda ch, r: seen.append((ch, r))).poll()
+    assert ok.parsed == [['1.0']] and missing.parsed == []
+    assert (missing, None) in seen and (ok, ['1.0']) in seen
+
+
+def test_frame_length_counts_overhead():
+    planner = PollPlanner(RecordingCOM(), [FakeChannel('A:B')])
+    assert planner.frames[0].length == len('A:B?') + FRAME_OVERHEAD
@@ -0,0 +1,82 @@
+import pytest
+
+from instrument_app.util.PollScheduler import PollScheduler
+
+
+class Clock():
+    def __init__(self):
+        self.t = 100.0
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_first_read_is_due_immediately(clock):
+    s = PollScheduler(clock=clock)
+    a, b = object(), object()
+    s.add(a, period_ms=1000)
+    s.add(b, period_ms=500)
+    assert set(s.due()) == {a, b}
+    assert s.due() == []
+
+
+def test_reschedules_after_observe(clock):
+    s = PollScheduler(clock=clock, relax=1.0)
+    ch = object()
+    s.add(ch, period_ms=1000)
+    s.due()
+    s.observe(ch, ['1.0'])
+    clock.t += 0.9
+    assert s.due() == []
+    clock.t += 0.2
+    assert s.due() == [ch]
+
+
+def test_moving_value_tightens_stable_value_relaxes(clock):
+    s = PollScheduler(clock=clock, tighten=0.5, relax=2.0)
+    ch = object()
+    s.add(ch, period_ms=1000, min_period_ms=200, max_period_ms=4000)
+    for value in ('1.0', '2.0', '3.0', '4.0', '5.0'):
+        s.due()
+        s.observe(ch, [value])
+        clock.t += s.period(ch)
+    assert s.period(ch) == pytest.approx(0.2)
+    for _ in range(6):
+        s.due()
+        s.observe(ch, ['5.0'])
+        clock.t += s.period(ch)
+    assert s.period(ch) == pytest.approx(4.0)
+
+
+def test_non_numeric_change_counts_as_moving(clock):
+    s = PollScheduler(clock=clock, tighten=0.5, relax=1.0)
+    ch = object()
+    s.add(ch, period_ms=1000, min_period_ms=100)
+    s.observe(ch, ['OFF'])
+    s.observe(ch, ['ON'])
+    assert s.period(ch) == pytest.approx(0.5)
+
+
+def test_unanswered_request_is_retried_after_max_period(clock):
+    s = PollScheduler(clock=clock)
+    ch = object()
+    s.add(ch, period_ms=1000, max_period_ms=2000)
+    assert s.due() == [ch]
+    clock.t += 1.0
+    assert s.due() == []           # still in flight
+    clock.t += 1.5
+    assert s.due() == [ch]
+
+
+def test_failed_poll_keeps_period(clock):
+    s = PollScheduler(clock=clock, tighten=0.5, relax=2.0)
+    ch = object()
+    s.add(ch, period_ms=1000)
+    s.due()
+    s.observe(ch, None)
+    assert s.period(ch) == pytest.approx(1.0)
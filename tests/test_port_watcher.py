@@ -0,0 +1,77 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from instrument_app.services import port_watcher
+from instrument_app.services.port_watcher import PortWatcher
+
+
+def wait_for(app, condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+@pytest.fixture
+def ports(monkeypatch):
+    present = [SimpleNamespace(device="/dev/ttyACM0", description="Arduino")]
+    monkeypatch.setattr(port_watcher.list_ports, "comports", lambda: list(present))
+    return present
+
+
+def devices(port_list):
+    return [p.device for p in port_list]
+
+
+def test_rescans_and_reports_changes(qapp, ports):
+    watcher = PortWatcher(interval_ms=20)
+    seen = []
+    watcher.portsChanged.connect(lambda found: seen.append(devices(found)))
+    try:
+        assert wait_for(qapp, lambda: seen)
+        assert seen == [["/dev/ttyACM0"]] and devices(watcher.ports) == ["/dev/ttyACM0"]
+
+        # Unchanged rescans stay quiet
+        time.sleep(0.1)
+        qapp.processEvents()
+        assert len(seen) == 1
+
+        ports.append(SimpleNamespace(device="/dev/ttyACM1", description="Arduino"))
+        assert wait_for(qapp, lambda: len(seen) == 2)
+        assert seen[-1] == ["/dev/ttyACM0", "/dev/ttyACM1"]
+
+        ports.pop(0)
+        assert wait_for(qapp, lambda: len(seen) == 3)
+        assert devices(watcher.ports) == ["/dev/ttyACM1"]
+    finally:
+        watcher.stop()
+
+
+def test_refresh_reports_even_without_change(qapp, ports):
+    watcher = PortWatcher(interval_ms=60_000)
+    seen = []
+    watcher.portsChanged.connect(lambda found: seen.append(devices(found)))
+    try:
+        assert wait_for(qapp, lambda: seen)
+        watcher.refresh()
+        assert wait_for(qapp, lambda: len(seen) == 2)
+        assert seen[1] == seen[0]
+    finally:
+        watcher.stop()
+
+
+def test_enumeration_failure_reads_as_no_ports(qapp, monkeypatch):
+    def broken():
+        raise OSError("no permission")
+    monkeypatch.setattr(port_watcher.list_ports, "comports", broken)
+    watcher = PortWatcher(interval_ms=60_000)
+    seen = []
+    watcher.portsChanged.connect(seen.append)
+    try:
+        assert wait_for(qapp, lambda: seen)
+        assert seen == [[]]
+    finally:
+        watcher.stop()
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+from PyQt5.QtCore import Qt
+
+from instrument_app.config.settings import CSV_BASENAME, READING_BATCH_SIZE
+from instrument_app.services.data_recorder import DataRecorder
+from instrument_app.services.replay_source import (
+    ReplaySource, _ReplayWorker, load_recordings, playback_offsets, recording_files,
+)
+from instrument_app.util.parsing import PumpStatus, Reading
+
+
+def wait_for(app, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+def write_log(root, times):
+    rec = DataRecorder(root)
+    rec.extend([Reading(t, 1e-8, 2e-3, PumpStatus.NORMAL, PumpStatus.NORMAL) for t in times])
+    rec.close()
+    return rec.path
+
+
+def test_recording_files_skips_subfolders(tmp_path):
+    # Replays are recorded into a subfolder of the log dir; replaying the log dir must not pick them up
+    (tmp_path / f"{CSV_BASENAME}_1.csv").write_text("")
+    (tmp_path / f"{CSV_BASENAME}_2.csv").write_text("")
+    (tmp_path / "replay_output").mkdir()
+    (tmp_path / "replay_output" / f"{CSV_BASENAME}_3.csv").write_text("")
+
+    assert [p.name for p in recording_files(tmp_path)] == [f"{CSV_BASENAME}_1.csv", f"{CSV_BASENAME}_2.csv"]
+
+
+def test_playback_offsets_clip_gaps_and_restarts():
+    t = np.array([0.0, 1.0, 1.5, 0.2, 0.7, np.nan, 0.9, 50.9])
+    assert playback_offsets(t, max_gap_s=10.0).tolist() == [0.0, 1.0, 1.5, 1.5, 2.0, 2.0, 2.0, 12.0]
+
+
+@pytest.mark.parametrize("speed, low, high", [(4.0, 0.4, 0.9), (0.0, 0.0, 0.3)])
+def test_playback_follows_speed(qapp, tmp_path, speed, low, high):
+    path = write_log(tmp_path, [i * 0.1 for i in range(21)])    # 2 s of data
+    source = ReplaySource(tmp_path, speed=speed)
+    got, arrivals, finished = [], [], []
+    source.readings.connect(lambda batch: (got.extend(batch), arrivals.append(time.monotonic())))
+    source.connectedChanged.connect(lambda ok, tip: finished.append(tip) if tip == "Replay finished" else None)
+    try:
+        source.connect(str(path))
+        assert wait_for(qapp, lambda: finished)
+    finally:
+        source.close()
+    assert [r.t_s for r in got] == pytest.approx([i * 0.1 for i in range(21)])
+    assert low <= arrivals[-1] - arrivals[0] <= high
+
+
+def test_player_waits_for_credits(tmp_path):
+    data = load_recordings([write_log(tmp_path, [i * 0.01 for i in range(5 * READING_BATCH_SIZE)])])
+    credits = threading.Semaphore(2)
+    worker = _ReplayWorker(None, 0.0, credits)
+    batches = []
+    worker.readings.connect(batches.append, Qt.DirectConnection)
+    player = threading.Thread(target=worker._play, args=(data, playback_offsets(data["t_s"])))
+    player.start()
+    try:
+        time.sleep(0.2)
+        assert len(batches) == 2      # nobody took them: the player waits
+        credits.release()
+        deadline = time.monotonic() + 2
+        while len(batches) < 3 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert len(batches) == 3
+    finally:
+        worker.stop()
+        player.join()
+
+
+def test_batches_from_a_replaced_player_are_dropped(qapp):
+    source = ReplaySource()
+    got = []
+    source.readings.connect(got.append)
+    credits = threading.Semaphore(0)
+    source._worker = current = object()
+    source._on_readings(object(), ["stale"], credits)
+    source._on_readings(current, ["live"], credits)
+    assert got == [["live"]]
+    assert credits.acquire(blocking=False) and credits.acquire(blocking=False)   # both credits returned
+    source._worker = None
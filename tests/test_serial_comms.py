@@ -0,0 +1,85 @@
+import threading
+import time
+
+import serial
+
+from instrument_app.util.SerialComms import SerialComms, CRC16_TABLE
+
+
+def _crc16_bitwise(data):
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+    return crc
+
+
+def test_crc16_table_matches_bitwise():
+    assert len(CRC16_TABLE) == 256
+    for data in (b'', b'VACU:SRPV?', b'TP_1:MOSW?;TP_1:ROTR?;TP_1:POWR?', bytes(range(256))):
+        assert SerialComms.crc16(data, 0, len(data)) == _crc16_bitwise(data)
+
+
+def test_crc16_offset_and_length():
+    data = b'xxVACU:SRPV?yy'
+    assert SerialComms.crc16(data, 2, 10) == _crc16_bitwise(b'VACU:SRPV?')
+
+
+def test_frame_compact_cached():
+    frame = SerialComms.frameCompact('VACU:SRPV?')
+    crc = format(_crc16_bitwise(b'VACU:SRPV?'), 'X').encode('ascii')
+    assert frame == b'VACU:SRPV?@' + crc + b'\r'
+    assert SerialComms.frameCompact('VACU:SRPV?') is frame
+
+
+def test_command_name():
+    assert SerialComms.commandName('VACU:SRPV?') == 'VACU:SRPV'
+    assert SerialComms.commandName('FOC1:L2V_=10.0') == 'FOC1:L2V_'
+    assert SerialComms.commandName('CTRL:MODE') == 'CTRL:MODE'
+
+
+
+def loopback_comms(timeout=10):
+    # A SerialComms on pyserial's loopback port: whatever is written is read back
+    comms = SerialComms.__new__(SerialComms)
+    comms.ser = serial.serial_for_url('loop://', timeout=timeout)
+    comms.response_timeout = 0.05
+    comms.hv_response_timeout = 0.05
+    comms.last_latency = 0.0
+    comms.last_bytes_out = 0
+    return comms
+
+
+def test_read_responses_stops_at_expected_count():
+    comms = loopback_comms()
+    comms.ser.write(b'A?1@0\rB?2@0\rC?3@0\r')
+    assert comms.readResponses(2, 1.0).count(b'\r') >= 2
+
+
+def test_read_responses_times_out_and_restores_port_timeout():
+    comms = loopback_comms(timeout=10)
+    comms.ser.write(b'A?1@0\r')
+    start = time.monotonic()
+    data = comms.readResponses(3, 0.05)
+    assert data == b'A?1@0\r'
+    assert time.monotonic() - start < 1.0
+    assert comms.ser.timeout == 10
+
+
+def test_read_responses_stays_within_deadline():
+    comms = loopback_comms(timeout=10)
+
+    def trickle():
+        for _ in range(3):
+            time.sleep(0.025)
+            comms.ser.write(b'A?1@0\r')
+    writer = threading.Thread(target=trickle)
+    writer.start()
+    # The last reply lands near the deadline; the read after it mustn't wait a whole timeout more
+    start = time.monotonic()
+    data = comms.readResponses(5, 0.1)
+    elapsed = time.monotonic() - start
+    writer.join()
+    assert data.count(b'\r') == 3
+    assert elapsed < 0.15
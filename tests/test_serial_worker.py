@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+
+import pytest
+from PyQt5.QtCore import Qt
+
+from instrument_app.config.settings import READING_BATCH_SIZE, TELEMETRY_BINARY_CMD
+from instrument_app.services import serial_manager
+from instrument_app.services.serial_manager import SerialWorker, MODE_TEXT, MODE_NEGOTIATING, MODE_BINARY
+from instrument_app.util.parsing import PumpStatus
+from instrument_app.util.telemetry_frames import encode_frame
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="needs a pseudo-terminal")
+
+
+def line(t):
+    return f"{t},1.2E-08 Torr,3.4E-03 Torr,a,b,TG220 NORMAL,TG60 FAULT\n".encode()
+
+
+def wait_until(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+class Device():
+    """The Arduino end of a pseudo-terminal, with a SerialWorker reading the other end."""
+    def __init__(self, binary=False):
+        import pty, tty
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self.batches, self.stamps, self.connected, self.status = [], [], [], []
+        self.worker = SerialWorker(self.port, 115200, binary=binary)
+        self.worker.readings.connect(lambda batch, stamps: (self.batches.append(batch), self.stamps.append(stamps)),
+                                     Qt.DirectConnection)
+        self.worker.connected.connect(self.connected.append, Qt.DirectConnection)
+        self.worker.status.connect(self.status.append, Qt.DirectConnection)
+        self.thread = threading.Thread(target=self.worker.start, daemon=True)
+        self.thread.start()
+        assert wait_until(lambda: self.worker._ser is not None)
+
+    def write(self, data):
+        os.write(self.master, data)
+
+    def received(self):
+        import select
+        out = b""
+        while select.select([self.master], [], [], 0.2)[0]:
+            out += os.read(self.master, 4096)
+        return out
+
+    def readings(self):
+        return [r for batch in self.batches for r in batch]
+
+    def close(self):
+        self.worker.stop()
+        self.thread.join(2)
+        os.close(self.master)
+        os.close(self.slave)
+
+
+@pytest.fixture
+def device():
+    dev = Device()
+    yield dev
+    dev.close()
+
+
+def test_connected_at_first_valid_reading(device):
+    device.write(b"partial line\nBooting sketch v2\n")
+    time.sleep(0.2)
+    assert device.connected == []
+    device.write(line(1.0))
+    assert wait_until(lambda: device.connected and device.readings())
+    assert device.connected == [device.port]
+    assert [r.t_s for r in device.readings()] == [1.0]
+    assert device.readings()[0].tg60 == PumpStatus.FAULT
+
+def test_text_lines_batched(device):
+    device.write(b"sync\n" + b"".join(line(i) for i in range(120)))
+    assert wait_until(lambda: len(device.readings()) == 120)
+    sizes = [len(batch) for batch in device.batches]
+    assert max(sizes) == READING_BATCH_SIZE
+    assert [len(s) for s in device.stamps] == sizes
+    assert [r.t_s for r in device.readings()] == [float(i) for i in range(120)]
+
+def test_overlong_line_dropped(monkeypatch):
+    monkeypatch.setattr(serial_manager, "SERIAL_MAX_LINE", 64)
+    dev = Device()
+    try:
+        dev.write(b"sync\n" + b"x" * 100)
+        time.sleep(0.2)
+        # Without the clear, the noise would be glued to the front of this line
+        dev.write(line(5.0))
+        assert wait_until(lambda: dev.readings())
+        assert [r.t_s for r in dev.readings()] == [5.0]
+    finally:
+        dev.close()
+
+def test_binary_negotiation_and_fallback(monkeypatch):
+    monkeypatch.setattr(serial_manager, "TELEMETRY_NEGOTIATE_S", 0.2)
+    dev = Device(binary=True)
+    try:
+        dev.write(b"sync\n" + line(1.0))
+        assert wait_until(lambda: dev.connected)
+        # Asked for frames once the sketch is up; text still parsed meanwhile
+        assert dev.received() == (TELEMETRY_BINARY_CMD + "\n").encode()
+        assert dev.worker.mode == MODE_NEGOTIATING
+        assert wait_until(lambda: "Telemetry: no binary frames, using text" in dev.status)
+        dev.write(line(2.0))
+        assert wait_until(lambda: len(dev.readings()) == 2)
+
+        dev.write(b"".join(encode_frame(3000 + 100 * i, 1e-8, 2e-3, PumpStatus.NORMAL, PumpStatus.NORMAL)
+                           for i in range(3)))
+        assert wait_until(lambda: len(dev.readings()) == 5)
+        assert dev.worker.mode == MODE_BINARY and "Telemetry: binary" in dev.status
+        assert [r.t_s for r in dev.readings()[2:]] == pytest.approx([3.0, 3.1, 3.2])
+
+        # Frames stop (sketch reset): back to accepting text
+        assert wait_until(lambda: dev.worker.mode == MODE_NEGOTIATING)
+        assert "Telemetry: binary frames stopped, accepting text" in dev.status
+        dev.write(b"reboot noise\n" + line(0.5))
+        assert wait_until(lambda: len(dev.readings()) == 6)
+        assert dev.readings()[-1].t_s == 0.5
+    finally:
+        dev.close()
+
+def test_text_mode_ignores_frames(device):
+    assert device.worker.mode == MODE_TEXT
+    device.write(b"sync\n" + line(1.0))
+    assert wait_until(lambda: device.readings())
+    device.write(encode_frame(2000, 1e-8, 2e-3) + b"\n" + line(3.0))
+    assert wait_until(lambda: len(device.readings()) == 2)
+    assert [r.t_s for r in device.readings()] == [1.0, 3.0]
+
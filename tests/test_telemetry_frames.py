@@ -0,0 +1,49 @@
+import math
+
+import numpy as np
+
+from instrument_app.util.parsing import PumpStatus
+from instrument_app.util.telemetry_frames import FRAME_SIZE, SYNC, encode_frame, decode_frames
+
+
+def frames(n, start=0):
+    return b"".join(encode_frame(1000 * i, 1e-8 * (i + 1), None if i % 2 else 2e-3,
+                                 PumpStatus.NORMAL, PumpStatus.FAULT) for i in range(start, start + n))
+
+
+def test_round_trip():
+    arr, used = decode_frames(frames(5))
+    assert used == 5 * FRAME_SIZE
+    assert list(arr["t_s"]) == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert np.allclose(arr["uhv_torr"], [1e-8 * (i + 1) for i in range(5)], rtol=1e-6)
+    assert math.isnan(arr["fore_torr"][1]) and arr["fore_torr"][0] == np.float32(2e-3)
+    assert set(arr["tg220"]) == {PumpStatus.NORMAL} and set(arr["tg60"]) == {PumpStatus.FAULT}
+
+
+def test_partial_frame_kept_for_next_read():
+    data = frames(3)
+    arr, used = decode_frames(data[:-5])
+    assert len(arr) == 2 and used == 2 * FRAME_SIZE
+    rest = data[used:-5] + data[-5:]
+    arr, used = decode_frames(rest)
+    assert len(arr) == 1 and used == len(rest)
+
+
+def test_resyncs_after_noise_and_corruption():
+    bad = bytearray(encode_frame(99000, 1.0, 1.0))
+    bad[8] ^= 0xFF                       # CRC no longer matches
+    data = b"boot text\r\n" + frames(2) + bytes(bad) + b"\x00\x01" + frames(2, start=2)
+    arr, used = decode_frames(data)
+    assert list(arr["t_s"]) == [0.0, 1.0, 2.0, 3.0]
+    assert used == len(data)
+
+
+def test_trailing_sync_byte_not_consumed():
+    data = frames(1) + SYNC[:1]
+    arr, used = decode_frames(data)
+    assert len(arr) == 1 and used == len(data) - 1
+
+
+def test_out_of_range_status_is_unknown():
+    arr, _ = decode_frames(encode_frame(0, 1.0, 1.0, 200, 3))
+    assert arr["tg220"][0] == PumpStatus.UNKNOWN and arr["tg60"][0] == PumpStatus.ALARM
@@ -0,0 +1,270 @@
+"""
+asyncio transport for the Bruker Compact protocol
+
+Counterpart to SerialComms for asyncio code. send(command) returns a future
+straight away; several frames can be outstanding on the wire at once, and each
+'\\r'-terminated response is matched back to its request by the command echo
+(the same echo sendCompact's `if m in d` check relies on).
+
+A request that times out stays behind as a tombstone for late_reply_timeout
+seconds, so its late echo is swallowed there instead of answering the next
+request for the same command. Each request is booked in bus_stats like
+SerialComms.recordStats does: unanswered commands count as a checksum failure
+if a corrupted reply came in while they waited, else as a timeout.
+
+    comms = AsyncSerialComms(port='COM3')
+    await comms.open()
+    pressure, turbo = await asyncio.gather(comms.send('VACU:SRPV?'),
+                                           comms.send('TP_1:MOSW?;TP_1:ROTR?;TP_1:POWR?'))
+    await comms.close()
+
+Changelog:
+    101726 - Pipelined asyncio transport with a local serial stream adapter
+    101726 - Late replies to timed-out requests are dropped; transactions booked in bus_stats
+"""
+
+import asyncio
+import threading
+
+import serial
+
+from instrument_app.util.SerialComms import SerialComms
+from instrument_app.util.BusStats import bus_stats, OK, TIMEOUT, CRC_ERROR
+
+
+class SerialStream():
+    """
+    Minimal asyncio stream over a pyserial port, so we don't need pyserial-asyncio.
+    Incoming bytes are fed into an asyncio.StreamReader; writes go straight to the port.
+    """
+    def __init__(self, ser):
+        self.ser = ser
+        self.reader = None
+        self._loop = None
+        self._fd = None
+        self._thread = None
+        self._running = False
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self.reader = asyncio.StreamReader()
+        try:
+            # POSIX ports can be watched by the event loop directly
+            fd = self.ser.fileno()
+            self._loop.add_reader(fd, self._onReadable)
+            self._fd = fd
+        except (AttributeError, NotImplementedError):
+            # Windows COM ports / proactor loops: read on a helper thread instead
+            self.ser.timeout = 0.05
+            self._running = True
+            self._thread = threading.Thread(target=self._readThread, daemon=True)
+            self._thread.start()
+
+    def _onReadable(self):
+        try:
+            data = self.ser.read(self.ser.in_waiting or 1)
+        except serial.SerialException as e:
+            self._loop.remove_reader(self._fd)
+            self._fd = None
+            self.reader.set_exception(e)
+            return
+        if data:
+            self.reader.feed_data(data)
+
+    def _readThread(self):
+        while self._running:
+            try:
+                data = self.ser.read(max(1, self.ser.in_waiting))
+            except serial.SerialException:
+                break
+            if data:
+                self._loop.call_soon_threadsafe(self.reader.feed_data, data)
+        self._loop.call_soon_threadsafe(self.reader.feed_eof)
+
+    def write(self, data):
+        self.ser.write(data)
+
+    def close(self):
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            self._fd = None
+        if self._thread is not None:
+            self._running = False
+            self._thread.join()
+            self._thread = None
+        self.ser.close()
+
+
+class _Pending():
+    __slots__ = ('commands', 'names', 'results', 'sizes', 'remaining', 'bad', 'future', 'expires')
+
+    def __init__(self, commands, future):
+        self.commands = commands
+        self.names = [SerialComms.commandName(c) for c in commands]
+        self.results = [None] * len(commands)
+        self.sizes = [None] * len(commands)
+        self.remaining = len(commands)
+        self.bad = 0                # corrupted replies seen while waiting
+        self.future = future
+        self.expires = None         # set once timed out: tombstone until then
+
+    def fill(self, name, value, size=0):
+        for j, n in enumerate(self.names):
+            if n == name and self.results[j] is None:
+                self.results[j] = value
+                self.sizes[j] = size
+                self.remaining -= 1
+                if self.remaining == 0 and not self.future.done():
+                    self.future.set_result(self.results)
+                return True
+        return False
+
+
+class AsyncSerialComms():
+    def __init__(self, instrument="Compact", port='COM3', baudrate=115200,
+                 max_in_flight=4, response_timeout=0.25, hv_response_timeout=1.0,
+                 late_reply_timeout=2.0):
+        self.instrument = instrument
+        self.port = port
+        self.baudrate = baudrate
+        # How many frames may be on the wire before send() waits for a reply
+        self.max_in_flight = max_in_flight
+        self.response_timeout = response_timeout
+        self.hv_response_timeout = hv_response_timeout
+        # How long a timed-out request's reply may still turn up and must be ignored
+        self.late_reply_timeout = late_reply_timeout
+
+        self.stream = None
+        self._pending = []          # in the order they were written, tombstones included
+        self._window = None
+        self._reader_task = None
+
+    async def open(self):
+        ser = serial.Serial(port=self.port, baudrate=self.baudrate, timeout=0)
+        self.stream = SerialStream(ser)
+        await self.stream.start()
+        self._window = asyncio.Semaphore(self.max_in_flight)
+        self._reader_task = asyncio.get_running_loop().create_task(self._readLoop())
+
+    async def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    def send(self, command, timeout=None):
+        """
+        Queue one frame (may hold several ';'-joined commands) and return a future.
+        The future resolves to one value per command, in order; None for any
+        command that got no valid response before the deadline.
+        """
+        return asyncio.get_running_loop().create_task(self._send(command, timeout))
+
+    async def _send(self, command, timeout):
+        commands = command.split(';')
+        if timeout is None:
+            per_command = self.hv_response_timeout if 'HVC_' in command else self.response_timeout
+            timeout = per_command * len(commands)
+        loop = asyncio.get_running_loop()
+        async with self._window:
+            pending = _Pending(commands, loop.create_future())
+            self._pending.append(pending)
+            frame = SerialComms.frameCompact(command)
+            start = loop.time()
+            try:
+                self.stream.write(frame)
+                return await asyncio.wait_for(asyncio.shield(pending.future), timeout)
+            except asyncio.TimeoutError:
+                # Keep it as a tombstone: a late echo then lands here, not in the next request
+                pending.future.cancel()
+                pending.expires = loop.time() + self.late_reply_timeout
+                return list(pending.results)
+            finally:
+                self.recordStats(pending, loop.time() - start, len(frame))
+                if pending.expires is None:
+                    self._pending.remove(pending)
+
+    def recordStats(self, pending, latency, bytes_out):
+        """Book one request against each of its command names, as SerialComms.recordStats does."""
+        if not bus_stats.enabled:
+            return
+        share = 1 / len(pending.commands)
+        # '@' + checksum + '\r' is booked against the first command of the frame
+        overhead = bytes_out - sum(len(c) + 1 for c in pending.commands)
+        for command, name, size in zip(pending.commands, pending.names, pending.sizes):
+            if size is not None:
+                status = OK
+            elif pending.bad:
+                status = CRC_ERROR
+            else:
+                status = TIMEOUT
+            bus_stats.record(name, latency, len(command) + 1 + overhead, size or 0, status, share)
+            overhead = 0
+
+    def _dropExpired(self, now):
+        if any(p.expires is not None and p.expires <= now for p in self._pending):
+            self._pending = [p for p in self._pending if p.expires is None or p.expires > now]
+
+    async def _readLoop(self):
+        reader = self.stream.reader
+        while True:
+            try:
+                line = await reader.readuntil(b'\r')
+            except asyncio.IncompleteReadError:
+                break
+            except asyncio.LimitOverrunError as e:
+                # Garbage without a terminator; drop it and resynchronise
+                await reader.readexactly(e.consumed)
+                continue
+            line = line.replace(b'\x00', b'').replace(b'\x06', b'').strip(b'\r')
+            if not line:
+                continue
+            response, _, checksum = line.partition(b'@')
+            try:
+                ok = int(checksum, 16) == SerialComms.crc16(response, 0, len(response))
+            except ValueError:
+                ok = False
+            response = response.decode('ascii', errors='replace')
+            name = SerialComms.commandName(response)
+            self._dropExpired(asyncio.get_running_loop().time())
+            if not ok:
+                # Booked as a checksum failure on the request it most likely belongs to
+                live = [p for p in self._pending if p.expires is None]
+                for pending in live:
+                    if name in pending.names:
+                        pending.bad += 1
+                        break
+                else:
+                    if live:
+                        live[0].bad += 1
+                continue
+            value = response[len(name) + 1:]
+            # Oldest outstanding request still waiting on this command wins
+            for i, pending in enumerate(self._pending):
+                if pending.fill(name, value, len(line) + 1):
+                    if pending.expires is not None:
+                        if pending.remaining == 0:
+                            del self._pending[i]
+                    elif i:
+                        # Replies come back in order: earlier tombstones won't get theirs now
+                        self._pending[:i] = [p for p in self._pending[:i] if p.expires is None]
+                    break
+
+
+if __name__ == '__main__':
+    async def demo():
+        comms = AsyncSerialComms()
+        await comms.open()
+        replies = await asyncio.gather(comms.send('VACU:SRPV?'),
+                                       comms.send('VACU:SMPV?'),
+                                       comms.send('TP_1:MOSW?;TP_1:ROTR?;TP_1:POWR?'))
+        print(replies)
+        await comms.close()
+
+    asyncio.run(demo())
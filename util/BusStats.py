@@ -0,0 +1,135 @@
+"""
+Per-command transaction statistics for the Compact serial layer
+
+SerialComms records every command it sends here: count, round-trip latency
+histogram, bus time, checksum failures, timeouts and bytes in/out, keyed by
+command name (e.g. 'VACU:SRPV'). The channels register their command names
+when they are built, so every counter exists before the first poll and
+recording is a dict lookup and a few integer adds (a name nobody registered
+still gets its counters the first time it is seen).
+
+    bus_stats.register(['VACU:SRPV', 'TP_1:MOSW'])
+    bus_stats.snapshot()   # -> list of dicts, busiest command first
+
+The bus thread records transactions and the GUI thread counts rejected writes
+(reject()); the GUI reads snapshots, which may be a sample or two behind but
+never block the port.
+
+Changelog:
+    101726 - Counters, latency histograms and snapshot API
+    101726 - Counters preallocated via register(); rejected-write count
+"""
+
+from bisect import bisect_left
+
+# Upper edges of the latency buckets, in seconds; the last bucket is everything slower
+LATENCY_BUCKETS = (0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05,
+                   0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+
+OK, TIMEOUT, CRC_ERROR = 0, 1, 2
+
+
+class CommandStats():
+    __slots__ = ('name', 'count', 'timeouts', 'crc_errors', 'rejected', 'bytes_out', 'bytes_in',
+                 'latency_sum', 'latency_max', 'busy', 'histogram')
+
+    def __init__(self, name):
+        self.name = name
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.timeouts = 0
+        self.crc_errors = 0
+        self.rejected = 0          # writes the device didn't echo back
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.busy = 0.0            # this command's share of the bus time
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def percentile(self, q):
+        """Latency (s) below which a fraction q of the samples fall, to bucket resolution."""
+        total = sum(self.histogram)
+        if total == 0:
+            return 0.0
+        target = q * total
+        seen = 0
+        for i, n in enumerate(self.histogram):
+            seen += n
+            if seen >= target:
+                if i < len(LATENCY_BUCKETS):
+                    return min(LATENCY_BUCKETS[i], self.latency_max)
+                return self.latency_max
+        return self.latency_max
+
+
+class TransactionStats():
+    def __init__(self):
+        self.enabled = True
+        self._commands = {}
+
+    def record(self, name, latency, bytes_out, bytes_in, status=OK, share=1.0):
+        if not self.enabled:
+            return
+        stats = self._commands.get(name)
+        if stats is None:
+            stats = self._commands.setdefault(name, CommandStats(name))
+        stats.count += 1
+        stats.bytes_out += bytes_out
+        stats.bytes_in += bytes_in
+        stats.latency_sum += latency
+        stats.busy += latency * share
+        if latency > stats.latency_max:
+            stats.latency_max = latency
+        stats.histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        if status == TIMEOUT:
+            stats.timeouts += 1
+        elif status == CRC_ERROR:
+            stats.crc_errors += 1
+
+    def register(self, names):
+        """Create the counters for these command names up front."""
+        for name in names:
+            if name not in self._commands:
+                self._commands.setdefault(name, CommandStats(name))
+
+    def reject(self, name):
+        if not self.enabled:
+            return
+        stats = self._commands.get(name)
+        if stats is None:
+            stats = self._commands.setdefault(name, CommandStats(name))
+        stats.rejected += 1
+
+    def reset(self):
+        # Zeroed in place, so the registered names keep their counters
+        for stats in list(self._commands.values()):
+            stats.clear()
+
+    def snapshot(self):
+        """One dict per command name, busiest (most bus time) first."""
+        rows = []
+        for stats in list(self._commands.values()):
+            count = stats.count
+            rows.append({
+                'name': stats.name,
+                'count': count,
+                'timeouts': stats.timeouts,
+                'crc_errors': stats.crc_errors,
+                'rejected': stats.rejected,
+                'bytes_out': stats.bytes_out,
+                'bytes_in': stats.bytes_in,
+                'mean_ms': stats.latency_sum / count * 1e3 if count else 0.0,
+                'p50_ms': stats.percentile(0.50) * 1e3,
+                'p95_ms': stats.percentile(0.95) * 1e3,
+                'max_ms': stats.latency_max * 1e3,
+                'busy_s': stats.busy,
+                'histogram': list(stats.histogram),
+            })
+        rows.sort(key=lambda row: row['busy_s'], reverse=True)
+        return rows
+
+
+bus_stats = TransactionStats()
@@ -0,0 +1,130 @@
+"""
+Byte-level parser for Bruker Compact replies
+
+Works directly on the read buffer: '\\r' and '@' delimiters are found in place
+and the CRC is checked over a memoryview of it. Nothing is split, stripped or
+decoded on the way; per reply there is a small, fixed set of objects (the
+delimiter tuple, a memoryview slice for the echo compare and the copied-out
+value), however long the frame is.
+
+    values, bad = parseReplies(buffer, ['TP_1:MOSW?', 'TP_1:ROTR?', 'TP_1:POWR?'])
+    # values -> [1, 100, 12]  (None for any command without a valid reply)
+
+Changelog:
+    101726 - memoryview parser replaces the replace/strip/split/decode chain
+    101726 - parseReplies can report reply sizes for BusStats
+    101726 - Docstring: per-reply objects spelled out (tuples, slices, value)
+"""
+
+# Module import (not names): SerialComms imports this module back for its replies
+from instrument_app.util import SerialComms
+
+_QUERY, _SET = 0x3F, 0x3D
+_PAD = (0x00, 0x06)     # NUL / ACK the controller puts in front of replies
+
+_HEX = [-1] * 256
+for _i, _c in enumerate(b'0123456789ABCDEF'):
+    _HEX[_c] = _i
+for _i, _c in enumerate(b'abcdef'):
+    _HEX[_c] = 10 + _i
+
+_FLOAT_MARKS = (ord('.'), ord('E'), ord('e'))
+
+# Command -> name bytes, so the echo compare doesn't build strings per reply
+_names = {}
+
+
+def commandNameBytes(command):
+    name = _names.get(command)
+    if name is None:
+        # Setpoint writes carry arbitrary values, so don't let this grow forever
+        if len(_names) >= 1024:
+            _names.clear()
+        name = _names[command] = SerialComms.SerialComms.commandName(command).encode('ascii')
+    return name
+
+
+def _checksumOk(mv, first, last, crc):
+    # Hex digits between '@' and '\r' against the computed CRC, without int(bytes(...), 16)
+    if first >= last:
+        return False
+    value = 0
+    for i in range(first, last):
+        digit = _HEX[mv[i]]
+        if digit < 0:
+            return False
+        value = (value << 4) | digit
+    return value == crc
+
+
+def scanReplies(buffer):
+    """
+    Yield (start, sep, at, end, crc_ok) for every '\\r'-terminated reply in
+    `buffer` (bytes or bytearray). buffer[start:sep] is the command name,
+    buffer[sep] is '?' or '=' (sep == at if neither), buffer[sep+1:at] is the
+    value and buffer[at+1:end] the checksum.
+    """
+    mv = memoryview(buffer)
+    pos = 0
+    while True:
+        end = buffer.find(b'\r', pos)
+        if end < 0:
+            return
+        start = pos
+        pos = end + 1
+        while start < end and mv[start] in _PAD:
+            start += 1
+        if start == end:
+            continue
+        at = buffer.rfind(b'@', start, end)
+        if at < 0:
+            yield start, end, end, end, False
+            continue
+        sep = at
+        for i in range(start, at):
+            c = mv[i]
+            if c == _QUERY or c == _SET:
+                sep = i
+                break
+        crc = SerialComms.SerialComms.crc16(mv, start, at - start)
+        yield start, sep, at, end, _checksumOk(mv, at + 1, end, crc)
+
+
+def toValue(raw):
+    """b'100' -> 100, b'1.20E-03' -> 0.0012, anything else -> str."""
+    try:
+        for c in raw:
+            if c in _FLOAT_MARKS:
+                return float(raw)
+        return int(raw)
+    except ValueError:
+        return raw.decode('ascii', errors='replace')
+
+
+def parseReplies(buffer, commands, typed=True, sizes=None):
+    """
+    Match the replies in `buffer` to `commands` by echo, in order.
+    Returns (values, bad): one value per command (None if it didn't answer)
+    and the number of replies that failed the checksum. If `sizes` is a list
+    (one slot per command) it gets the byte length of each matched reply.
+    """
+    mv = memoryview(buffer)
+    names = [commandNameBytes(c) for c in commands]
+    values = [None] * len(commands)
+    bad = 0
+    i = 0
+    for start, sep, at, end, ok in scanReplies(buffer):
+        if not ok:
+            bad += 1
+            continue
+        length = sep - start
+        for j in range(i, len(names)):
+            name = names[j]
+            if len(name) == length and mv[start:sep] == name:
+                raw = bytes(mv[sep + 1:at])
+                values[j] = toValue(raw) if typed else raw.decode('ascii', errors='replace')
+                if sizes is not None:
+                    sizes[j] = end + 1 - start
+                i = j + 1
+                break
+    return values, bad
@@ -0,0 +1,255 @@
+"""
+Bruker Compact controller simulator on a pseudo-terminal (Linux/macOS)
+
+Speaks the same framing SerialComms uses: 'CMD?' / 'CMD=value' requests joined
+with ';', terminated by '@' + CRC16 + '\\r', answered with one
+'CMD?value@CRC\\r' / 'CMD=value@CRC\\r' line per command. Point SerialComms,
+CompactBus or AsyncSerialComms at `sim.port` instead of COM3.
+
+    sim = CompactSimulator.from_setup('config/setup_Compact.yaml', latency=0.002)
+    sim.start()
+    comms = SerialComms(port=sim.port)
+
+or as its own process:
+
+    python -m instrument_app.util.CompactSimulator --setup config/setup_Compact.yaml
+
+The register map is a plain dict of command name -> value string. On top of
+it, turbo speed (TP_n:ROTR) ramps after TP_n:MOSW is switched, and HVC_
+readbacks settle towards their setpoint, so polling code sees values move.
+
+Changelog:
+    101726 - PTY simulator with register map and per-command latency
+"""
+
+import argparse
+import math
+import os
+import select
+import sys
+import threading
+import time
+
+import yaml
+
+from instrument_app.util.SerialComms import SerialComms
+
+DEFAULT_REGISTERS = {
+    'VACU:SRPV': '1.20E-03',
+    'VACU:SMPV': '3.40E-07',
+    'TP_1:MOSW': '1',
+    'TP_1:ROTR': '100',
+    'TP_1:POWR': '12',
+    'TP_2:MOSW': '1',
+    'TP_2:ROTR': '100',
+    'TP_2:POWR': '9',
+    'FOC1:L1V_': '0.0',
+    'FOC1:L2V_': '10.0',
+    'FOC1:L3V_': '0.0',
+    'FOC1:LV1H': '0.0',
+    'FOC1:LV1L': '0.0',
+    'CTRL:MODE': '2',
+    'HVC_:FLT_': '0.0',
+    'HVC_:REF_': '0.0',
+    'HVC_:DEC_': '0.0',
+    'HVC_:DET_': '0.0',
+    'HVC_:PSH_': '0.0',
+    'HVC_:PLL_': '0.0',
+}
+
+TURBO_RAMP = 10.0        # % of full speed per second
+HV_TIME_CONSTANT = 0.1   # s, first-order settle of HVC_ readbacks
+
+
+class CompactSimulator():
+    def __init__(self, registers=None, latency=0.0, latencies=None, hv_latency=None, ack=True):
+        self.registers = dict(DEFAULT_REGISTERS if registers is None else registers)
+        # Response delay per command: exact name, then 'PREFIX:' match, then default
+        self.latency = latency
+        self.latencies = dict(latencies or {})
+        if hv_latency is not None:
+            self.latencies.setdefault('HVC_:', hv_latency)
+        self.ack = ack
+
+        self.port = None
+        self.frames = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._targets = {}       # HVC_ name -> (start value, setpoint, time set)
+        self._turbo_since = {}   # TP_n -> (ROTR at switch time, time switched)
+        self._master = None
+        self._slave = None
+        self._thread = None
+        self._running = False
+
+    @classmethod
+    def from_setup(cls, filename, **kwargs):
+        """Seed the register map with every read/write command in an app setup YAML."""
+        with open(filename, "r") as file:
+            config = yaml.safe_load(file)
+        registers = dict(DEFAULT_REGISTERS)
+        for section in ('system', 'channels'):
+            for params in (config.get(section) or {}).values():
+                if not isinstance(params, dict):
+                    continue
+                default = params.get('default_value', 0)
+                if isinstance(default, str) and 'options' in params:
+                    default = params['options'].index(default) if default in params['options'] else 0
+                for key in ('read_command', 'write_command'):
+                    command = params.get(key)
+                    if not command:
+                        continue
+                    for name in str(command).split(';'):
+                        registers.setdefault(SerialComms.commandName(name.strip()), str(default))
+        return cls(registers=registers, **kwargs)
+
+    # ------------ register access ------------
+
+    def get(self, name):
+        with self._lock:
+            self._advance(name, time.monotonic())
+            return self.registers.get(name)
+
+    def set(self, name, value):
+        with self._lock:
+            now = time.monotonic()
+            if name.startswith('HVC_'):
+                # Readback starts from where it is now and settles on the new setpoint
+                try:
+                    start = float(self.registers.get(name, 0))
+                    self._targets[name] = (start, float(value), now)
+                except ValueError:
+                    pass
+            elif name.endswith(':MOSW'):
+                prefix = name.split(':')[0]
+                self._advance(f'{prefix}:ROTR', now)
+                self._turbo_since[prefix] = (float(self.registers.get(f'{prefix}:ROTR', 0)), now)
+            self.registers[name] = value
+            return value
+
+    def _advance(self, name, now):
+        # Dynamic registers are computed lazily when they are read
+        if name in self._targets:
+            start, target, t0 = self._targets[name]
+            frac = 1.0 - math.exp(-(now - t0) / HV_TIME_CONSTANT)
+            value = start + (target - start) * frac
+            if abs(value - target) < 1e-3:
+                value = target
+                del self._targets[name]
+            self.registers[name] = f'{value:.1f}'
+        elif name.endswith(':ROTR'):
+            prefix = name.split(':')[0]
+            if prefix in self._turbo_since:
+                start, t0 = self._turbo_since[prefix]
+                running = self.registers.get(f'{prefix}:MOSW') == '1'
+                step = TURBO_RAMP * (now - t0)
+                speed = min(100.0, start + step) if running else max(0.0, start - step)
+                self.registers[name] = f'{speed:.0f}'
+
+    def delay_for(self, name):
+        if name in self.latencies:
+            return self.latencies[name]
+        prefix = name.split(':')[0] + ':'
+        return self.latencies.get(prefix, self.latency)
+
+    # ------------ protocol ------------
+
+    def respond(self, frame):
+        """Answer one request frame (without its '\\r'); returns the reply bytes."""
+        message, _, checksum = frame.partition(b'@')
+        try:
+            valid = int(checksum, 16) == SerialComms.crc16(message, 0, len(message))
+        except ValueError:
+            valid = False
+        if not valid:
+            self.errors += 1
+            return b''
+        self.frames += 1
+        reply = bytearray()
+        for command in message.decode('ascii', errors='replace').split(';'):
+            name = SerialComms.commandName(command)
+            if command[len(name):len(name) + 1] == '=':
+                response = f'{name}={self.set(name, command[len(name) + 1:])}'
+            else:
+                value = self.get(name)
+                if value is None:
+                    continue    # unknown register: no answer, the caller times out
+                response = f'{name}?{value}'
+            delay = self.delay_for(name)
+            if delay:
+                time.sleep(delay)
+            if self.ack:
+                reply += b'\x06'
+            reply += response.encode('ascii')
+            reply += b'@' + format(SerialComms.crc16(response.encode('ascii'), 0, len(response)), '04X').encode('ascii') + b'\r'
+        return bytes(reply)
+
+    # ------------ pseudo-terminal ------------
+
+    def start(self):
+        import pty
+        import tty
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._master)
+        tty.setraw(self._slave)
+        # Keeping our own slave fd open stops the master reading EIO between clients
+        self.port = os.ttyname(self._slave)
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def _serve(self):
+        buffer = b''
+        while self._running:
+            ready, _, _ = select.select([self._master], [], [], 0.1)
+            if not ready:
+                continue
+            try:
+                buffer += os.read(self._master, 4096)
+            except OSError:
+                continue
+            while b'\r' in buffer:
+                frame, buffer = buffer.split(b'\r', 1)
+                reply = self.respond(frame)
+                if reply:
+                    os.write(self._master, reply)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bruker Compact simulator on a pseudo-terminal")
+    parser.add_argument('--setup', help="app setup YAML to seed the register map from")
+    parser.add_argument('--registers', help="YAML file of extra name: value registers")
+    parser.add_argument('--latency', type=float, default=0.0, help="response delay per command, s")
+    parser.add_argument('--hv-latency', type=float, default=None, help="response delay for HVC_ commands, s")
+    args = parser.parse_args(argv)
+
+    kwargs = dict(latency=args.latency, hv_latency=args.hv_latency)
+    sim = CompactSimulator.from_setup(args.setup, **kwargs) if args.setup else CompactSimulator(**kwargs)
+    if args.registers:
+        with open(args.registers, "r") as file:
+            sim.registers.update({k: str(v) for k, v in (yaml.safe_load(file) or {}).items()})
+
+    print(sim.start(), flush=True)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.stop()
+        print(f"{sim.frames} frames, {sim.errors} checksum errors", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+End-to-end latency tracing for the Arduino telemetry path
+
+Every stage is measured from the moment the reading's bytes came off the port
+(SerialWorker stamps each reading with time.monotonic() as it reads them):
+
+    parsed      parse_arduino_line / decode_frames done (reader thread)
+    delivered   PressureInterlockPage._on_reading_batch entered (GUI thread)
+    plotted     TimePressurePlot.extend done
+    recorded    DataRecorder writer thread flushed them to disk
+
+so each stage's histogram answers "how stale is the data by the time it gets
+here". Off by default; when enabled, each stage costs a bisect and a few adds
+per reading, plus one uncontended lock per batch.
+
+    latency_trace.enabled = True
+    latency_trace.snapshot()      # -> list of dicts, in path order
+    latency_trace.dump(path)      # same, plus the raw histograms, as JSON
+
+The GUI-thread stages find their readings' stamps through begin()/end(), which
+SerialManager wraps around delivering a batch; a stage marked outside that is
+simply not counted. Work handed to another thread takes current() along and
+passes it to mark() there. ReplaySource doesn't call begin(), so replayed
+readings are never traced and every count comes from the live serial path.
+
+Changelog:
+    101726 - Stage histograms, batch context, JSON dump
+    101726 - current()/mark(stage, stamps) for stages on other threads
+    101726 - Replayed readings are left out of the trace
+    101726 - Counters locked: every device's reader thread records PARSED
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+
+from instrument_app.util.BusStats import LATENCY_BUCKETS, CommandStats
+
+PARSED, DELIVERED, PLOTTED, RECORDED = 'parsed', 'delivered', 'plotted', 'recorded'
+STAGES = (PARSED, DELIVERED, PLOTTED, RECORDED)
+
+
+class LatencyTrace():
+    def __init__(self):
+        self.enabled = False
+        self._stamps = None        # arrival stamps of the batch being delivered
+        # PARSED is recorded by one reader thread per device, RECORDED by the
+        # recorder's writer and the rest by the GUI: updates take the lock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # Fixed set of stages, created up front
+        self._stages = {name: CommandStats(name) for name in STAGES}
+        self._t0 = time.monotonic()
+
+    def record(self, stage, latency, n=1):
+        if not self.enabled:
+            return
+        stats = self._stages[stage]
+        with self._lock:
+            self._add(stats, latency, n)
+
+    def _add(self, stats, latency, n):
+        stats.count += n
+        stats.latency_sum += latency * n
+        if latency > stats.latency_max:
+            stats.latency_max = latency
+        stats.histogram[bisect_left(LATENCY_BUCKETS, latency)] += n
+
+    def begin(self, stamps):
+        """Batch context: the stages marked until end() belong to readings received at `stamps`."""
+        if self.enabled:
+            self._stamps = stamps
+
+    def end(self):
+        self._stamps = None
+
+    def current(self):
+        """Stamps of the batch being delivered, or None when not tracing."""
+        return self._stamps if self.enabled else None
+
+    def mark(self, stage, stamps=None):
+        if stamps is None:
+            stamps = self._stamps
+        if not stamps or not self.enabled:
+            return
+        now = time.monotonic()
+        stats = self._stages[stage]
+        with self._lock:
+            for t in stamps:
+                self._add(stats, now - t, 1)
+
+    def snapshot(self):
+        """One dict per stage, in the order the data passes through them."""
+        rows = []
+        for name in STAGES:
+            stats = self._stages[name]
+            count = stats.count
+            rows.append({
+                'stage': name,
+                'count': count,
+                'mean_ms': stats.latency_sum / count * 1e3 if count else 0.0,
+                'p50_ms': stats.percentile(0.50) * 1e3,
+                'p95_ms': stats.percentile(0.95) * 1e3,
+                'p99_ms': stats.percentile(0.99) * 1e3,
+                'max_ms': stats.latency_max * 1e3,
+                'histogram': list(stats.histogram),
+            })
+        return rows
+
+    def dump(self, path):
+        report = {
+            'window_s': time.monotonic() - self._t0,
+            'bucket_edges_ms': [edge * 1e3 for edge in LATENCY_BUCKETS],
+            'stages': self.snapshot(),
+        }
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+latency_trace = LatencyTrace()
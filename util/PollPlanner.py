@@ -0,0 +1,94 @@
+"""
+Poll planner for the Bruker Compact bus
+
+Packs the readback commands of many Monitor/Setting channels into as few
+';'-joined Compact frames as the controller allows, sends them, and hands each
+channel its own slice of the results through Channel.parse().
+
+Changelog:
+    101726 - Coalesce channel readbacks into multi-command frames
+"""
+
+from functools import partial
+
+from instrument_app.config.settings import COMPACT_MAX_FRAME_COMMANDS, COMPACT_MAX_FRAME_BYTES
+
+# '@' + 4 hex digits + '\r' added by SerialComms.frameCompact
+FRAME_OVERHEAD = 6
+
+
+class PollFrame():
+    def __init__(self):
+        self.commands = []
+        self.slots = []       # (channels sharing these commands, start index, count)
+
+    @property
+    def length(self):
+        return len(';'.join(self.commands)) + FRAME_OVERHEAD
+
+    def fits(self, commands, max_commands, max_bytes):
+        if not self.commands:
+            return True
+        return (len(self.commands) + len(commands) <= max_commands and
+                self.length + len(';'.join(commands)) + 1 <= max_bytes)
+
+    def add(self, channels, commands):
+        self.slots.append((channels, len(self.commands), len(commands)))
+        self.commands.extend(commands)
+
+
+class PollPlanner():
+    def __init__(self, COM, channels=(),
+                 max_commands=COMPACT_MAX_FRAME_COMMANDS,
+                 max_bytes=COMPACT_MAX_FRAME_BYTES,
+                 observer=None):
+        self.COM = COM
+        self.max_commands = max_commands
+        self.max_bytes = max_bytes
+        # Optional observer(channel, response) told about every result, e.g. PollScheduler.observe
+        self.observer = observer
+        self.frames = self.plan(channels)
+
+    def plan(self, channels):
+        """Return the frame list for every channel that has a readback command."""
+        # Channels that read back the same thing share one set of commands
+        groups = {}
+        for channel in channels:
+            if getattr(channel, 'readback_command', None) is None:
+                continue
+            groups.setdefault(tuple(channel.pollCommands()), []).append(channel)
+
+        # First-fit decreasing: place the biggest requests first so the small
+        # single-command readbacks fill in the gaps
+        frames = []
+        for commands, members in sorted(groups.items(), key=lambda kv: -len(kv[0])):
+            commands = list(commands)
+            for frame in frames:
+                if frame.fits(commands, self.max_commands, self.max_bytes):
+                    break
+            else:
+                frame = PollFrame()
+                frames.append(frame)
+            frame.add(members, commands)
+        return frames
+
+    def poll(self, channels=None):
+        """
+        Send the frames and deliver the results to each channel's parse().
+        With `channels`, only that subset is packed and read this time.
+        """
+        frames = self.frames if channels is None else self.plan(channels)
+        for frame in frames:
+            self.COM.requestCompactList(frame.commands, partial(self.deliver, frame))
+
+    def deliver(self, frame, results):
+        for channels, start, count in frame.slots:
+            response = results[start:start + count]
+            if None in response:
+                # Leave the last good value on screen if this channel didn't answer
+                response = None
+            for channel in channels:
+                if response is not None:
+                    channel.parse(response)
+                if self.observer is not None:
+                    self.observer(channel, response)
@@ -0,0 +1,110 @@
+"""
+Adaptive, deadline-based polling for Compact channels
+
+Each channel gets a base period (poll_period_ms in the setup YAML). While its
+readback is moving the period is tightened towards min_period_ms; once it is
+stable again it backs off towards max_period_ms. The page timer just asks
+due() which channels to read on each tick and hands them to the PollPlanner,
+which reports every result back through observe().
+
+Changelog:
+    101726 - Per-channel adaptive polling replaces the fixed 1 s loop
+    101726 - Requests that never come back are re-polled after max_period
+"""
+
+import heapq
+import itertools
+import time
+
+from instrument_app.config.settings import POLL_DEFAULT_PERIOD_MS
+
+
+class _Schedule():
+    __slots__ = ('channel', 'base', 'min', 'max', 'period', 'deadline', 'last', 'inflight')
+
+    def __init__(self, channel, base, min_period, max_period, now):
+        self.channel = channel
+        self.base = base
+        self.min = min_period
+        self.max = max_period
+        self.period = base
+        self.deadline = now
+        self.last = None
+        self.inflight = None
+
+
+class PollScheduler():
+    def __init__(self, tighten=0.5, relax=1.25, change_threshold=0.005, clock=time.monotonic):
+        self.tighten = tighten                    # period multiplier while the value moves
+        self.relax = relax                        # period multiplier while it is stable
+        self.change_threshold = change_threshold  # relative change that counts as moving
+        self.clock = clock
+        self._schedules = {}
+        self._heap = []                           # (deadline, seq, schedule)
+        self._seq = itertools.count()
+
+    def add(self, channel, period_ms=None, min_period_ms=None, max_period_ms=None):
+        base = (period_ms or POLL_DEFAULT_PERIOD_MS) / 1000
+        min_period = (min_period_ms / 1000) if min_period_ms else max(0.1, base / 8)
+        max_period = (max_period_ms / 1000) if max_period_ms else base * 4
+        schedule = _Schedule(channel, base, min(min_period, base), max(max_period, base), self.clock())
+        self._schedules[id(channel)] = schedule
+        self._push(schedule, 0.0)    # first read on the next tick
+
+    def period(self, channel):
+        return self._schedules[id(channel)].period
+
+    def due(self):
+        """Pop every channel whose deadline has passed and mark it in flight."""
+        now = self.clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, schedule = heapq.heappop(self._heap)
+            if deadline != schedule.deadline:
+                continue    # stale heap entry from an earlier reschedule
+            if schedule.inflight is not None and now - schedule.inflight < schedule.max:
+                # Still waiting on the last request; retry if it never comes back
+                schedule.deadline = schedule.inflight + schedule.max
+                heapq.heappush(self._heap, (schedule.deadline, next(self._seq), schedule))
+                continue
+            schedule.inflight = now
+            # Retry entry, superseded by observe() if the result comes back
+            schedule.deadline = now + schedule.max
+            heapq.heappush(self._heap, (schedule.deadline, next(self._seq), schedule))
+            due.append(schedule.channel)
+        return due
+
+    def observe(self, channel, response):
+        """Feed back a poll result (None if the channel didn't answer) and reschedule."""
+        schedule = self._schedules.get(id(channel))
+        if schedule is None:
+            return
+        schedule.inflight = None
+        if response is not None:
+            if schedule.last is not None and self._moved(schedule.last, response):
+                schedule.period = max(schedule.min, schedule.period * self.tighten)
+            else:
+                schedule.period = min(schedule.max, schedule.period * self.relax)
+            schedule.last = list(response)
+        self._push(schedule)
+
+    def next_deadline(self):
+        return self._heap[0][0] if self._heap else None
+
+    def _push(self, schedule, delay=None):
+        schedule.deadline = self.clock() + (schedule.period if delay is None else delay)
+        heapq.heappush(self._heap, (schedule.deadline, next(self._seq), schedule))
+
+    def _moved(self, old, new):
+        if len(old) != len(new):
+            return True
+        for a, b in zip(old, new):
+            if a == b:
+                continue
+            try:
+                a, b = float(a), float(b)
+            except (TypeError, ValueError):
+                return True     # non-numeric state changed (e.g. a switch)
+            if abs(b - a) > self.change_threshold * max(abs(a), abs(b), 1e-30):
+                return True
+        return False
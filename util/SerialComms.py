@@ -1,76 +1,198 @@
 import serial
 import time
 
+from instrument_app.util import CompactParser
+from instrument_app.util.BusStats import bus_stats, OK, TIMEOUT, CRC_ERROR
+
+
+def _make_crc16_table(poly=0x1021):
+    # One entry per possible high byte of the running CRC (CRC-CCITT, MSB first)
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ poly) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+        table.append(crc)
+    return tuple(table)
+
+CRC16_TABLE = _make_crc16_table()
+
+# Request priorities for requestCompact/requestCompactList; lower goes first on a bus
+PRIORITY_WRITE = 0
+PRIORITY_READ = 2
+
+
 class SerialComms():
-    def __init__(self, instrument="Compact", port = 'COM3', baudrate=115200, timeout=10):
+    # Fully framed request bytes, keyed by command string.  The polling commands
+    # never change, so each one is only checksummed the first time it is sent.
+    _frame_cache = {}
+    FRAME_CACHE_SIZE = 1024
+
+    def __init__(self, instrument="Compact", port = 'COM3', baudrate=115200, timeout=10,
+                 response_timeout=0.25, hv_response_timeout=1.0):
 
         self.instrument = instrument
         self.ser = serial.Serial(port = port, baudrate=baudrate, timeout=timeout)
+        # Per-command deadlines for a reply; HVC_ supplies take longer to answer
+        self.response_timeout = response_timeout
+        self.hv_response_timeout = hv_response_timeout
+        # Round trip (s) and frame size of the last transaction, for BusStats
+        self.last_latency = 0.0
+        self.last_bytes_out = 0
     
     def close(self):
         self.ser.close()
 
     def getMessageCompact(self, message):
-        message_bytes = bytes(message, 'ascii')
-        checksum = str(hex(self.crc16(message_bytes, 0, len(message_bytes)))).upper()
-        message = message + "@" + checksum[2:] + "\r"
-        return message
-
-    def sendCompact(self, message):
-        message_bytes = bytes(message, 'ascii')
-        message_list = message[0:-6].strip('\r').split(';')
-        checksum = str(hex(self.crc16(message_bytes, 0, len(message_bytes)))).upper()
-        message = message + "@" + checksum[2:] + "\r"
-        message_bytes = bytes(message, 'ascii')
-        self.ser.write(message_bytes)
-        if 'HVC_' in message:
-            time.sleep(.2)
-        else:
-            time.sleep(.015)
+        return self.frameCompact(message).decode('ascii')
+
+    @classmethod
+    def frameCompact(cls, message):
+        """Return message + '@' + checksum + '\\r' as bytes, cached per command."""
+        frame = cls._frame_cache.get(message)
+        if frame is None:
+            message_bytes = bytes(message, 'ascii')
+            checksum = format(cls.crc16(message_bytes, 0, len(message_bytes)), 'X')
+            frame = message_bytes + b"@" + checksum.encode('ascii') + b"\r"
+            # Setpoint writes carry arbitrary values, so don't let the cache grow forever
+            if len(cls._frame_cache) >= cls.FRAME_CACHE_SIZE:
+                cls._frame_cache.clear()
+            cls._frame_cache[message] = frame
+        return frame
+
+    def readResponses(self, expected, timeout):
+        """
+        Read until `expected` '\\r'-terminated responses have arrived or
+        `timeout` seconds have passed, whichever comes first.
+        """
+        buffer = bytearray()
+        deadline = time.monotonic() + timeout
+        # Each read only waits out what is left of the deadline; the port
+        # timeout is put back afterwards for whoever uses the port next
+        saved = self.ser.timeout
+        try:
+            while buffer.count(b'\r') < expected:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.ser.timeout = remaining
+                chunk = self.ser.read(max(1, self.ser.in_waiting))
+                if not chunk:
+                    break
+                buffer += chunk
+        finally:
+            self.ser.timeout = saved
+        return bytes(buffer)
+
+    def transactCompact(self, message, timeout=None):
+        """
+        Write one frame and return the raw reply buffer, holding one
+        '\\r'-terminated response per ';'-separated command that answered in time.
+        """
+        expected = message.count(';') + 1
+        if timeout is None:
+            per_command = self.hv_response_timeout if 'HVC_' in message else self.response_timeout
+            timeout = per_command * expected
+        message_bytes = self.frameCompact(message)
+        # Anything still waiting belongs to an earlier, timed-out transaction
         if self.ser.in_waiting > 0:
-            data = self.ser.read(self.ser.in_waiting)
-            data = data.replace(b'\x00',b'').replace(b'\x06', b'').strip(b'\r').split(b'\r')
-            data = [d.decode('ascii') for d in data]
-            results = []
-            responses = []
-            for m, d in zip(message_list, data):
-                if m in d:
-                    response, checksum = d.split("@")
-                    checkchecksum = str(hex(self.crc16(bytes(response, 'ascii'), 0, len(response))))[2:].upper()
-                    while len(checkchecksum) < 4:
-                        checkchecksum = "0" + checkchecksum
-                    if checksum == checkchecksum:
-                        if "?" in response:
-                            results.append(response.split("?")[-1])
-                            responses.append(response)
-                        elif "=" in response:
-                            results.append(response.split("=")[-1])
-                            responses.append(response)
-                    else:
-                        print("Checksum wrong")
-                        return None
-        else:
-            print("No response to command")
+            self.ser.reset_input_buffer()
+        start = time.perf_counter()
+        self.ser.write(message_bytes)
+        data = self.readResponses(expected, timeout)
+        self.last_latency = time.perf_counter() - start
+        self.last_bytes_out = len(message_bytes)
+        return data
+
+    def sendCompact(self, message, timeout=None):
+        commands = message.split(';')
+        names = {CompactParser.commandNameBytes(m) for m in commands}
+        data = self.transactCompact(message, timeout)
+        results = []
+        responses = []
+        sizes = {}
+        bad = 0
+        for start, sep, at, end, ok in CompactParser.scanReplies(data):
+            if not ok:
+                bad += 1
+                break
+            # Only keep replies that echo one of our commands
+            if sep == at or data[start:sep] not in names:
+                continue
+            sizes[data[start:sep]] = end + 1 - start
+            responses.append(data[start:at].decode('ascii'))
+            results.append(data[sep + 1:at].decode('ascii'))
+        self.recordStats(commands, [sizes.get(CompactParser.commandNameBytes(c)) for c in commands], bad)
+        if bad or len(data) == 0:
             return None
         if len(results) > 0:
             return results, responses
-        else:
-            print("Response empty")
-            return None, None
-        
+        # No reply echoed our command; recordStats has booked it as a timeout
+        return None, None
+
+    def sendCompactList(self, commands, timeout=None):
+        """
+        Send several commands in one frame and return one result per command,
+        in the same order. Responses are matched to commands by their echo;
+        a command that got no valid response gives None. Results are the reply
+        text, which is what the channel widgets display and parse.
+        """
+        data = self.transactCompact(';'.join(commands), timeout)
+        sizes = [None] * len(commands)
+        values, bad = CompactParser.parseReplies(data, commands, False, sizes)
+        self.recordStats(commands, sizes, bad)
+        return values
+
+    def recordStats(self, commands, sizes, bad):
+        """
+        Book the last transaction against each command name. `sizes` holds the
+        reply length per command (None if it didn't answer); a missing reply
+        counts as a checksum failure if the frame had one, else as a timeout.
+        """
+        if not bus_stats.enabled:
+            return
+        latency = self.last_latency
+        share = 1 / len(commands)
+        # '@' + checksum + '\r' is booked against the first command of the frame
+        overhead = self.last_bytes_out - sum(len(c) + 1 for c in commands)
+        for command, size in zip(commands, sizes):
+            if size is not None:
+                status = OK
+            elif bad:
+                status = CRC_ERROR
+            else:
+                status = TIMEOUT
+            bus_stats.record(self.commandName(command), latency, len(command) + 1 + overhead,
+                             size or 0, status, share)
+            overhead = 0
+
+    def requestCompact(self, message, callback, priority=PRIORITY_READ):
+        # Same call shape as CompactBus, but answered right away on this thread
+        callback(self.sendCompact(message))
+
+    def requestCompactList(self, commands, callback, priority=PRIORITY_READ):
+        callback(self.sendCompactList(commands))
+
+    @staticmethod
+    def commandName(command):
+        """'VACU:SRPV?' / 'FOC1:L2V=10.0' / 'VACU:SRPV?1.2E-3' -> 'VACU:SRPV' etc."""
+        for i, c in enumerate(command):
+            if c == '?' or c == '=':
+                return command[:i]
+        return command
+
     @staticmethod
     def crc16(data : bytearray, offset , length):
         if data is None or offset < 0 or offset > len(data)- 1 and offset+length > len(data):
             return 0
         crc = 0xFFFF
-        for i in range(0, length):
-            crc ^= data[offset + i] << 8
-            for j in range(0,8):
-                if (crc & 0x8000) > 0:
-                    crc =(crc << 1) ^ 0x1021
-                else:
-                    crc = crc << 1
-        return crc & 0xFFFF
+        table = CRC16_TABLE
+        for byte in data[offset:offset + length]:
+            crc = ((crc << 8) & 0xFF00) ^ table[(crc >> 8) ^ byte]
+        return crc
 
 if __name__ == '__main__':
     ser = SerialComms()
@@ -0,0 +1,94 @@
+"""
+Module: instrument_app.util.device_clock
+Purpose: Map a device's own timestamps (Reading.t_s, the sketch's uptime) onto the
+         host monotonic clock, and keep the per-device rate / drift / delay stats
+         that fall out of doing so.
+
+How it fits:
+- Depends on: (stdlib only)
+- Used by:    SerialManager (one DeviceClock per device, merged stream ordering)
+
+Public API:
+- class DeviceClock(window_s): observe(device_t, host_t) -> aligned host time,
+                               to_host(device_t), reset(), stats() -> dict
+
+Method:
+- host_t - device_t is the clock offset plus however long the sample sat in
+  buffers (USB, batching, the GUI queue). Its minimum over a window is the best
+  estimate of the pure offset; comparing window minima over time gives the
+  drift of the device oscillator against the host. Aligned time is
+  device_t + offset + drift·Δt, never later than the sample actually arrived.
+- A device timestamp going backwards means the sketch restarted: start over.
+
+Changelog:
+- 2026-10-17 · 0.1.0 · Initial offset/drift estimator.
+- 2026-10-17 · 0.1.1 · Window minima keep the device time they were seen at (unbiased drift).
+"""
+
+from __future__ import annotations
+
+import math
+
+from instrument_app.config.settings import CLOCK_WINDOW_S
+
+
+class DeviceClock:
+    def __init__(self, window_s: float = CLOCK_WINDOW_S):
+        self.window_s = window_s
+        self.reset()
+
+    def reset(self):
+        self.samples = 0
+        self.rate_hz = 0.0          # EWMA of the device sample rate
+        self.drift = 0.0            # host seconds gained per device second
+        self.delay_s = 0.0          # EWMA of arrival time above the aligned time
+        self._last_dev = None
+        self._win_start = None      # device time the current window opened
+        self._win_min = math.inf    # min(host - device) within it
+        self._win_min_dev = None    # ... and the device time it was seen at
+        self._first = None          # (device_t, offset) of the first full window
+        self._ref = None            # ... and of the latest one
+
+    def observe(self, device_t: float, host_t: float) -> float:
+        if self._last_dev is not None and device_t < self._last_dev:
+            self.reset()
+        if self._last_dev is not None:
+            dt = device_t - self._last_dev
+            if dt > 0:
+                self.rate_hz = 1.0 / dt if self.rate_hz == 0.0 else self.rate_hz + 0.05 * (1.0 / dt - self.rate_hz)
+        self._last_dev = device_t
+        self.samples += 1
+
+        d = host_t - device_t
+        if self._win_start is None:
+            self._win_start = device_t
+        if d < self._win_min:
+            self._win_min, self._win_min_dev = d, device_t
+        if device_t - self._win_start >= self.window_s:
+            point = (self._win_min_dev, self._win_min)
+            if self._first is None:
+                self._first = point
+            elif point[0] > self._first[0]:
+                self.drift = (point[1] - self._first[1]) / (point[0] - self._first[0])
+            self._ref = point
+            self._win_start, self._win_min = device_t, math.inf
+
+        aligned = min(self.to_host(device_t, d), host_t)
+        self.delay_s += 0.05 * ((host_t - aligned) - self.delay_s)
+        return aligned
+
+    def to_host(self, device_t: float, fallback_offset: float = 0.0) -> float:
+        if self._ref is not None:
+            dev0, offset = self._ref
+            return device_t + offset + self.drift * (device_t - dev0)
+        if self._win_min < math.inf:
+            return device_t + self._win_min
+        return device_t + fallback_offset
+
+    def stats(self) -> dict:
+        return {
+            "samples": self.samples,
+            "rate_hz": self.rate_hz,
+            "drift_ppm": self.drift * 1e6,
+            "delay_ms": self.delay_s * 1e3,
+        }
@@ -1,30 +1,69 @@
 
 """
 Module: instrument_app.util.parsing
-Purpose: Parse Arduino CSV-ish lines into a typed Reading dataclass.
+Purpose: Parse Arduino CSV-ish lines into a typed Reading dataclass, or whole
+         blocks of lines into a NumPy structured array.
 
 How it fits:
-- Depends on: dataclasses
-- Used by:    SerialWorker (line→Reading), DataRecorder (type hints)
+- Depends on: dataclasses, numpy
+- Used by:    SerialWorker (line→Reading), DataRecorder (type hints),
+              ReplaySource (recorder CSV→array), bulk ingestion (block→array)
 
 Public API:
-- @dataclass Reading(t_s, uhv_torr, fore_torr, tg220, tg60)
+- @dataclass Reading(t_s, uhv_torr, fore_torr, tg220: PumpStatus, tg60: PumpStatus)  (__slots__)
+- class PumpStatus(IntEnum): UNKNOWN, NORMAL, FAULT, ALARM; pump_status(str)
 - def parse_arduino_line(line: str) -> Optional[Reading]
+- def parse_arduino_block(data) -> np.ndarray[READING_DTYPE]
+- def parse_recorder_csv(data) -> np.ndarray[READING_DTYPE]   (DataRecorder logs)
+- def readings_to_array(readings) -> np.ndarray[READING_DTYPE]; array_to_readings(arr) -> list[Reading]
+- Reading.from_record(row)
 
 Changelog:
 - 2025-08-23 · 0.1.0 · KC · Robust parser; tolerant to units and missing fields.
+- 2026-10-17 · 0.2.0 · Vectorized bulk parser and pump status codes.
+- 2026-10-17 · 0.3.0 · Reading uses __slots__; pump status is a PumpStatus parsed once.
+- 2026-10-17 · 0.3.1 · parse_recorder_csv for DataRecorder logs.
+- 2026-10-17 · 0.3.2 · Bulk parsers keep 0.0 values when a column has a malformed token.
 """
 
 from dataclasses import dataclass
-from typing import Optional
+from enum import IntEnum
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+
+class PumpStatus(IntEnum):
+    UNKNOWN = 0
+    NORMAL = 1
+    FAULT = 2
+    ALARM = 3
+
+
+def pump_status(text: str) -> PumpStatus:
+    s = (text or "").lower()
+    if "normal" in s: return PumpStatus.NORMAL
+    if "fault" in s:  return PumpStatus.FAULT
+    if "alarm" in s:  return PumpStatus.ALARM
+    return PumpStatus.UNKNOWN
+
 
 @dataclass
 class Reading:
+    # No per-instance __dict__: buffered history is mostly these
+    __slots__ = ("t_s", "uhv_torr", "fore_torr", "tg220", "tg60")
     t_s: float
     uhv_torr: Optional[float]
     fore_torr: Optional[float]
-    tg220: str
-    tg60: str
+    tg220: PumpStatus
+    tg60: PumpStatus
+
+    @classmethod
+    def from_record(cls, row) -> "Reading":
+        # One READING_DTYPE row (NaN pressures back to None)
+        uhv, fore = float(row["uhv_torr"]), float(row["fore_torr"])
+        return cls(float(row["t_s"]), None if uhv != uhv else uhv, None if fore != fore else fore,
+                   PumpStatus(int(row["tg220"])), PumpStatus(int(row["tg60"])))
 
 def _clean_float(token: str) -> Optional[float]:
     token = token.replace(" Torr","").replace(" TORR","").strip()
@@ -43,11 +82,143 @@ def parse_arduino_line(line: str) -> Optional[Reading]:
         uhv = _clean_float(parts[1])
         fore = _clean_float(parts[2])
         # pump status slots vary by sketch version; handle both
-        tg220 = tg60 = ""
+        tg220 = tg60 = PumpStatus.UNKNOWN
         if len(parts) >= 7 and ("TG220" in parts[5] or "TG60" in parts[6]):
-            tg220, tg60 = parts[5], parts[6]
+            tg220, tg60 = pump_status(parts[5]), pump_status(parts[6])
         elif len(parts) >= 9 and ("TG220" in parts[7] or "TG60" in parts[8]):
-            tg220, tg60 = parts[7], parts[8]
+            tg220, tg60 = pump_status(parts[7]), pump_status(parts[8])
         return Reading(t, uhv, fore, tg220, tg60)
     except Exception:
         return None
+
+
+# -------------------- bulk parsing --------------------
+
+READING_DTYPE = np.dtype([
+    ("t_s", "f8"), ("uhv_torr", "f8"), ("fore_torr", "f8"),
+    ("tg220", "u1"), ("tg60", "u1"),     # PumpStatus codes
+])
+
+_NUMERIC_START = np.array([bytes([c]) for c in b"0123456789+-."], dtype="S1")
+
+
+def _floats(col: np.ndarray) -> np.ndarray:
+    # Column of byte tokens -> float64, NaN where the token isn't a number
+    col = np.where(np.isin(col.astype("S1"), _NUMERIC_START), col, b"nan")
+    try:
+        return col.astype(np.float64)
+    except ValueError:
+        # Something number-shaped that still isn't a float ("1.2.3"): go token by token
+        values = (_clean_float(t.decode(errors="replace")) for t in col)
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def _status_codes(col: np.ndarray) -> np.ndarray:
+    low = np.char.lower(col)
+    codes = np.full(col.shape, PumpStatus.UNKNOWN, dtype=np.uint8)
+    # Same precedence as pump_status(): later assignments win
+    codes[np.char.find(low, b"alarm") >= 0] = PumpStatus.ALARM
+    codes[np.char.find(low, b"fault") >= 0] = PumpStatus.FAULT
+    codes[np.char.find(low, b"normal") >= 0] = PumpStatus.NORMAL
+    return codes
+
+
+def parse_arduino_block(data: Union[bytes, bytearray, str, Iterable[Union[str, bytes]]]) -> np.ndarray:
+    """
+    Parse many Arduino lines at once (a raw byte block, a str, or an iterable of
+    lines) into a READING_DTYPE array, one row per line parse_arduino_line()
+    would accept, in input order. Missing pressures are NaN and pump states are
+    PumpStatus codes. Handles the 7- and 9-column sketch layouts side by side.
+    """
+    if isinstance(data, str):
+        data = data.encode("ascii", errors="replace")
+    elif not isinstance(data, (bytes, bytearray, memoryview)):
+        data = b"\n".join(l.encode("ascii", errors="replace") if isinstance(l, str) else l for l in data)
+    data = bytes(data).replace(b" Torr", b"").replace(b" TORR", b"")
+
+    lines = np.char.strip(np.array(data.splitlines(), dtype=bytes))
+    if lines.size:
+        lines = lines[(np.char.str_len(lines) > 0)
+                      & ~np.char.startswith(lines, b"#")
+                      & ~np.char.startswith(np.char.lower(lines), b"time")]
+    out = np.zeros(lines.size, dtype=READING_DTYPE)
+    valid = np.zeros(lines.size, dtype=bool)
+    if not lines.size:
+        return out
+
+    # Lines with the same number of fields are split and converted together
+    ncols = np.char.count(lines, b",") + 1
+    for n in np.unique(ncols):
+        if n < 3:
+            continue
+        rows = np.nonzero(ncols == n)[0]
+        cells = np.char.strip(np.array(b",".join(lines[rows].tolist()).split(b","), dtype=bytes)).reshape(rows.size, n)
+
+        t = _floats(cells[:, 0])
+        out["t_s"][rows] = t
+        out["uhv_torr"][rows] = _floats(cells[:, 1])
+        out["fore_torr"][rows] = _floats(cells[:, 2])
+        valid[rows] = ~np.isnan(t)
+
+        # pump status slots vary by sketch version; handle both
+        if n >= 7:
+            tg220 = np.full(rows.size, PumpStatus.UNKNOWN, dtype=np.uint8)
+            tg60 = tg220.copy()
+            early = (np.char.find(cells[:, 5], b"TG220") >= 0) | (np.char.find(cells[:, 6], b"TG60") >= 0)
+            tg220[early] = _status_codes(cells[early, 5])
+            tg60[early] = _status_codes(cells[early, 6])
+            if n >= 9:
+                late = ~early & ((np.char.find(cells[:, 7], b"TG220") >= 0) | (np.char.find(cells[:, 8], b"TG60") >= 0))
+                tg220[late] = _status_codes(cells[late, 7])
+                tg60[late] = _status_codes(cells[late, 8])
+            out["tg220"][rows] = tg220
+            out["tg60"][rows] = tg60
+
+    return out[valid]
+
+
+RECORDER_COLUMNS = 6   # Timestamp, Elapsed_s, UHV_Torr, Foreline_Torr, TG220_Status, TG60_Status
+
+
+def parse_recorder_csv(data: Union[bytes, str]) -> np.ndarray:
+    """
+    Parse a DataRecorder CSV (header optional) into a READING_DTYPE array, using
+    Elapsed_s as t_s. Empty pressures are NaN; the status columns may hold the
+    sketch's text ("TG220 NORMAL", what DataRecorder writes) or the bare
+    PumpStatus names that DataRecorder 0.1.2-0.2.1 wrote.
+    """
+    if isinstance(data, str):
+        data = data.encode("ascii", errors="replace")
+    lines = np.char.strip(np.array(bytes(data).splitlines(), dtype=bytes))
+    if lines.size:
+        lines = lines[(np.char.str_len(lines) > 0) & ~np.char.startswith(lines, b"Timestamp")]
+        lines = lines[np.char.count(lines, b",") == RECORDER_COLUMNS - 1]
+    if not lines.size:
+        return np.zeros(0, dtype=READING_DTYPE)
+
+    cells = np.char.strip(np.array(b",".join(lines.tolist()).split(b","), dtype=bytes))
+    cells = cells.reshape(lines.size, RECORDER_COLUMNS)
+    out = np.zeros(lines.size, dtype=READING_DTYPE)
+    out["t_s"] = _floats(cells[:, 1])
+    out["uhv_torr"] = _floats(cells[:, 2])
+    out["fore_torr"] = _floats(cells[:, 3])
+    out["tg220"] = _status_codes(cells[:, 4])
+    out["tg60"] = _status_codes(cells[:, 5])
+    return out[~np.isnan(out["t_s"])]
+
+
+def readings_to_array(readings: Iterable[Reading]) -> np.ndarray:
+    """Pack Reading objects into a READING_DTYPE array (None pressures -> NaN)."""
+    nan = np.nan
+    return np.array([(r.t_s,
+                      nan if r.uhv_torr is None else r.uhv_torr,
+                      nan if r.fore_torr is None else r.fore_torr,
+                      r.tg220, r.tg60) for r in readings], dtype=READING_DTYPE)
+
+
+def array_to_readings(arr: np.ndarray) -> list:
+    """Unpack a READING_DTYPE array into Reading objects (NaN pressures -> None)."""
+    statuses = list(PumpStatus)
+    return [Reading(t, None if uhv != uhv else uhv, None if fore != fore else fore,
+                    statuses[a], statuses[b])
+            for t, uhv, fore, a, b in arr.tolist()]
@@ -0,0 +1,120 @@
+"""
+Module: instrument_app.util.telemetry_frames
+Purpose: Binary framed telemetry for the Arduino link: fixed-layout little-endian
+         records with a sync word and CRC, decoded in bulk with numpy.frombuffer.
+
+How it fits:
+- Depends on: numpy, instrument_app.util.parsing (READING_DTYPE, PumpStatus),
+              instrument_app.util.SerialComms (CRC16_TABLE, same CRC-CCITT as the Compact link)
+- Used by:    SerialWorker (binary mode, negotiated with TELEMETRY_BINARY_CMD)
+
+Frame layout (18 bytes, little-endian):
+    offset  type  field
+    0       u16   sync      0x5AA5 (bytes A5 5A; never valid ASCII, so it can't
+                            turn up in the text telemetry)
+    2       u32   t_ms      sketch millis()
+    6       f32   uhv_torr  NaN when the gauge is off
+    10      f32   fore_torr NaN when the gauge is off
+    14      u8    tg220     PumpStatus code
+    15      u8    tg60      PumpStatus code
+    16      u16   crc       CRC16-CCITT (init 0xFFFF) over bytes 2..15
+
+Public API:
+- FRAME_DTYPE, FRAME_SIZE, SYNC
+- def encode_frame(t_ms, uhv_torr, fore_torr, tg220, tg60) -> bytes
+- def decode_frames(buf) -> (np.ndarray[READING_DTYPE], consumed: int)
+
+Changelog:
+- 2026-10-17 · 0.1.0 · Initial binary framing, bulk decoder and encoder (for tests/replay).
+"""
+
+from __future__ import annotations
+
+import struct
+
+import numpy as np
+
+from instrument_app.util.parsing import READING_DTYPE, PumpStatus
+from instrument_app.util.SerialComms import CRC16_TABLE
+
+SYNC_WORD = 0x5AA5
+SYNC = struct.pack("<H", SYNC_WORD)
+
+FRAME_DTYPE = np.dtype([
+    ("sync", "<u2"), ("t_ms", "<u4"),
+    ("uhv_torr", "<f4"), ("fore_torr", "<f4"),
+    ("tg220", "u1"), ("tg60", "u1"),
+    ("crc", "<u2"),
+])
+FRAME_SIZE = FRAME_DTYPE.itemsize            # 18
+_CRC_START, _CRC_END = 2, FRAME_SIZE - 2     # bytes covered by the CRC
+
+_CRC_TABLE = np.array(CRC16_TABLE, dtype=np.uint16)
+_PACK = struct.Struct("<IffBB")
+
+
+def _crc16(payload: bytes) -> int:
+    crc = 0xFFFF
+    for byte in payload:
+        crc = ((crc << 8) & 0xFF00) ^ CRC16_TABLE[(crc >> 8) ^ byte]
+    return crc
+
+
+def encode_frame(t_ms: int, uhv_torr, fore_torr, tg220=PumpStatus.UNKNOWN, tg60=PumpStatus.UNKNOWN) -> bytes:
+    """Build one frame, as the sketch would send it."""
+    payload = _PACK.pack(int(t_ms) & 0xFFFFFFFF,
+                         np.nan if uhv_torr is None else uhv_torr,
+                         np.nan if fore_torr is None else fore_torr,
+                         int(tg220), int(tg60))
+    return SYNC + payload + struct.pack("<H", _crc16(payload))
+
+
+def _crc_rows(raw: np.ndarray) -> np.ndarray:
+    # CRC of every frame at once: one table lookup per byte column, vectorized over rows
+    crc = np.full(raw.shape[0], 0xFFFF, dtype=np.uint16)
+    for col in range(_CRC_START, _CRC_END):
+        crc = ((crc << 8) & 0xFF00) ^ _CRC_TABLE[(crc >> 8) ^ raw[:, col]]
+    return crc
+
+
+def decode_frames(buf) -> tuple[np.ndarray, int]:
+    """
+    Decode every complete, valid frame in `buf` (bytes/bytearray).
+    Returns (readings, consumed): a READING_DTYPE array and the number of bytes
+    of `buf` that were used up (the caller keeps buf[consumed:] for next time).
+    Corrupt frames are skipped by resyncing on the next sync word.
+    """
+    chunks = []
+    pos = 0
+    size = len(buf)
+    while True:
+        start = buf.find(SYNC, pos)
+        if start < 0:
+            # Keep a trailing first sync byte: its partner may be in the next read
+            pos = size - 1 if size and buf[-1] == SYNC[0] else size
+            break
+        n = (size - start) // FRAME_SIZE
+        if n == 0:
+            pos = start
+            break
+        raw = np.frombuffer(buf, dtype=np.uint8, count=n * FRAME_SIZE, offset=start).reshape(n, FRAME_SIZE)
+        frames = raw.view(FRAME_DTYPE).reshape(n)
+        ok = (frames["sync"] == SYNC_WORD) & (frames["crc"] == _crc_rows(raw))
+        bad = np.flatnonzero(~ok)
+        good = n if bad.size == 0 else int(bad[0])
+        if good:
+            chunks.append(frames[:good])
+        pos = start + good * FRAME_SIZE
+        if good == n:
+            continue
+        pos += 1    # frame at pos is corrupt: look for the next sync after it
+
+    out = np.zeros(sum(len(c) for c in chunks), dtype=READING_DTYPE)
+    if chunks:
+        frames = np.concatenate(chunks)
+        out["t_s"] = frames["t_ms"] / 1000.0
+        out["uhv_torr"] = frames["uhv_torr"]
+        out["fore_torr"] = frames["fore_torr"]
+        out["tg220"] = np.where(frames["tg220"] <= max(PumpStatus), frames["tg220"], PumpStatus.UNKNOWN)
+        out["tg60"] = np.where(frames["tg60"] <= max(PumpStatus), frames["tg60"], PumpStatus.UNKNOWN)
+    return out, pos
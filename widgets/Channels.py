@@ -1,4 +1,15 @@
+from functools import partial
+import time
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
 import instrument_app.widgets.CustomWidgets as cw
+from instrument_app.util.SerialComms import SerialComms, PRIORITY_WRITE
+from instrument_app.util.BusStats import bus_stats
+from instrument_app.config.settings import (
+    SETTING_CACHE_TTL_S, SETTING_CACHE_TOLERANCE, SETTING_CACHE_TOLERANCE_REL, WRITE_INFLIGHT_TIMEOUT_S,
+    HV_SETTLE_TOLERANCE, HV_SETTLE_TOLERANCE_REL, HV_SETTLE_POLL_MS, HV_SETTLE_TIMEOUT_MS
+)
 
 ###############################################################################
 # The generic classes
@@ -20,13 +31,53 @@ class Monitor(Channel):
                  description=''):
         super().__init__(name, group, COM, description = description)
         self.readback_command = readback_command
+        if readback_command is not None:
+            bus_stats.register(SerialComms.commandName(c) for c in self.pollCommands())
+
+        # Dead-band for repainting the readback: absolute and/or relative to the shown value
+        self.deadband = 0.0
+        self.deadband_rel = 0.0
+        self._shown = None
+
+    def setDeadband(self, absolute=0.0, relative=0.0):
+        self.deadband = float(absolute or 0.0)
+        self.deadband_rel = float(relative or 0.0)
+
+    def changed(self, response):
+        """True if `response` differs from what is on screen by more than the dead-band."""
+        shown = self._shown
+        if shown is None or len(shown) != len(response):
+            return True
+        for old, new in zip(shown, response):
+            if old == new:
+                continue
+            try:
+                old, new = float(old), float(new)
+            except (TypeError, ValueError):
+                return True
+            if abs(new - old) > max(self.deadband, self.deadband_rel * abs(old)):
+                return True
+        return False
     
+    def pollCommands(self):
+        # The individual queries behind one readback, e.g. the three turbo reads
+        return f'{self.readback_command}?'.split(';')
+
     def readActual(self):
-        print(self.name)
-        response, full_response = self.COM.sendCompact(f'{self.readback_command}?')
+        # COM is a SerialComms or a CompactBus; either way the reply comes back to _onActual
+        self.COM.requestCompact(f'{self.readback_command}?', self._onActual)
+
+    def _onActual(self, reply):
+        if not reply or reply[0] is None:
+            return
+        response, full_response = reply
         self.parse(response)
 
     def parse(self, response):
+        # Only touch the widget (text + restyle) when the value really moved
+        if not self.changed(response):
+            return
+        self._shown = list(response)
         self.gui.updateReadback(response)
         
 
@@ -36,22 +87,215 @@ class Setting(Monitor):
                  description=''):
         super().__init__(name, group, COM, readback_command, description = description)
         self.set_command = set_command
+        if set_command is not None:
+            bus_stats.register([SerialComms.commandName(set_command)])
+
+        # Last known setpoint, filled from write echoes and setting reads
+        self.setting_ttl = SETTING_CACHE_TTL_S
+        self.setting_tolerance = SETTING_CACHE_TOLERANCE
+        self.setting_tolerance_rel = SETTING_CACHE_TOLERANCE_REL
+        self._setting = None
+        self._setting_time = 0.0
+
+    def cachedSetting(self):
+        if self._setting is not None and time.monotonic() - self._setting_time < self.setting_ttl:
+            return self._setting
+        return None
+
+    def cacheSetting(self, response):
+        self._setting = list(response)
+        self._setting_time = time.monotonic()
 
-    def readSetting(self):
-        response, full_response = self.COM.sendCompact(f'{self.readback_command}?')
+    def invalidateSetting(self):
+        self._setting = None
+
+    def readSetting(self, force=False):
+        # Served locally unless the cached setpoint is stale (or we're told to go to the wire)
+        if self.readback_command is None:
+            return
+        cached = None if force else self.cachedSetting()
+        if cached is not None:
+            self.gui.updateSetting(cached)
+            return
+        self.COM.requestCompact(f'{self.readback_command}?', self._onSetting)
+
+    def _onSetting(self, reply):
+        if not reply or reply[0] is None:
+            return
+        response, full_response = reply
+        self.cacheSetting(response)
         self.gui.updateSetting(response)
 
-    def write(self, value):
+    def parse(self, response):
+        # A readback far from the cached setpoint means it changed behind our
+        # back (front panel, another client), so stop trusting it
+        if self._setting is not None and not self.settling() and not self.agreesWithSetting(response):
+            self.invalidateSetting()
+        super().parse(response)
+
+    def agreesWithSetting(self, response):
+        """
+        True if `response` is consistent with the cached setpoint. Values are
+        compared pairwise up to the shorter of the two (a turbo reads back
+        MOSW;ROTR;POWR against a MOSW setpoint); numbers agree within the
+        setting tolerance, anything else must match exactly.
+        """
+        for setpoint, readback in zip(self._setting, response):
+            if setpoint == readback:
+                continue
+            try:
+                setpoint, readback = float(setpoint), float(readback)
+            except (TypeError, ValueError):
+                return False
+            if abs(readback - setpoint) > max(self.setting_tolerance, self.setting_tolerance_rel * abs(setpoint)):
+                return False
+        return True
+
+    def settling(self):
+        # True while the readback is still expected to be on its way to a new setpoint
+        return False
+
+    def write(self, value, done=None):
+        """
+        Send a setpoint. If `done` is given it is called as done(response) once
+        the write has finished (response is None if it failed), and reporting
+        the committed value to the widget is left to it.
+        """
         message = f'{self.set_command}={value}'
-        response, full_response = self.COM.sendCompact(message)
+        # User writes jump ahead of the periodic reads on a bus
+        self.COM.requestCompact(message, partial(self._onWrite, message, done), priority=PRIORITY_WRITE)
+
+    def _onWrite(self, message, done, reply):
+        # The readback's colour depends on the setpoint: repaint it on the next poll
+        self._shown = None
+        response = self._checkWrite(message, reply)
+        if response is not None:
+            self.cacheSetting(response)
+        if done is not None:
+            done(response)
+        elif response is not None:
+            self.committed(response)
+
+    def committed(self, response):
+        # The device has accepted a new setpoint
+        self.gui.updateSetting(response)
+
+    def _checkWrite(self, message, reply):
+        if not reply:
+            return None
+        response, full_response = reply
         if response is None or full_response is None:
-            return
-        print(full_response[0], message)
+            return None
         if message in full_response[0] or full_response[0] in message:
-            print('Command successful')
-            self.gui.updateSetting(response)
-        else:
-            print('Command write', message, 'returned', full_response)
+            return response
+        # Answered, but not with our value: shows up as 'Rejected' in the serial statistics
+        bus_stats.reject(SerialComms.commandName(message))
+        return None
+
+
+class WriteCoalescer():
+    """
+    Latest-value-wins writes for one Setting. At most one write is in flight;
+    values submitted meanwhile replace each other and only the newest is sent
+    when the bus comes back. The widget only hears about the value that was
+    finally committed, so it never jumps back to a stale intermediate.
+    A failed write frees the slot like any other; one that is never answered
+    stops blocking after timeout_s, and its late answer is then ignored.
+    """
+    def __init__(self, setting, timeout_s=WRITE_INFLIGHT_TIMEOUT_S):
+        self.setting = setting
+        self.timeout_s = timeout_s
+        self.pending = None
+        self.inflight = False
+        self.dropped = 0
+        self._sent_at = 0.0
+        self._seq = 0              # identifies the write in flight
+
+    def submit(self, value):
+        if self.inflight and time.monotonic() - self._sent_at < self.timeout_s:
+            if self.pending is not None:
+                self.dropped += 1
+            self.pending = value
+            return
+        if self.pending is not None:
+            self.dropped += 1      # superseded while a lost write timed out
+            self.pending = None
+        self._send(value)
+
+    def _send(self, value):
+        self.inflight = True
+        self._sent_at = time.monotonic()
+        self._seq += 1
+        self.setting.write(value, done=partial(self._done, self._seq))
+
+    def _done(self, seq, response):
+        if seq != self._seq:
+            return      # answer to a write we already gave up on
+        self.inflight = False
+        if self.pending is not None:
+            value, self.pending = self.pending, None
+            self._send(value)
+        elif response is not None:
+            self.setting.committed(response)
+
+
+class SettleWatcher(QObject):
+    """
+    Follows a setpoint after it has been written: polls the readback every
+    interval_ms until it is within tolerance of the target (or timeout_ms runs
+    out), then emits settled(ok, readback). Used for the HVC_ supplies, which
+    take a while to ramp, instead of sleeping after every write.
+    """
+    settled = pyqtSignal(bool, object)
+
+    def __init__(self, setting, tolerance=HV_SETTLE_TOLERANCE, tolerance_rel=HV_SETTLE_TOLERANCE_REL,
+                 interval_ms=HV_SETTLE_POLL_MS, timeout_ms=HV_SETTLE_TIMEOUT_MS):
+        super().__init__()
+        self.setting = setting
+        self.tolerance = tolerance
+        self.tolerance_rel = tolerance_rel
+        self.timeout = timeout_ms / 1000
+        self.target = None
+        self._deadline = 0.0
+        self._waiting = False
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._poll)
+
+    @property
+    def active(self):
+        return self._timer.isActive()
+
+    def watch(self, target):
+        try:
+            self.target = float(target)
+        except (TypeError, ValueError):
+            return
+        self._deadline = time.monotonic() + self.timeout
+        self._timer.start()
+
+    def _poll(self):
+        if self._waiting:
+            return      # last readback still on the bus
+        self._waiting = True
+        self.setting.COM.requestCompact(f'{self.setting.readback_command}?', self._onReadback)
+
+    def _onReadback(self, reply):
+        self._waiting = False
+        if not self._timer.isActive():
+            return
+        value = None
+        if reply and reply[0] is not None:
+            try:
+                value = float(reply[0][0])
+            except (TypeError, ValueError):
+                pass
+        if value is not None and abs(value - self.target) <= max(self.tolerance, self.tolerance_rel * abs(self.target)):
+            self._timer.stop()
+            self.settled.emit(True, value)
+        elif time.monotonic() > self._deadline:
+            self._timer.stop()
+            self.settled.emit(False, value)
 
 
 ###############################################################################
@@ -90,9 +334,32 @@ class NumericSetting(Setting):
         self.gui.box.valueConfirmed.connect(self.valueChange)
         #self.readSetting()
 
+        # Holding W/S fires valueConfirmed on every key repeat; only the newest value matters
+        self.writer = WriteCoalescer(self)
+
+        # HV supplies ramp after a set; follow them instead of blocking on a delay
+        self.settle = None
+        if 'HVC_' in str(set_command):
+            self.settle = SettleWatcher(self)
+            self.settle.settled.connect(self.gui.markSettled)
+
+    def settling(self):
+        return self.settle is not None and self.settle.active
+
+    def committed(self, response):
+        super().committed(response)
+        # The readback is coloured against this from now on
+        try:
+            self.gui.value = float(response[0])
+        except (TypeError, ValueError, IndexError):
+            pass
+        if self.settle is not None:
+            self.gui.markSettling(response[0])
+            self.settle.watch(response[0])
+
     def valueChange(self, value):
-        print('Value Changed')
-        self.write(f'{value:.1f}')
+        self._shown = None
+        self.writer.submit(f'{value:.1f}')
 
 
 class TurboSetting(Setting):
@@ -8,6 +8,8 @@ Author: Chris Johnson
 Changelog:
     062124 - Work begun
     090325 - Adapting for inclusion in the Channels classes
+    101726 - No console print on every numeric readback
+    101726 - ...or on every switch readback; switch readbacks given as text are shown
 """
 
 from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QLineEdit, QHBoxLayout, QProgressBar, QPushButton, QComboBox
@@ -161,6 +163,8 @@ class QNumericControl(QWidget):
 
         # Create a QLabel to display the eradback
         self.readback = QLabel()
+        self._readback_color = None
+        self._settling = False
 
         # Vertical layout to hold the title label and horizontal layout
         v_layout = QVBoxLayout()
@@ -184,19 +188,42 @@ class QNumericControl(QWidget):
             return
         self.readback.setText(response[0])
 
-        print(response[0])
-
         # Kludge, fix this later
         if response[0].find('/') != -1:
             return
 
+        # While an HV setpoint is settling, markSettled() decides the colour
+        if self._settling:
+            return
+
         # Check if the readback is more than 5% different than the set value
         if (self.value - float(response[0]))/max(self.value, 0.01) < 0.05:
             # Make the readback green
-            self.readback.setStyleSheet('color: green;')
+            self.setReadbackColor('green')
         else:
             # Make the readback red
-            self.readback.setStyleSheet('color: red;')
+            self.setReadbackColor('red')
+
+    def markSettling(self, target):
+        # A new setpoint was accepted; the readback is on its way there
+        try:
+            self.value = float(target)
+        except (TypeError, ValueError):
+            return
+        self._settling = True
+        self.setReadbackColor('orange')
+
+    def markSettled(self, ok, readback):
+        self._settling = False
+        if readback is not None:
+            self.readback.setText(f"{readback:.1f}")
+        self.setReadbackColor('green' if ok else 'red')
+
+    def setReadbackColor(self, color):
+        # Restyling is expensive, so only do it when the colour actually changes
+        if color != self._readback_color:
+            self._readback_color = color
+            self.readback.setStyleSheet(f'color: {color};')
 
     def updateSetting(self, response):
        # self.box.text_box.setText(f"{float(response[0]):.1f}")
@@ -303,9 +330,13 @@ class QSwitchControl(QWidget):
         self.setLayout(layout)
 
     def updateSetting(self, response):
-        print(response, self.options)
-        if response[0] in (1, 2, 3, 4, 5, 6):
-            self.value.setCurrentIndex(int(response[0]))
+        # Readbacks and write echoes carry the index as text ('2'), the constructor as an int
+        try:
+            index = int(response[0])
+        except (TypeError, ValueError):
+            index = -1
+        if 0 <= index < len(self.options):
+            self.value.setCurrentIndex(index)
         else:
             print(f"Default value not found in list of options for {self.title_label} combo box.")
         self.value.setCurrentIndex(int(response[0]))
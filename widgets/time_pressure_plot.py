@@ -13,10 +13,12 @@ How it fits:
 Public API:
 - class TimePressurePlot(QWidget): set_view("UHV"/"Foreline"),
                                    set_time_window("5 min"/.../"All"),
-                                   append(Reading)
+                                   append(Reading), extend([Reading, ...])
 
 Changelog:
 - 2025-08-23 · 0.1.0 · KC · Extracted plotting logic into standalone widget.
+- 2026-10-17 · 0.1.1 · extend() appends a batch of readings with one redraw.
+- 2026-10-17 · 0.1.2 · Marks the 'plotted' latency trace stage.
 """
 
 
@@ -30,6 +32,7 @@ from instrument_app.theme import style
 from instrument_app.theme.manager import theme_mgr
 from instrument_app.theme.themes import Theme
 from instrument_app.util.parsing import Reading
+from instrument_app.util.LatencyTrace import latency_trace, PLOTTED
 
 class DynamicMinuteHourAxis(pg.AxisItem):
     def __init__(self, *a, **kw):
@@ -136,10 +139,16 @@ class TimePressurePlot(QWidget):
         self._update()
 
     def append(self, r: Reading):
-        self._ts.append(r.t_s)
-        self._uhv.append(r.uhv_torr if r.uhv_torr is not None else math.nan)
-        self._fl.append(r.fore_torr if r.fore_torr is not None else math.nan)
+        self.extend((r,))
+
+    def extend(self, readings):
+        nan = math.nan
+        for r in readings:
+            self._ts.append(r.t_s)
+            self._uhv.append(r.uhv_torr if r.uhv_torr is not None else nan)
+            self._fl.append(r.fore_torr if r.fore_torr is not None else nan)
         self._update()
+        latency_trace.mark(PLOTTED)
 
     # ---- internals ----
     def _apply_window(self, xs):